@@ -9,21 +9,15 @@ st.set_page_config(
 )
 
 # --- Imports ---
-from agno.agent import Agent
-from agno.embedder.ollama import OllamaEmbedder
-from agno.knowledge.pdf import PDFKnowledgeBase
-# from agno.models.anthropic import Claude # Keep if you might switch back
-from agno.models.groq import Groq # Use Groq
-# from agno.tools.reasoning import ReasoningTools # Commented out as it's removed below
-from agno.vectordb.pgvector import PgVector, SearchType
-from agno.run.response import RunEvent, RunResponse # Keep RunResponse if needed for type hints, RunEvent might not be used directly here
-
 import markdown
 import os
+import time
+
+from evalgen import EvalPipeline
 
-# --- load_knowledge_base function remains the same ---
+# --- Pipeline shared by all sessions; the knowledge base, agents and cache are built on first generate ---
 @st.cache_resource
-def load_knowledge_base():
+def load_pipeline():
     db_url = os.getenv("PGVECTOR_DB_URL", "postgresql+psycopg://ai:ai@localhost:5532/ai")
     pdf_path = os.getenv("AI_EVALS_GUIDE_PATH", "") # Define path to your PDF here or via env var
 
@@ -40,211 +34,18 @@ def load_knowledge_base():
          st.error(f"Specified PDF path does not exist: {pdf_path}")
          st.stop()
 
+    # Loading happens outside the app: `python ingest.py` embeds only new or changed chunks
+    return EvalPipeline(pdf_path=pdf_path, db_url=db_url)
+
+def load_knowledge_base(pipeline):
     try:
-        eval_knowledge_base = PDFKnowledgeBase(
-            path=pdf_path,
-            vector_db=PgVector(
-                table_name="eval_guide",
-                db_url=db_url,
-                search_type=SearchType.hybrid,
-                embedder=OllamaEmbedder(id="nomic-embed-text", dimensions=768),
-            ),
-        )
-        # Uncomment the line below ONLY during the very first run to load the KB
-        # print("Attempting to load knowledge base (first run)...")
-        # eval_knowledge_base.load(recreate=True)
-        # print("Knowledge base loading process initiated (if uncommented). Run takes time.")
-        return eval_knowledge_base
+        return pipeline.knowledge_base
     except Exception as e:
         st.error(f"Failed to initialize knowledge base components: {e}")
-        st.info("Ensure PostgreSQL/PgVector is running and accessible at the specified DB_URL, "
-                "and the PDF path is correct.")
+        st.info("Ensure PostgreSQL/PgVector is running and accessible at the specified DB_URL "
+                "(or set EVALS_VECTOR_DB=local to use the in-process index), and the PDF path is correct.")
         st.stop() # Stop if KB setup fails critically
 
-# --- UPDATED create_planning_agent (using Groq, NO tools) ---
-@st.cache_resource
-def create_planning_agent(_eval_knowledge_base, model_id):
-    """Creates the planning agent using the specified Groq model ID."""
-    # Ensure API key is set for Groq (agno might read GROQ_API_KEY env var)
-    if not os.getenv("GROQ_API_KEY"):
-        st.warning("GROQ_API_KEY environment variable not set. Agent may fail.")
-        # Consider adding st.stop() here if the key is absolutely required
-
-    return Agent(
-        model=Groq(id=model_id), # Use selected Groq model
-        knowledge=_eval_knowledge_base,
-        search_knowledge=True,
-        # *** REMOVED tools parameter to avoid tool_use_failed error ***
-        # tools=[ReasoningTools(add_instructions=True)],
-        instructions=[
-            "You are an expert AI evaluation planning agent.",
-            "Analyze the provided chatbot requirements meticulously.",
-            "Break down the requirements into clear, distinct evaluation dimensions.",
-            "For each dimension, identify:",
-            "  - Essential features the chatbot *must* have.",
-            "  - Potential edge cases or challenging scenarios.",
-            "  - Critical evaluation metrics (both qualitative and quantitative where applicable).",
-            "Output *only* a structured plan in well-formatted Markdown format.",
-            "Do not include conversational filler, apologies, or summaries of your own instructions.",
-            "The plan should be directly usable for creating a detailed evaluation framework.",
-        ],
-        markdown=True, # Request clean markdown output
-    )
-
-# --- UPDATED create_knowledge_agent (using Groq, NO tools) ---
-@st.cache_resource
-def create_knowledge_agent(_eval_knowledge_base, model_id):
-    """Creates the knowledge agent using the specified Groq model ID."""
-    if not os.getenv("GROQ_API_KEY"):
-        st.warning("GROQ_API_KEY environment variable not set. Agent may fail.")
-        # Consider adding st.stop() here if the key is absolutely required
-
-    return Agent(
-        model=Groq(id=model_id), # Use selected Groq model
-        knowledge=_eval_knowledge_base,
-        search_knowledge=True,
-        # *** REMOVED tools parameter to avoid tool_use_failed error ***
-        # tools=[ReasoningTools(add_instructions=True)],
-        instructions=[
-            "You are a specialized agent tasked with creating comprehensive AI evaluation frameworks based on the AI Evals Guide principles.",
-            "Given the user's chatbot requirements and a structured evaluation plan, generate a detailed evaluation framework.",
-            "Strictly follow the 4-step process outlined in the AI Evals Guide:",
-            "1.  **Create 'Goldens':** Provide *at least 5* detailed examples. Each example must include a realistic user input and the corresponding ideal chatbot output.",
-            "2.  **Generate Synthetic Data:** Clearly explain the strategy for generating synthetic data. Provide *specific examples* of prompts you would use to generate variations for testing different scenarios (e.g., edge cases, different tones).",
-            "3.  **Grade Outputs:** Define clear, measurable evaluation metrics and detailed rubrics for grading the chatbot's actual outputs against the 'Goldens' or ideal responses. Cover dimensions identified in the plan (e.g., accuracy, tone, helpfulness, safety).",
-            "4.  **Build Autoraters:** Provide specific, actionable instructions for creating automated evaluation tools ('autoraters'). Include example prompts or criteria that an LLM-based autorater could use.",
-            "Tailor all examples, metrics, and instructions specifically to the provided chatbot requirements and evaluation plan.",
-            "Cite relevant sections from the AI Evals Guide document when applicable (e.g., 'Referencing Section 2.2 of the guide...').",
-            "Output *only* the complete 4-step evaluation framework in well-formatted Markdown.",
-            "Do not add introductory or concluding remarks outside the framework structure."
-        ],
-        markdown=True, # Request clean markdown output
-    )
-
-
-# --- CORRECTED generate_chatbot_eval function ---
-def generate_chatbot_eval(user_requirement, planning_agent, knowledge_agent, progress_callback=None):
-    """
-    Generate a comprehensive evaluation framework for a chatbot based on user requirements.
-
-    Args:
-        user_requirement (str): Detailed description of the chatbot requirements
-        planning_agent (Agent): Agent for planning the evaluation structure
-        knowledge_agent (Agent): Agent for generating detailed evaluation framework
-        progress_callback (func): Optional callback function for updating progress
-
-    Returns:
-        dict: Containing the evaluation plan and detailed framework, or None on error.
-    """
-    evaluation_plan = None
-    detailed_eval_framework = None
-
-    if progress_callback:
-        progress_callback(0.1, "Analyzing requirements with Planning Agent...")
-
-    # First, use the planning agent
-    planning_prompt = f"""
-    Analyze the following chatbot requirements and create a structured evaluation plan following your instructions.
-
-    Chatbot Requirements:
-    ```
-    {user_requirement}
-    ```
-
-    Ensure the output is only the structured plan in Markdown format.
-    """
-    try:
-        # *** FIX: Call run() and get the response object ***
-        response_plan = planning_agent.run(planning_prompt)
-
-        # *** FIX: Extract the .content attribute ***
-        if hasattr(response_plan, 'content') and isinstance(response_plan.content, str):
-            evaluation_plan = response_plan.content
-            # Optional: Clean up potential leading/trailing whitespace
-            evaluation_plan = evaluation_plan.strip()
-        elif response_plan is not None: # Handle cases where it might return non-RunResponse but not None
-             st.warning(f"Planning agent returned type {type(response_plan)}, attempting to get content or string.")
-             evaluation_plan = getattr(response_plan, 'content', str(response_plan)) # Get content if possible, else stringify
-             evaluation_plan = evaluation_plan.strip()
-        else:
-            st.error("Planning agent returned an empty response (None).")
-            raise ValueError("Empty response from planning agent") # Or handle differently
-
-        # Check if we actually got content after potential extraction/conversion
-        if not evaluation_plan:
-             st.error("Planning agent failed to generate content for the plan after processing the response.")
-             raise ValueError("Empty plan content from planning agent")
-
-
-    except Exception as e:
-        st.error(f"Error during planning agent execution: {e}")
-        # import traceback
-        # st.exception(e) # Uncomment for full traceback in UI
-        # Return None or raise specific error if planning fails
-        raise # Re-raise to stop execution in the main block
-
-    if progress_callback:
-        progress_callback(0.5, "Creating evaluation framework with Knowledge Agent...")
-
-    # Then, use the knowledge agent
-    knowledge_prompt = f"""
-    Based on the following chatbot requirements and evaluation plan, create a comprehensive AI evaluation framework following the 4-step process as per your instructions.
-
-    Chatbot Requirements:
-    ```
-    {user_requirement}
-    ```
-
-    Evaluation Plan:
-    ```markdown
-    {evaluation_plan}
-    ```
-
-    Ensure the output is only the 4-step framework in Markdown format.
-    """
-    try:
-        # *** FIX: Call run() and get the response object ***
-        response_framework = knowledge_agent.run(knowledge_prompt)
-
-        # *** FIX: Extract the .content attribute ***
-        if hasattr(response_framework, 'content') and isinstance(response_framework.content, str):
-            detailed_eval_framework = response_framework.content
-            # Optional: Clean up potential leading/trailing whitespace
-            detailed_eval_framework = detailed_eval_framework.strip()
-        elif response_framework is not None:
-            st.warning(f"Knowledge agent returned type {type(response_framework)}, attempting to get content or string.")
-            detailed_eval_framework = getattr(response_framework, 'content', str(response_framework))
-            detailed_eval_framework = detailed_eval_framework.strip()
-        else:
-            st.error("Knowledge agent returned an empty response (None).")
-            raise ValueError("Empty response from knowledge agent")
-
-        # Check if we actually got content after potential extraction/conversion
-        if not detailed_eval_framework:
-             st.error("Knowledge agent failed to generate content for the framework after processing the response.")
-             raise ValueError("Empty framework content from knowledge agent")
-
-    except Exception as e:
-        st.error(f"Error during knowledge agent execution: {e}")
-        # import traceback
-        # st.exception(e) # Uncomment for full traceback in UI
-        raise # Re-raise to stop execution
-
-    if progress_callback:
-        progress_callback(1.0, "Evaluation framework generation complete!")
-
-    # Ensure both parts were generated successfully before returning
-    # (The checks above should already guarantee this if no exception was raised)
-    if evaluation_plan and detailed_eval_framework:
-        return {
-            "plan": evaluation_plan,
-            "framework": detailed_eval_framework
-        }
-    else:
-        # This case should ideally be caught by the exceptions above, but as a fallback:
-        st.error("Failed to generate either the plan or the framework content (This shouldn't normally be reached).")
-        return None # Indicate failure
-
 
 # --- Session State Initialization remains the same ---
 if 'results' not in st.session_state:
@@ -259,9 +60,8 @@ if 'last_selected_template' not in st.session_state:
         st.session_state.last_selected_template = "Custom"
 
 
-# --- Load knowledge base (with error handling) ---
-# Ensure this is called only once or is cached effectively
-eval_knowledge_base = load_knowledge_base() # Call the function
+# --- Pipeline (cheap: nothing connects to PgVector, Ollama or Groq until Generate is clicked) ---
+eval_pipeline = load_pipeline()
 
 
 # --- Main content ---
@@ -274,7 +74,7 @@ following the 4-step process from the AI Evals Guide. Enter your chatbot require
 # --- Sidebar ---
 with st.sidebar:
     st.title("⚙️ Settings")
-    st.info("Ensure the `GROQ_API_KEY` and `AI_EVALS_GUIDE_PATH` environment variables are set, and PgVector is running.")
+    st.info("Ensure the `GROQ_API_KEY` and `AI_EVALS_GUIDE_PATH` environment variables are set, and PgVector is running (or EVALS_VECTOR_DB=local).")
 
     # Model options specific to Groq (Ensure these IDs are valid for agno's Groq integration)
     # Using the IDs you provided in your code. Double-check if these are the exact IDs
@@ -362,13 +162,13 @@ with st.sidebar:
     st.write("---")
     st.sidebar.info(
         "**First time setup:**\n"
-        "1. Ensure PostgreSQL/PgVector is running (e.g., via Docker `docker compose up -d`) at `localhost:5532` with user `ai`/`ai`.\n"
+        "1. Ensure PostgreSQL/PgVector is running (e.g., via Docker `docker compose up -d`) at `localhost:5532` with user `ai`/`ai`, "
+        "or set `EVALS_VECTOR_DB=local` to keep the index in-process without a database.\n"
         "2. Place your 'AI Evals Guide' PDF file somewhere accessible.\n"
-        "3. Set the `AI_EVALS_GUIDE_PATH` environment variable to the PDF's path OR update the path directly in `load_knowledge_base()`.\n"
+        "3. Set the `AI_EVALS_GUIDE_PATH` environment variable to the PDF's path OR update the path directly in `load_pipeline()`.\n"
         "4. Set the `GROQ_API_KEY` environment variable.\n"
-        "5. *Only on the very first run:* Uncomment the `eval_knowledge_base.load(recreate=True)` line in `load_knowledge_base()`.\n"
-        "6. Run the Streamlit app (`streamlit run your_script_name.py`). The first run (with `.load()`) will take time to process the PDF.\n"
-        "7. After successful loading, comment out the `.load()` line again for faster subsequent startups."
+        "5. Run `python ingest.py` to embed the PDF into the vector store. Re-run it after editing the guide; unchanged chunks are skipped.\n"
+        "6. Run the Streamlit app (`streamlit run app.py`)."
     )
 
 
@@ -384,6 +184,11 @@ with st.expander("Chatbot Requirements", expanded=True):
     )
     # Update session state if the user types manually
     st.session_state.user_input = user_input_value
+    force_regenerate = st.checkbox(
+        "Force regenerate",
+        value=False,
+        help="Ignore cached results for this requirement and models and call Groq again.",
+    )
     generate_button = st.button("Generate Evaluation Framework", type="primary", use_container_width=True)
 
 
@@ -393,8 +198,8 @@ if generate_button and st.session_state.user_input: # Check session state input
     if not os.getenv("GROQ_API_KEY"):
          st.error("GROQ_API_KEY environment variable is not set. Cannot generate evaluation. Please set it and restart.")
          st.stop()
-    # Check if KB loaded successfully (eval_knowledge_base should not be None)
-    if not eval_knowledge_base:
+    # Build the knowledge base on the first generate (stops with an error if it fails)
+    if not load_knowledge_base(eval_pipeline):
          st.error("Knowledge Base could not be loaded. Cannot generate evaluation. Check previous errors.")
          st.stop()
 
@@ -411,11 +216,29 @@ if generate_button and st.session_state.user_input: # Check session state input
         progress_bar.progress(progress_val, text=status)
         status_text.text(status)
 
+    # Live view: each stage's Markdown is rendered into its tab as tokens arrive
+    live_view = st.empty()
+    with live_view.container():
+        live_plan_tab, live_framework_tab = st.tabs(["📝 Evaluation Plan (live)", "📊 Evaluation Framework (live)"])
+        live_placeholders = {"plan": live_plan_tab.empty(), "framework": live_framework_tab.empty()}
+    last_render = {"plan": 0.0, "framework": 0.0}
+
+    def render_stream(stage, text):
+        # Redrawing Markdown on every token is wasteful; ~10 frames a second reads as live
+        now = time.perf_counter()
+        if now - last_render[stage] < 0.1:
+            return
+        last_render[stage] = now
+        live_placeholders[stage].markdown(text + " ▌")
+        if stage == "plan":
+            update_progress(0.1 + min(len(text) / 20000, 0.39), "Streaming evaluation plan...")
+        else:
+            update_progress(0.5 + min(len(text) / 40000, 0.49), "Streaming evaluation framework...")
+
     update_progress(0.05, "Initializing agents...")
     try:
-        # Agents are cached, so creation should be fast after the first time
-        planning_agent = create_planning_agent(eval_knowledge_base, planning_model_id)
-        knowledge_agent = create_knowledge_agent(eval_knowledge_base, knowledge_model_id)
+        # Agents are cached per model by the pipeline, so creation should be fast after the first time
+        eval_pipeline.agents(planning_model_id, knowledge_model_id)
         update_progress(0.08, "Agents initialized.")
 
         # *** Update the call and handling of results ***
@@ -423,12 +246,16 @@ if generate_button and st.session_state.user_input: # Check session state input
         generation_result = None # Initialize generation_result
 
         # Call the corrected generation function
-        generation_result = generate_chatbot_eval(
+        generation_result = eval_pipeline.generate(
             st.session_state.user_input, # Use value from session state
-            planning_agent,
-            knowledge_agent,
-            progress_callback=update_progress
+            planning_model=planning_model_id,
+            knowledge_model=knowledge_model_id,
+            progress_callback=update_progress,
+            stream_callback=render_stream,
+            force_regenerate=force_regenerate,
         )
+        # The finished results are shown in the tabs below
+        live_view.empty()
 
         # Check if the function returned a valid dict
         if generation_result and "plan" in generation_result and "framework" in generation_result:
@@ -457,10 +284,26 @@ if generate_button and st.session_state.user_input: # Check session state input
 # Check if results exist in session state and are valid
 if st.session_state.results and isinstance(st.session_state.results, dict) and "plan" in st.session_state.results and "framework" in st.session_state.results:
     st.success("Evaluation framework generated successfully!") # Keep success message here
+    stage_stats = st.session_state.results.get("stats", {})
+
+    def stage_caption(stage):
+        stats = stage_stats.get(stage)
+        if not stats:
+            return
+        rate = f"{stats['tokens_per_sec']:.0f} tokens/s" if stats.get("tokens_per_sec") else "n/a tokens/s"
+        if stats.get("cached"):
+            st.caption(f"Served from the result cache (originally {stats['output_tokens']} tokens at {rate})")
+            return
+        st.caption(
+            f"First token after {stats['ttft_s']:.2f} s · {rate} · "
+            f"{stats['output_tokens']} tokens in {stats['duration_s']:.1f} s"
+        )
+
     tab1, tab2 = st.tabs(["📊 Evaluation Framework", "📝 Evaluation Plan"])
 
     with tab1:
         st.header("📊 Evaluation Framework")
+        stage_caption("framework")
         framework_content = st.session_state.results.get("framework", "Error: Framework content missing.")
         st.markdown(framework_content)
         st.write("---")
@@ -492,6 +335,7 @@ if st.session_state.results and isinstance(st.session_state.results, dict) and "
 
     with tab2:
         st.header("📝 Evaluation Plan")
+        stage_caption("plan")
         plan_content = st.session_state.results.get("plan", "Error: Plan content missing.")
         st.markdown(plan_content)
         st.write("---")
@@ -0,0 +1,6 @@
+"""Entry point kept for `python batch.py`; the implementation lives in evalgen.batch."""
+
+from evalgen.batch import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Chunks/second of BatchingOllamaEmbedder with a cold and a warm cache, versus
+OllamaEmbedder's one-request-per-chunk path, measured against mock_ollama.py.
+
+Usage:
+    python benchmarks/bench_embedding.py --chunks 512 --batch-size 32 --max-in-flight 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agno.embedder.ollama import OllamaEmbedder  # noqa: E402
+
+from evalgen.embedding import BatchingOllamaEmbedder  # noqa: E402
+from evalgen.knowledge import EMBEDDER_DIMENSIONS, EMBEDDER_ID  # noqa: E402
+from mock_ollama import MockOllamaServer  # noqa: E402
+
+
+def make_chunks(count, size=1000):
+    """Distinct chunk-sized texts."""
+    return [f"chunk {i}: " + ("evaluation rubric for chatbot answers " * (size // 38)) for i in range(count)]
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Mock per-request latency")
+    parser.add_argument("--per-text-ms", type=float, default=2.0, help="Mock cost per embedded text")
+    parser.add_argument("--dtype", choices=["float16", "float32"], default="float16")
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    server = MockOllamaServer(
+        latency_ms=args.latency_ms, per_text_ms=args.per_text_ms, dimensions=EMBEDDER_DIMENSIONS
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            single = OllamaEmbedder(id=EMBEDDER_ID, dimensions=EMBEDDER_DIMENSIONS, host=server.url)
+            sequential = timed(lambda: [single.get_embedding(text) for text in chunks])
+
+            def batching():
+                return BatchingOllamaEmbedder(
+                    id=EMBEDDER_ID,
+                    dimensions=EMBEDDER_DIMENSIONS,
+                    host=server.url,
+                    batch_size=args.batch_size,
+                    max_in_flight=args.max_in_flight,
+                    cache_dir=cache_dir,
+                    cache_dtype=args.dtype,
+                )
+
+            before = server.stats["requests"]
+            cold = timed(batching().embed_batch, chunks)
+            cold_requests = server.stats["requests"] - before
+            # A fresh embedder reloads the cache from disk, as a second ingest run would
+            warm_embedder = batching()
+            before = server.stats["requests"]
+            warm = timed(lambda: (warm_embedder.cache, warm_embedder.embed_batch(chunks)))
+            warm_requests = server.stats["requests"] - before
+            cache_bytes = sum(f.stat().st_size for f in warm_embedder.cache.path.iterdir())
+
+        print(
+            f"{args.chunks} chunks, {args.latency_ms:.0f} ms/request + {args.per_text_ms:.0f} ms/chunk simulated, "
+            f"batch {args.batch_size}, {args.max_in_flight} in flight"
+        )
+        print(f"  one per request : {sequential:7.3f} s  {args.chunks / sequential:9.1f} chunks/s  ({args.chunks} requests)")
+        print(
+            f"  batched, cold   : {cold:7.3f} s  {args.chunks / cold:9.1f} chunks/s  "
+            f"({cold_requests} requests, {sequential / cold:.1f}x)"
+        )
+        print(
+            f"  batched, warm   : {warm:7.3f} s  {args.chunks / warm:9.1f} chunks/s  "
+            f"({warm_requests} requests, cache {cache_bytes / 1024:.0f} KiB {args.dtype})"
+        )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
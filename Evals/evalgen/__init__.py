@@ -0,0 +1,39 @@
+"""
+Evaluation framework generation, importable outside the Streamlit app.
+
+    from evalgen import EvalPipeline
+    result = EvalPipeline().generate("A support bot for an electronics store...")
+
+Names are resolved on first access, so `import evalgen` doesn't load agno,
+SQLAlchemy or Ollama until something actually needs them.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "EvalPipeline": "pipeline",
+    "generate_chatbot_eval": "pipeline",
+    "build_planning_agent": "pipeline",
+    "build_knowledge_agent": "pipeline",
+    "DEFAULT_PLANNING_MODEL": "pipeline",
+    "DEFAULT_KNOWLEDGE_MODEL": "pipeline",
+    "build_knowledge_base": "knowledge",
+    "build_vector_db": "knowledge",
+    "ResultCache": "result_cache",
+    "Retriever": "retrieval",
+    "run_batch": "batch",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
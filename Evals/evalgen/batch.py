@@ -0,0 +1,345 @@
+"""
+Headless batch generation of evaluation frameworks over a requirements file.
+
+Reads a JSONL or CSV file with one chatbot requirement per row and runs each
+row through EvalPipeline.generate on a pool of asyncio workers. Rows
+are started no faster than --rpm agent stages per minute (Groq's request
+quota), and rate-limit errors are retried with exponential backoff.
+
+Outputs go to one directory per row (plan.md, framework.md, stats.json). Every
+finished row is appended to checkpoint.jsonl, so re-running the same command
+after a crash skips rows that already succeeded and retries the rest. A
+throughput summary is printed and written to summary.json.
+
+Input columns (JSONL keys or CSV header):
+    requirement       chatbot requirement text (required; "text" also accepted)
+    id                row id used for the output directory (default: line number + text hash)
+    planning_model    Groq model id for the plan (default: --planning-model)
+    knowledge_model   Groq model id for the framework (default: --knowledge-model)
+
+Usage (batch.py in the Evals directory, or python -m evalgen.batch):
+    python batch.py specs.jsonl --out runs/specs --concurrency 4 --rpm 30
+    python batch.py specs.csv --out runs/specs --force   # ignore cached results
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import logging
+import random
+import re
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from .pipeline import DEFAULT_KNOWLEDGE_MODEL, DEFAULT_PLANNING_MODEL, EvalPipeline
+
+logger = logging.getLogger("evalgen")
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+SUMMARY_FILE = "summary.json"
+# Agent stages per row: one planning run and one framework run
+STAGES_PER_ROW = 2
+
+
+def row_id(index, requirement, explicit=None):
+    """Filesystem-safe id of a row; stable across runs as long as the text is unchanged."""
+    if explicit:
+        return re.sub(r"[^A-Za-z0-9._-]+", "-", str(explicit)).strip("-") or f"row-{index:04d}"
+    return f"row-{index:04d}-{hashlib.sha256(requirement.encode('utf-8')).hexdigest()[:8]}"
+
+
+def read_requirements(path):
+    """
+    Rows of a JSONL or CSV requirements file.
+
+    Returns:
+        list: dicts with id, requirement and optional planning_model / knowledge_model
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            records = list(csv.DictReader(f))
+    else:
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records.append(record if isinstance(record, dict) else {"requirement": record})
+
+    rows, seen = [], set()
+    for index, record in enumerate(records, 1):
+        requirement = (record.get("requirement") or record.get("text") or "").strip()
+        if not requirement:
+            logger.warning(f"Row {index} of {path} has no requirement, skipping")
+            continue
+        rid = row_id(index, requirement, record.get("id"))
+        if rid in seen:
+            raise ValueError(f"Duplicate row id '{rid}' in {path}")
+        seen.add(rid)
+        rows.append(
+            {
+                "id": rid,
+                "requirement": requirement,
+                "planning_model": record.get("planning_model") or None,
+                "knowledge_model": record.get("knowledge_model") or None,
+            }
+        )
+    return rows
+
+
+def read_checkpoint(out_dir):
+    """Ids of rows whose last checkpoint entry succeeded."""
+    path = Path(out_dir) / CHECKPOINT_FILE
+    if not path.exists():
+        return set()
+    status = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # A crash can leave a torn last line; that row simply runs again
+                continue
+            status[entry["id"]] = entry["status"]
+    return {rid for rid, state in status.items() if state == "ok"}
+
+
+def is_rate_limited(error):
+    """True for Groq quota rejections (HTTP 429), whichever client layer raised them."""
+    text = f"{type(error).__name__} {error}".lower()
+    return "ratelimit" in text or "rate limit" in text or "429" in text
+
+
+class RequestPacer:
+    """
+    Spaces agent stages so that at most `rpm` start per minute across all workers.
+
+    Thread-safe, since rows run in worker threads.
+    """
+
+    def __init__(self, rpm):
+        self.interval = 60.0 / rpm if rpm else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stages=1):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval * stages
+        if start > now:
+            time.sleep(start - now)
+
+
+def write_outputs(out_dir, row, result, elapsed):
+    """plan.md, framework.md and stats.json of one row, each written atomically."""
+    row_dir = Path(out_dir) / row["id"]
+    row_dir.mkdir(parents=True, exist_ok=True)
+    files = {
+        "plan.md": result["plan"],
+        "framework.md": result["framework"],
+        "stats.json": json.dumps(
+            {
+                "id": row["id"],
+                "planning_model": row["planning_model"],
+                "knowledge_model": row["knowledge_model"],
+                "elapsed_s": round(elapsed, 3),
+                "stages": result.get("stats", {}),
+            },
+            indent=2,
+        ),
+    }
+    for name, content in files.items():
+        tmp = row_dir / f".{name}.tmp"
+        tmp.write_text(content, encoding="utf-8")
+        tmp.replace(row_dir / name)
+
+
+def run_row(row, pipeline, force_regenerate, pacer, max_retries):
+    """
+    Generate one row's plan and framework in the calling thread, retrying rate-limit errors.
+
+    Returns:
+        dict: generate_chatbot_eval's result
+    """
+    for attempt in range(max_retries + 1):
+        pacer.acquire(STAGES_PER_ROW)
+        try:
+            # Agents keep per-run state, so every row gets its own pair
+            result = pipeline.generate(
+                row["requirement"],
+                planning_model=row["planning_model"],
+                knowledge_model=row["knowledge_model"],
+                force_regenerate=force_regenerate,
+                shared_agents=False,
+            )
+        except Exception as e:
+            if attempt < max_retries and is_rate_limited(e):
+                delay = min(60.0, 2.0 * 2**attempt) * random.uniform(0.8, 1.2)
+                logger.warning(f"{row['id']}: rate limited, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+                time.sleep(delay)
+                continue
+            raise
+        if not result:
+            raise ValueError("Generation returned no result")
+        return result
+
+
+async def run_batch(
+    rows,
+    out_dir,
+    concurrency=4,
+    rpm=30,
+    max_retries=4,
+    use_cache=True,
+    force_regenerate=False,
+    pipeline=None,
+):
+    """
+    Run rows through the pipeline on `concurrency` workers, skipping rows already checkpointed.
+
+    Args:
+        rows (list): Rows from read_requirements
+        out_dir (str): Output directory (per-row outputs, checkpoint.jsonl, summary.json)
+        concurrency (int): Rows generated at the same time
+        rpm (float): Agent stages started per minute across all workers (0 for no limit)
+        max_retries (int): Retries of a row rejected with a rate-limit error
+        use_cache (bool): Look up and store results in the result cache
+        force_regenerate (bool): Run the agents even for cached results
+        pipeline (EvalPipeline): Pipeline to run rows through (default: a new one)
+
+    Returns:
+        dict: Throughput summary
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    done = read_checkpoint(out_dir)
+    pending = [row for row in rows if row["id"] not in done]
+    if pipeline is None:
+        pipeline = EvalPipeline(use_cache=use_cache)
+    pacer = RequestPacer(rpm)
+
+    queue = asyncio.Queue()
+    for row in pending:
+        queue.put_nowait(row)
+    finished = []
+    checkpoint = open(out_dir / CHECKPOINT_FILE, "a", encoding="utf-8")
+
+    async def worker():
+        while True:
+            try:
+                row = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            start = time.perf_counter()
+            entry = {"id": row["id"]}
+            try:
+                result = await asyncio.to_thread(run_row, row, pipeline, force_regenerate, pacer, max_retries)
+                elapsed = time.perf_counter() - start
+                write_outputs(out_dir, row, result, elapsed)
+                entry.update(status="ok", stats=result.get("stats", {}))
+            except Exception as e:
+                elapsed = time.perf_counter() - start
+                entry.update(status="error", error=f"{type(e).__name__}: {e}")
+                logger.error(f"{row['id']}: {entry['error']}")
+            entry.update(elapsed_s=round(elapsed, 3), finished_at=time.time())
+            # Outputs are on disk before the row is checkpointed, so a resumed run never skips a missing row
+            checkpoint.write(json.dumps(entry) + "\n")
+            checkpoint.flush()
+            finished.append(entry)
+            print(f"[{len(finished)}/{len(pending)}] {row['id']}: {entry['status']} in {elapsed:.1f}s", flush=True)
+
+    wall_start = time.perf_counter()
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, len(pending) or 1)))))
+    finally:
+        checkpoint.close()
+    wall = time.perf_counter() - wall_start
+
+    summary = summarize(finished, wall, total=len(rows), skipped=len(rows) - len(pending), concurrency=concurrency)
+    (out_dir / SUMMARY_FILE).write_text(json.dumps(summary, indent=2))
+    return summary
+
+
+def summarize(entries, wall, total, skipped, concurrency):
+    """Throughput and latency over the rows finished in this run."""
+    ok = [entry for entry in entries if entry["status"] == "ok"]
+    latencies = sorted(entry["elapsed_s"] for entry in ok)
+    stage_stats = [stats for entry in ok for stats in entry.get("stats", {}).values()]
+    generated = [stats for stats in stage_stats if not stats.get("cached")]
+    output_tokens = sum(stats.get("output_tokens") or 0 for stats in generated)
+    return {
+        "rows": total,
+        "skipped": skipped,
+        "succeeded": len(ok),
+        "failed": len(entries) - len(ok),
+        "concurrency": concurrency,
+        "wall_s": round(wall, 2),
+        "rows_per_min": round(len(ok) / wall * 60, 2) if wall > 0 else None,
+        "row_latency_s": {
+            "mean": round(statistics.fmean(latencies), 2) if latencies else None,
+            "p50": round(latencies[len(latencies) // 2], 2) if latencies else None,
+            "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2) if latencies else None,
+        },
+        "stages_cached": len(stage_stats) - len(generated),
+        "output_tokens": output_tokens,
+        "output_tokens_per_sec": round(output_tokens / wall, 1) if wall > 0 else None,
+        "mean_ttft_s": round(statistics.fmean(s["ttft_s"] for s in generated), 3) if generated else None,
+    }
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description="Generate evaluation frameworks for every requirement in a JSONL/CSV file")
+    parser.add_argument("input", help="JSONL or CSV file of requirements")
+    parser.add_argument("--out", default="batch_output", help="Output directory (default: batch_output)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Rows generated at the same time (default: 4)")
+    parser.add_argument("--rpm", type=float, default=30, help="Agent stages started per minute, 0 for no limit (default: 30)")
+    parser.add_argument("--max-retries", type=int, default=4, help="Retries of a rate-limited row (default: 4)")
+    parser.add_argument("--planning-model", default=DEFAULT_PLANNING_MODEL)
+    parser.add_argument("--knowledge-model", default=DEFAULT_KNOWLEDGE_MODEL)
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the result cache")
+    parser.add_argument("--force", action="store_true", help="Regenerate rows even if their results are cached")
+    args = parser.parse_args()
+
+    rows = read_requirements(args.input)
+    for row in rows:
+        row["planning_model"] = row["planning_model"] or args.planning_model
+        row["knowledge_model"] = row["knowledge_model"] or args.knowledge_model
+
+    summary = asyncio.run(
+        run_batch(
+            rows,
+            args.out,
+            concurrency=args.concurrency,
+            rpm=args.rpm,
+            max_retries=args.max_retries,
+            use_cache=not args.no_cache,
+            force_regenerate=args.force,
+        )
+    )
+    print(
+        f"{summary['succeeded']} succeeded, {summary['failed']} failed, {summary['skipped']} already done "
+        f"of {summary['rows']} rows in {summary['wall_s']:.1f}s"
+    )
+    if summary["rows_per_min"] is not None:
+        latency = summary["row_latency_s"]
+        print(
+            f"{summary['rows_per_min']:.2f} rows/min, row latency p50 {latency['p50']}s p95 {latency['p95']}s, "
+            f"{summary['output_tokens']} output tokens ({summary['output_tokens_per_sec']} tokens/s), "
+            f"{summary['stages_cached']} stages from cache"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Batched, concurrent Ollama embeddings with a local on-disk cache.
+
+OllamaEmbedder sends one /api/embed request per chunk. BatchingOllamaEmbedder
+keeps that interface (PgVector still calls get_embedding per document) but adds
+embed_batch(), which groups texts into batches of batch_size and keeps at most
+max_in_flight requests open at once. Every vector is stored in an EmbeddingCache
+keyed by (model, SHA-256 of the text), so embed_batch() ahead of an upsert turns
+PgVector's per-document calls into cache hits, and re-embedding the same chunk
+or query never reaches Ollama again.
+
+The cache lives in one directory per model and dimension count:
+    vectors.bin  rows of `dimensions` float16 (or float32) values, appended
+    keys.txt     one text hash per line; line i names row i
+"""
+
+import hashlib
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.embedder.ollama import OllamaEmbedder
+from agno.utils.log import logger
+
+# Where cached embeddings are kept unless a cache_dir is given
+DEFAULT_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".embedding_cache")
+
+
+def text_hash(text):
+    """SHA-256 hex digest of a text, the cache key within one model."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Append-only store of embeddings for one model, memory-resident once loaded.
+
+    Args:
+        directory (str): Root cache directory; a sub-directory per model is created
+        model (str): Embedding model id
+        dimensions (int): Length of every vector
+        dtype (str): "float16" (half the disk and memory) or "float32"
+    """
+
+    def __init__(self, directory, model, dimensions, dtype="float16"):
+        if dtype not in ("float16", "float32"):
+            raise ValueError(f"Unsupported cache dtype: {dtype}")
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", model)
+        self.path = Path(directory) / f"{slug}-{dimensions}-{dtype}"
+        self.dimensions = dimensions
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = self.dimensions * self.dtype.itemsize
+        self._lock = threading.Lock()
+        self._index = {}
+        self._rows = np.empty((0, dimensions), dtype=self.dtype)
+        self._load()
+
+    @property
+    def _vectors_file(self):
+        return self.path / "vectors.bin"
+
+    @property
+    def _keys_file(self):
+        return self.path / "keys.txt"
+
+    def _load(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        keys = self._keys_file.read_text().split() if self._keys_file.exists() else []
+        size = self._vectors_file.stat().st_size if self._vectors_file.exists() else 0
+        # A crash between the two appends leaves one file a row ahead; trim both to the shorter
+        count = min(len(keys), size // self._row_bytes)
+        if count != len(keys) or count * self._row_bytes != size:
+            with open(self._vectors_file, "ab") as f:
+                f.truncate(count * self._row_bytes)
+            self._keys_file.write_text("".join(f"{key}\n" for key in keys[:count]))
+        if count:
+            self._rows = np.fromfile(self._vectors_file, dtype=self.dtype).reshape(count, self.dimensions)
+        self._index = {key: row for row, key in enumerate(keys[:count])}
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, key):
+        """Cached vector for a text hash as a list of floats, or None."""
+        row = self._index.get(key)
+        if row is None:
+            return None
+        return self._rows[row].astype(np.float32).tolist()
+
+    def put_many(self, items):
+        """
+        Append vectors that are not cached yet.
+
+        Args:
+            items (list): (text hash, vector) pairs
+        """
+        with self._lock:
+            fresh = {}
+            for key, vector in items:
+                if key not in self._index and key not in fresh and len(vector) == self.dimensions:
+                    fresh[key] = vector
+            if not fresh:
+                return
+            block = np.asarray(list(fresh.values()), dtype=self.dtype)
+            with open(self._vectors_file, "ab") as f:
+                f.write(block.tobytes())
+            with open(self._keys_file, "a") as f:
+                f.write("".join(f"{key}\n" for key in fresh))
+            start = len(self._rows)
+            self._rows = np.concatenate([self._rows, block])
+            self._index.update({key: start + i for i, key in enumerate(fresh)})
+
+
+@dataclass
+class BatchingOllamaEmbedder(OllamaEmbedder):
+    """
+    OllamaEmbedder that embeds in batches with bounded concurrency and caches every vector on disk.
+
+    Args:
+        batch_size (int): Texts sent in one /api/embed request
+        max_in_flight (int): Batches requested concurrently
+        cache_dir (str): Cache root (default: EMBEDDING_CACHE_DIR); empty or None disables caching
+        cache_dtype (str): "float16" or "float32"
+    """
+
+    batch_size: int = 32
+    max_in_flight: int = 4
+    cache_dir: Optional[str] = DEFAULT_CACHE_DIR
+    cache_dtype: str = "float16"
+    _cache: Optional[EmbeddingCache] = None
+
+    @property
+    def cache(self):
+        if self._cache is None and self.cache_dir:
+            self._cache = EmbeddingCache(self.cache_dir, self.id, self.dimensions, self.cache_dtype)
+        return self._cache
+
+    def _embed_request(self, texts):
+        """One /api/embed call for a batch; returns one vector per text."""
+        kwargs = {}
+        if self.options is not None:
+            kwargs["options"] = self.options
+        response = self.client.embed(input=texts, model=self.id, **kwargs)
+        embeddings = response["embeddings"] if response and "embeddings" in response else None
+        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings from {self.id}, got {len(embeddings or [])}")
+        for embedding in embeddings:
+            if len(embedding) != self.dimensions:
+                raise ValueError(f"Expected embedding dimension {self.dimensions}, but got {len(embedding)}")
+        return embeddings
+
+    def embed_batch(self, texts):
+        """
+        Embed many texts, requesting only those missing from the cache.
+
+        Duplicates are embedded once. Errors from Ollama are raised rather than
+        turned into empty vectors, so a bulk load fails loudly.
+
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            list: One vector (list of floats) per text, in input order
+        """
+        keys = [text_hash(text) for text in texts]
+        vectors = {}
+        missing = {}
+        for key, text in zip(keys, texts):
+            cached = self.cache.get(key) if self.cache is not None else None
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                missing.setdefault(key, text)
+
+        if missing:
+            pending = list(missing.items())
+            batches = [pending[i : i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+
+            def run(batch):
+                embeddings = self._embed_request([text for _, text in batch])
+                pairs = [(key, embedding) for (key, _), embedding in zip(batch, embeddings)]
+                # Cache each batch as it lands so an interrupted load keeps its progress
+                if self.cache is not None:
+                    self.cache.put_many(pairs)
+                return pairs
+
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_in_flight, len(batches)))) as pool:
+                for pairs in pool.map(run, batches):
+                    vectors.update(pairs)
+
+        return [vectors[key] for key in keys]
+
+    def get_embedding(self, text: str) -> List[float]:
+        key = text_hash(text)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        embedding = super().get_embedding(text)
+        if embedding and self.cache is not None:
+            self.cache.put_many([(key, embedding)])
+        return embedding
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        return self.get_embedding(text), None
+
+
+def warm_documents(embedder, documents):
+    """
+    Batch-embed documents ahead of a PgVector upsert, which embeds one document at a time.
+
+    Plain OllamaEmbedders are left alone; their upsert embeds as before.
+
+    Returns:
+        int: Number of documents embedded in batches
+    """
+    if not isinstance(embedder, BatchingOllamaEmbedder) or not documents:
+        return 0
+    try:
+        embedder.embed_batch([doc.content for doc in documents])
+    except Exception as e:
+        # The upsert still embeds (and caches) each document on its own
+        logger.warning(f"Batch embedding failed, falling back to one request per chunk: {e}")
+        return 0
+    return len(documents)
@@ -0,0 +1,177 @@
+"""
+Incremental ingestion of the AI Evals Guide into the eval_guide vector store
+(the PgVector table, or the local index when EVALS_VECTOR_DB=local).
+
+Each PDF is fingerprinted with a SHA-256 of its bytes, and each chunk with the
+same MD5 content hash PgVector keeps in its content_hash column (also used as
+the row id). A PDF whose fingerprint matches the rows already stored is skipped
+without being parsed. A changed PDF is re-chunked, and only chunks whose hash
+is not in the table are embedded and upserted. Chunks that disappeared from the
+new version are deleted. Re-running after editing the guide therefore embeds
+only the edited chunks instead of the whole document. New chunks are embedded
+in concurrent batches (see embedding.py) before the upsert.
+
+Usage (ingest.py in the Evals directory, or python -m evalgen.ingest):
+    python ingest.py                      # AI_EVALS_GUIDE_PATH
+    python ingest.py guide.pdf other.pdf  # explicit files or directories
+    python ingest.py --dry-run            # report what would change
+"""
+
+import argparse
+import json
+import os
+import time
+
+from agno.utils.string import safe_content_hash
+from sqlalchemy import cast, delete, literal, select, update
+from sqlalchemy.dialects import postgresql
+
+from .embedding import warm_documents
+from .knowledge import build_knowledge_base, file_hash, pdf_files
+from .local_index import LocalVectorDb
+
+# Metadata key holding the fingerprint of the PDF a chunk came from
+FILE_HASH_KEY = "file_hash"
+
+
+def stored_chunks(vector_db, name):
+    """
+    Content hashes stored for a document name, with the PDF fingerprint each was ingested from.
+
+    Returns:
+        dict: {content_hash: file_hash}
+    """
+    if isinstance(vector_db, LocalVectorDb):
+        return vector_db.fingerprints(name, FILE_HASH_KEY)
+    if not vector_db.exists():
+        return {}
+    table = vector_db.table
+    with vector_db.Session() as sess:
+        rows = sess.execute(
+            select(table.c.content_hash, table.c.meta_data[FILE_HASH_KEY].astext).where(table.c.name == name)
+        ).all()
+    return {content_hash: fingerprint for content_hash, fingerprint in rows}
+
+
+def chunk_pdf(knowledge_base, path, fingerprint):
+    """
+    Read and chunk a PDF, keyed by content hash so identical chunks collapse to one row.
+
+    Returns:
+        tuple: (document name, {content_hash: Document})
+    """
+    documents = knowledge_base.reader.read(pdf=path)
+    chunks = {}
+    for doc in documents:
+        content_hash = safe_content_hash(doc.content)
+        # A stable id makes re-ingestion update rows instead of adding duplicates
+        doc.id = content_hash
+        doc.meta_data[FILE_HASH_KEY] = fingerprint
+        doc.meta_data["source"] = path.name
+        chunks.setdefault(content_hash, doc)
+    name = documents[0].name if documents else path.stem
+    return name, chunks
+
+
+def ingest_pdf(knowledge_base, path, dry_run=False, prune=True):
+    """
+    Bring the stored chunks of one PDF in line with its current content.
+
+    Args:
+        knowledge_base (PDFKnowledgeBase): Knowledge base whose reader and vector_db are used
+        path (Path): PDF to ingest
+        dry_run (bool): Only report what would change
+        prune (bool): Delete stored chunks that are no longer in the PDF
+
+    Returns:
+        dict: Counts of added, kept and removed chunks, and whether the file was skipped
+    """
+    vector_db = knowledge_base.vector_db
+    fingerprint = file_hash(path)
+    # PDFReader names documents after the file stem
+    stored = stored_chunks(vector_db, path.stem)
+    if stored and set(stored.values()) == {fingerprint}:
+        return {"file": str(path), "skipped": True, "added": 0, "kept": len(stored), "removed": 0}
+
+    name, chunks = chunk_pdf(knowledge_base, path, fingerprint)
+    if name != path.stem:
+        stored = stored_chunks(vector_db, name)
+    new = [doc for content_hash, doc in chunks.items() if content_hash not in stored]
+    kept = [content_hash for content_hash in chunks if content_hash in stored]
+    stale = [content_hash for content_hash in stored if content_hash not in chunks] if prune else []
+
+    if not dry_run:
+        if new:
+            # PgVector embeds one document per request; batch them into the embedding cache first
+            warm_documents(vector_db.embedder, new)
+            vector_db.upsert(documents=new)
+        if isinstance(vector_db, LocalVectorDb):
+            vector_db.update_chunks(name, kept, {FILE_HASH_KEY: fingerprint}, stale)
+        else:
+            table = vector_db.table
+            with vector_db.Session() as sess:
+                if kept:
+                    # Unchanged chunks keep their embedding; only their fingerprint moves on
+                    patch = cast(literal(json.dumps({FILE_HASH_KEY: fingerprint})), postgresql.JSONB)
+                    sess.execute(
+                        update(table)
+                        .where(table.c.name == name, table.c.content_hash.in_(kept))
+                        .values(meta_data=table.c.meta_data.op("||")(patch))
+                    )
+                if stale:
+                    sess.execute(delete(table).where(table.c.name == name, table.c.content_hash.in_(stale)))
+                sess.commit()
+
+    return {"file": str(path), "skipped": False, "added": len(new), "kept": len(kept), "removed": len(stale)}
+
+
+def ingest(paths=None, db_url=None, dry_run=False, prune=True):
+    """
+    Ingest PDFs into the eval_guide vector store, embedding only new or changed chunks.
+
+    Args:
+        paths (list): PDF files or directories (default: AI_EVALS_GUIDE_PATH)
+        db_url (str): PgVector database URL (default: PGVECTOR_DB_URL)
+        dry_run (bool): Only report what would change
+        prune (bool): Delete stored chunks that are no longer in their PDF
+
+    Returns:
+        list: One result dict per PDF
+    """
+    if not paths:
+        guide_path = os.getenv("AI_EVALS_GUIDE_PATH", "")
+        if not guide_path:
+            raise ValueError("No PDF given and AI_EVALS_GUIDE_PATH is not set")
+        paths = [guide_path]
+
+    knowledge_base = build_knowledge_base(pdf_path=paths[0], db_url=db_url)
+    if not dry_run and not knowledge_base.vector_db.exists():
+        knowledge_base.vector_db.create()
+
+    return [ingest_pdf(knowledge_base, path, dry_run=dry_run, prune=prune) for path in pdf_files(paths)]
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Incrementally ingest PDFs into the eval_guide vector store")
+    parser.add_argument("paths", nargs="*", help="PDF files or directories (default: AI_EVALS_GUIDE_PATH)")
+    parser.add_argument("--db-url", default=None, help="PgVector URL (default: PGVECTOR_DB_URL)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    parser.add_argument("--no-prune", action="store_true", help="Keep chunks that are no longer in the PDF")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = ingest(args.paths, db_url=args.db_url, dry_run=args.dry_run, prune=not args.no_prune)
+    for result in results:
+        state = "unchanged, skipped" if result["skipped"] else "updated"
+        print(
+            f"{result['file']}: {state} "
+            f"(+{result['added']} embedded, {result['kept']} kept, -{result['removed']} removed)"
+        )
+    print(f"Done in {time.perf_counter() - start:.1f}s{' (dry run)' if args.dry_run else ''}")
+
+
+if __name__ == "__main__":
+    main()
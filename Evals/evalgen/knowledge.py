@@ -0,0 +1,118 @@
+"""
+Shared setup of the AI Evals Guide knowledge base, used by the pipeline and by
+the ingestion CLI (ingest.py) so both read and write the same table.
+
+EVALS_VECTOR_DB picks the store: "pgvector" (default) or "local", an in-process
+index in LOCAL_INDEX_DIR that needs no database (see local_index.py).
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+DEFAULT_DB_URL = "postgresql+psycopg://ai:ai@localhost:5532/ai"
+TABLE_NAME = "eval_guide"
+EMBEDDER_ID = "nomic-embed-text"
+EMBEDDER_DIMENSIONS = 768
+# Chunks per /api/embed request and requests kept in flight during ingestion
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))
+EMBED_MAX_IN_FLIGHT = int(os.getenv("EMBED_MAX_IN_FLIGHT", "4"))
+# Vector store backend ("pgvector" or "local") and where the local index lives
+VECTOR_DB_BACKENDS = ("pgvector", "local")
+DEFAULT_LOCAL_INDEX_DIR = ".vector_index"
+
+
+def file_hash(path, block_size=1 << 20):
+    """SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pdf_files(paths):
+    """Expand files and directories into a sorted list of PDF paths."""
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            found.extend(sorted(path.glob("**/*.pdf")))
+        elif path.suffix.lower() == ".pdf" and path.is_file():
+            found.append(path)
+        else:
+            raise FileNotFoundError(f"Not a PDF file or directory: {path}")
+    return found
+
+
+# agno, NumPy and the database drivers are imported inside the builders, so
+# importing this module (and evalgen) stays cheap until a knowledge base is needed
+def build_embedder():
+    from .embedding import BatchingOllamaEmbedder
+
+    return BatchingOllamaEmbedder(
+        id=EMBEDDER_ID,
+        dimensions=EMBEDDER_DIMENSIONS,
+        batch_size=EMBED_BATCH_SIZE,
+        max_in_flight=EMBED_MAX_IN_FLIGHT,
+    )
+
+
+def build_vector_db(db_url=None, backend=None):
+    """
+    Create the vector store holding the eval_guide chunks.
+
+    Args:
+        db_url (str): SQLAlchemy URL of the PgVector database (default: PGVECTOR_DB_URL)
+        backend (str): "pgvector" or "local" (default: EVALS_VECTOR_DB, else pgvector)
+
+    Returns:
+        VectorDb: PgVector table, or a LocalVectorDb under LOCAL_INDEX_DIR/eval_guide
+    """
+    from agno.vectordb.search import SearchType
+
+    if backend is None:
+        backend = os.getenv("EVALS_VECTOR_DB", "pgvector").lower()
+    if backend not in VECTOR_DB_BACKENDS:
+        raise ValueError(f"Unknown EVALS_VECTOR_DB '{backend}', expected one of {', '.join(VECTOR_DB_BACKENDS)}")
+
+    if backend == "local":
+        from .local_index import LocalVectorDb
+
+        index_dir = os.getenv("LOCAL_INDEX_DIR", DEFAULT_LOCAL_INDEX_DIR)
+        return LocalVectorDb(
+            path=os.path.join(index_dir, TABLE_NAME),
+            embedder=build_embedder(),
+            search_type=SearchType.hybrid,
+        )
+
+    # Imported here so the local backend runs without the Postgres drivers installed
+    from agno.vectordb.pgvector import PgVector
+
+    if db_url is None:
+        db_url = os.getenv("PGVECTOR_DB_URL", DEFAULT_DB_URL)
+    return PgVector(
+        table_name=TABLE_NAME,
+        db_url=db_url,
+        search_type=SearchType.hybrid,
+        embedder=build_embedder(),
+    )
+
+
+def build_knowledge_base(pdf_path=None, db_url=None, backend=None):
+    """
+    Create the PDF knowledge base backed by the eval_guide vector store.
+
+    Args:
+        pdf_path (str): PDF file or directory (default: AI_EVALS_GUIDE_PATH)
+        db_url (str): SQLAlchemy URL of the PgVector database (default: PGVECTOR_DB_URL)
+        backend (str): "pgvector" or "local" (default: EVALS_VECTOR_DB, else pgvector)
+
+    Returns:
+        PDFKnowledgeBase: Knowledge base; nothing is read or embedded until it is loaded
+    """
+    from agno.knowledge.pdf import PDFKnowledgeBase
+
+    if pdf_path is None:
+        pdf_path = os.getenv("AI_EVALS_GUIDE_PATH", "")
+
+    return PDFKnowledgeBase(path=pdf_path, vector_db=build_vector_db(db_url=db_url, backend=backend))
@@ -0,0 +1,463 @@
+"""
+In-process vector store for the Evals knowledge base, for running without Postgres.
+
+LocalVectorDb implements agno's VectorDb interface over files in one directory:
+    documents.json  id, name, meta_data, content and content_hash of every chunk
+    vectors.npy     unit-length float32 embeddings, one row per chunk, memory-mapped
+    ivf.npz         IVF centroids and list assignments (only for larger corpora)
+
+Vector search is cosine similarity. Up to IVF_MIN_ROWS chunks it is exact; above
+that, k-means centroids partition the rows and only the nprobe nearest lists are
+scanned. A BM25 index over the chunk text is rebuilt in memory on load (a single
+guide is a few hundred chunks, so this takes milliseconds). Hybrid search scores
+the union of the vector and BM25 candidates like PgVector does:
+    vector_score_weight * 1 / (1 + cosine distance) + (1 - vector_score_weight) * text score
+with the BM25 scores scaled to 0..1 per query.
+
+Select it with EVALS_VECTOR_DB=local (see knowledge.py).
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import shutil
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+
+import numpy as np
+from agno.document import Document
+from agno.utils.log import log_debug, logger
+from agno.utils.string import safe_content_hash
+from agno.vectordb.base import VectorDb
+from agno.vectordb.search import SearchType
+
+# Below this many chunks every search is exact; IVF only pays off on bigger corpora
+IVF_MIN_ROWS = 1024
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have if in into is it its of on or "
+    "that the their then there these this to was were will with".split()
+)
+
+
+def tokenize(text):
+    """Lower-cased word tokens without common English stopwords."""
+    return [token for token in re.findall(r"\w+", text.lower()) if token not in STOPWORDS]
+
+
+class BM25:
+    """
+    Okapi BM25 over a fixed list of texts.
+
+    Args:
+        texts (list): Documents to index
+        k1 (float): Term-frequency saturation
+        b (float): Length normalisation
+    """
+
+    def __init__(self, texts, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(texts)
+        self.lengths = np.zeros(self.size, dtype=np.float32)
+        postings = defaultdict(list)
+        for row, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths[row] = sum(counts.values())
+            for term, count in counts.items():
+                postings[term].append((row, count))
+        self.average_length = float(self.lengths.mean()) if self.size else 0.0
+        # term -> (rows, term frequencies, idf)
+        self.postings = {}
+        for term, entries in postings.items():
+            rows, counts = zip(*entries)
+            idf = math.log(1 + (self.size - len(rows) + 0.5) / (len(rows) + 0.5))
+            self.postings[term] = (np.array(rows), np.array(counts, dtype=np.float32), idf)
+
+    def scores(self, query):
+        """BM25 score of every document for a query."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        if not self.size:
+            return scores
+        norm = self.k1 * (1 - self.b + self.b * self.lengths / max(self.average_length, 1e-9))
+        # Sorted so the float sums, and therefore ties, come out the same in every process
+        for term in sorted(set(tokenize(query))):
+            if term not in self.postings:
+                continue
+            rows, counts, idf = self.postings[term]
+            scores[rows] += idf * counts * (self.k1 + 1) / (counts + norm[rows])
+        return scores
+
+
+def kmeans(vectors, clusters, iterations=10, seed=0):
+    """
+    Spherical k-means on unit vectors, seeded for reproducible indexes.
+
+    Returns:
+        tuple: (centroids, assignment of each row)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(clusters):
+            members = vectors[assignment == cluster]
+            if len(members):
+                centroid = members.sum(axis=0)
+                centroids[cluster] = centroid / max(np.linalg.norm(centroid), 1e-12)
+    return centroids, np.argmax(vectors @ centroids.T, axis=1)
+
+
+class LocalVectorDb(VectorDb):
+    """
+    File-backed vector store with an IVF vector index and a BM25 keyword index.
+
+    Args:
+        path (str): Directory holding the index files
+        embedder (Embedder): Embedder for documents and queries
+        search_type (SearchType): vector, keyword or hybrid
+        vector_score_weight (float): Weight of the vector score in hybrid search
+        nprobe (int): IVF lists scanned per query (default: a quarter of them, at least 4)
+    """
+
+    def __init__(self, path, embedder, search_type=SearchType.hybrid, vector_score_weight=0.5, nprobe=None):
+        if not 0 <= vector_score_weight <= 1:
+            raise ValueError("vector_score_weight must be between 0 and 1")
+        self.path = Path(path)
+        self.embedder = embedder
+        self.dimensions = embedder.dimensions
+        self.search_type = search_type
+        self.vector_score_weight = vector_score_weight
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    # --- Storage ---
+
+    @property
+    def _documents_file(self):
+        return self.path / "documents.json"
+
+    @property
+    def _vectors_file(self):
+        return self.path / "vectors.npy"
+
+    @property
+    def _ivf_file(self):
+        return self.path / "ivf.npz"
+
+    def _load(self):
+        """Read the index files once; vectors stay memory-mapped."""
+        with self._lock:
+            if self._loaded:
+                return
+            self.records = []
+            self.vectors = np.zeros((0, self.dimensions), dtype=np.float32)
+            self.centroids = None
+            self.lists = []
+            if self._documents_file.exists():
+                self.records = json.loads(self._documents_file.read_text())
+                if self.records:
+                    self.vectors = np.load(self._vectors_file, mmap_mode="r")
+                if self._ivf_file.exists():
+                    ivf = np.load(self._ivf_file)
+                    self.centroids = ivf["centroids"]
+                    assignment = ivf["assignment"]
+                    self.lists = [np.flatnonzero(assignment == c) for c in range(len(self.centroids))]
+            self.positions = {record["id"]: row for row, record in enumerate(self.records)}
+            self.bm25 = BM25([record["content"] for record in self.records])
+            self._loaded = True
+
+    def _write(self, records, vectors):
+        """Replace the index files with new contents and reload them."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimensions)
+        # Write to temporary names and swap in, so a crash never leaves a half-written index
+        with open(self.path / "vectors.tmp.npy", "wb") as f:
+            np.save(f, vectors)
+        if len(vectors) >= IVF_MIN_ROWS:
+            centroids, assignment = kmeans(vectors, int(math.sqrt(len(vectors))))
+            with open(self.path / "ivf.tmp.npz", "wb") as f:
+                np.savez(f, centroids=centroids, assignment=assignment)
+            os.replace(self.path / "ivf.tmp.npz", self._ivf_file)
+        elif self._ivf_file.exists():
+            self._ivf_file.unlink()
+        os.replace(self.path / "vectors.tmp.npy", self._vectors_file)
+        (self.path / "documents.tmp.json").write_text(json.dumps(records))
+        os.replace(self.path / "documents.tmp.json", self._documents_file)
+        self._loaded = False
+        self._load()
+
+    def _embed(self, documents):
+        """Unit-length embeddings for documents, batched when the embedder supports it."""
+        if hasattr(self.embedder, "embed_batch"):
+            embeddings = self.embedder.embed_batch([doc.content for doc in documents])
+        else:
+            embeddings = [self.embedder.get_embedding(doc.content) for doc in documents]
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(documents), self.dimensions)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def create(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        if not self._documents_file.exists():
+            self._write([], np.zeros((0, self.dimensions), dtype=np.float32))
+
+    async def async_create(self):
+        await asyncio.to_thread(self.create)
+
+    def exists(self):
+        return self._documents_file.exists()
+
+    async def async_exists(self):
+        return self.exists()
+
+    def drop(self):
+        with self._lock:
+            if self.path.exists():
+                shutil.rmtree(self.path)
+            self._loaded = False
+
+    async def async_drop(self):
+        await asyncio.to_thread(self.drop)
+
+    def delete(self):
+        self.drop()
+        self.create()
+        return True
+
+    def optimize(self):
+        """Rebuild the IVF lists from the current vectors."""
+        with self._lock:
+            self._load()
+            self._write(self.records, np.asarray(self.vectors))
+
+    def get_count(self):
+        self._load()
+        return len(self.records)
+
+    # --- Writes ---
+
+    def doc_exists(self, document):
+        self._load()
+        content_hash = safe_content_hash(document.content)
+        return any(record["content_hash"] == content_hash for record in self.records)
+
+    async def async_doc_exists(self, document):
+        return self.doc_exists(document)
+
+    def name_exists(self, name):
+        self._load()
+        return any(record["name"] == name for record in self.records)
+
+    async def async_name_exists(self, name):
+        return self.name_exists(name)
+
+    def id_exists(self, id):
+        self._load()
+        return id in self.positions
+
+    def upsert_available(self):
+        return True
+
+    def upsert(self, documents, filters=None):
+        """Insert documents, replacing any stored under the same id."""
+        if not documents:
+            return
+        vectors = self._embed(documents)
+        with self._lock:
+            self._load()
+            records = list(self.records)
+            stored = np.array(self.vectors)
+            positions = dict(self.positions)
+            added = []
+            for doc, vector in zip(documents, vectors):
+                content = doc.content.replace("\x00", "\ufffd")
+                content_hash = safe_content_hash(content)
+                record = {
+                    "id": doc.id or content_hash,
+                    "name": doc.name,
+                    "meta_data": doc.meta_data,
+                    "filters": filters,
+                    "content": content,
+                    "content_hash": content_hash,
+                }
+                if record["id"] in positions:
+                    row = positions[record["id"]]
+                    records[row] = record
+                    stored[row] = vector
+                else:
+                    positions[record["id"]] = len(records)
+                    records.append(record)
+                    added.append(vector)
+            if added:
+                stored = np.concatenate([stored, np.asarray(added, dtype=np.float32)])
+            self._write(records, stored)
+        log_debug(f"Upserted {len(documents)} documents into {self.path}")
+
+    async def async_upsert(self, documents, filters=None):
+        await asyncio.to_thread(self.upsert, documents, filters)
+
+    def insert(self, documents, filters=None):
+        self.upsert(documents, filters)
+
+    async def async_insert(self, documents, filters=None):
+        await asyncio.to_thread(self.insert, documents, filters)
+
+    def fingerprints(self, name, key):
+        """
+        Content hashes stored for a document name, with the value of one meta_data key.
+
+        Returns:
+            dict: {content_hash: meta_data[key]}
+        """
+        if not self.exists():
+            return {}
+        self._load()
+        return {
+            record["content_hash"]: (record["meta_data"] or {}).get(key)
+            for record in self.records
+            if record["name"] == name
+        }
+
+    def update_chunks(self, name, patch_hashes, patch, delete_hashes):
+        """
+        Merge `patch` into the meta_data of some chunks of a document and delete others.
+
+        Args:
+            name (str): Document name
+            patch_hashes (list): Content hashes whose meta_data is updated
+            patch (dict): Keys to set in meta_data
+            delete_hashes (list): Content hashes to remove
+        """
+        if not patch_hashes and not delete_hashes:
+            return
+        patch_hashes, delete_hashes = set(patch_hashes), set(delete_hashes)
+        with self._lock:
+            self._load()
+            records, keep = [], []
+            for row, record in enumerate(self.records):
+                if record["name"] == name and record["content_hash"] in delete_hashes:
+                    continue
+                if record["name"] == name and record["content_hash"] in patch_hashes:
+                    record = {**record, "meta_data": {**(record["meta_data"] or {}), **patch}}
+                records.append(record)
+                keep.append(row)
+            self._write(records, np.asarray(self.vectors)[keep])
+
+    # --- Search ---
+
+    def _matches(self, filters):
+        """Rows whose meta_data contains every filter key/value."""
+        if not filters:
+            return None
+        return np.array(
+            [all((record["meta_data"] or {}).get(k) == v for k, v in filters.items()) for record in self.records],
+            dtype=bool,
+        )
+
+    def _query_vector(self, query):
+        embedding = self.embedder.get_embedding(query)
+        if not embedding:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(np.linalg.norm(vector), 1e-12)
+
+    def _candidates(self, vector):
+        """Rows to score for a query vector: all of them, or the nearest IVF lists (sorted for sequential reads)."""
+        if self.centroids is None:
+            return np.arange(len(self.records))
+        nprobe = self.nprobe or max(4, len(self.centroids) // 4)
+        nearest = np.argsort(-(self.centroids @ vector))[:nprobe]
+        return np.sort(np.concatenate([self.lists[c] for c in nearest]))
+
+    def _documents(self, rows, scores=None):
+        documents = []
+        for row in rows:
+            record = self.records[row]
+            meta_data = dict(record["meta_data"] or {})
+            if scores is not None:
+                meta_data["score"] = round(float(scores[row]), 6)
+            documents.append(
+                Document(
+                    id=record["id"],
+                    name=record["name"],
+                    meta_data=meta_data,
+                    content=record["content"],
+                    embedder=self.embedder,
+                    embedding=np.asarray(self.vectors[row]).tolist(),
+                )
+            )
+        return documents
+
+    @staticmethod
+    def _top(scores, rows, limit):
+        """The `limit` best rows by descending score, ties broken by row for stable results."""
+        rows = np.asarray(rows)
+        if not len(rows):
+            return rows
+        order = np.lexsort((rows, -scores[rows]))
+        return rows[order[:limit]]
+
+    def vector_search(self, query, limit=5, filters=None):
+        self._load()
+        vector = self._query_vector(query)
+        if vector is None or not self.records:
+            return []
+        rows = self._candidates(vector)
+        mask = self._matches(filters)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        scores = np.full(len(self.records), -np.inf, dtype=np.float32)
+        scores[rows] = np.asarray(self.vectors[rows]) @ vector
+        return self._documents(self._top(scores, rows, limit), scores)
+
+    def keyword_search(self, query, limit=5, filters=None):
+        self._load()
+        scores = self.bm25.scores(query)
+        rows = np.flatnonzero(scores > 0)
+        mask = self._matches(filters)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        return self._documents(self._top(scores, rows, limit), scores)
+
+    def hybrid_search(self, query, limit=5, filters=None):
+        self._load()
+        if not self.records:
+            return []
+        vector = self._query_vector(query)
+        if vector is None:
+            logger.error(f"Error getting embedding for Query: {query}")
+            return []
+        pool = max(limit * 4, 20)
+        text_scores = self.bm25.scores(query)
+        if text_scores.max() > 0:
+            text_scores = text_scores / text_scores.max()
+        candidates = self._candidates(vector)
+        vector_scores = np.asarray(self.vectors[candidates]) @ vector
+        # Union of the best vector matches and every keyword match
+        rows = np.union1d(candidates[np.argsort(-vector_scores)[:pool]], np.flatnonzero(text_scores > 0))
+        mask = self._matches(filters)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        if not len(rows):
+            return []
+        cosine = np.asarray(self.vectors[rows]) @ vector
+        scores = np.zeros(len(self.records), dtype=np.float32)
+        scores[rows] = self.vector_score_weight / (2 - cosine) + (1 - self.vector_score_weight) * text_scores[rows]
+        return self._documents(self._top(scores, rows, limit), scores)
+
+    def search(self, query, limit=5, filters=None):
+        if self.search_type == SearchType.vector:
+            return self.vector_search(query, limit, filters)
+        if self.search_type == SearchType.keyword:
+            return self.keyword_search(query, limit, filters)
+        if self.search_type == SearchType.hybrid:
+            return self.hybrid_search(query, limit, filters)
+        logger.error(f"Invalid search type '{self.search_type}'.")
+        return []
+
+    async def async_search(self, query, limit=5, filters=None):
+        return await asyncio.to_thread(self.search, query, limit, filters)
@@ -0,0 +1,410 @@
+"""
+The plan -> framework generation pipeline, without any Streamlit dependency.
+
+EvalPipeline owns the knowledge base, agents and result cache and creates each
+of them on first use. Constructing one is free, so the Streamlit page, the
+batch CLI or any other process can hold one and pay for PgVector, Ollama and
+agno only when a requirement is actually generated. The guide is searched once
+per request (retrieval.py) and the same excerpts go into both prompts; the
+agents themselves don't search. Errors are raised (and
+logged) rather than shown, so each caller decides how to report them.
+"""
+
+import logging
+import threading
+import time
+
+from .knowledge import build_knowledge_base
+from .result_cache import ResultCache, framework_key, knowledge_version, plan_key
+from .retrieval import Retriever
+
+logger = logging.getLogger("evalgen")
+
+# Groq models used when a caller doesn't choose (the app's sidebar defaults)
+DEFAULT_PLANNING_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+DEFAULT_KNOWLEDGE_MODEL = "meta-llama/llama-4-maverick-17b-128e-instruct"
+
+# Instructions are part of the result cache key: editing them invalidates cached results
+PLANNING_INSTRUCTIONS = [
+    "You are an expert AI evaluation planning agent.",
+    "Analyze the provided chatbot requirements meticulously.",
+    "Break down the requirements into clear, distinct evaluation dimensions.",
+    "For each dimension, identify:",
+    "  - Essential features the chatbot *must* have.",
+    "  - Potential edge cases or challenging scenarios.",
+    "  - Critical evaluation metrics (both qualitative and quantitative where applicable).",
+    "Output *only* a structured plan in well-formatted Markdown format.",
+    "Do not include conversational filler, apologies, or summaries of your own instructions.",
+    "The plan should be directly usable for creating a detailed evaluation framework.",
+    "Ground the plan in the excerpts from the AI Evals Guide included with the requirements.",
+]
+
+KNOWLEDGE_INSTRUCTIONS = [
+    "You are a specialized agent tasked with creating comprehensive AI evaluation frameworks based on the AI Evals Guide principles.",
+    "Given the user's chatbot requirements and a structured evaluation plan, generate a detailed evaluation framework.",
+    "Strictly follow the 4-step process outlined in the AI Evals Guide:",
+    "1.  **Create 'Goldens':** Provide *at least 5* detailed examples. Each example must include a realistic user input and the corresponding ideal chatbot output.",
+    "2.  **Generate Synthetic Data:** Clearly explain the strategy for generating synthetic data. Provide *specific examples* of prompts you would use to generate variations for testing different scenarios (e.g., edge cases, different tones).",
+    "3.  **Grade Outputs:** Define clear, measurable evaluation metrics and detailed rubrics for grading the chatbot's actual outputs against the 'Goldens' or ideal responses. Cover dimensions identified in the plan (e.g., accuracy, tone, helpfulness, safety).",
+    "4.  **Build Autoraters:** Provide specific, actionable instructions for creating automated evaluation tools ('autoraters'). Include example prompts or criteria that an LLM-based autorater could use.",
+    "Tailor all examples, metrics, and instructions specifically to the provided chatbot requirements and evaluation plan.",
+    "Cite relevant sections from the AI Evals Guide document when applicable (e.g., 'Referencing Section 2.2 of the guide...'). The relevant excerpts are included in the prompt.",
+    "Output *only* the complete 4-step evaluation framework in well-formatted Markdown.",
+    "Do not add introductory or concluding remarks outside the framework structure.",
+]
+
+
+def build_planning_agent(knowledge_base, model_id):
+    """Creates the planning agent using the specified Groq model ID."""
+    from agno.agent import Agent
+    from agno.models.groq import Groq
+
+    return Agent(
+        model=Groq(id=model_id), # Use selected Groq model
+        knowledge=knowledge_base,
+        search_knowledge=False, # Retrieval runs once per request in generate_chatbot_eval
+        instructions=PLANNING_INSTRUCTIONS,
+        markdown=True, # Request clean markdown output
+    )
+
+
+def build_knowledge_agent(knowledge_base, model_id):
+    """Creates the knowledge agent using the specified Groq model ID."""
+    from agno.agent import Agent
+    from agno.models.groq import Groq
+
+    return Agent(
+        model=Groq(id=model_id), # Use selected Groq model
+        knowledge=knowledge_base,
+        search_knowledge=False, # Retrieval runs once per request in generate_chatbot_eval
+        instructions=KNOWLEDGE_INSTRUCTIONS,
+        markdown=True, # Request clean markdown output
+    )
+
+
+# --- Run one agent stage, streaming when a callback is given ---
+def run_agent_stage(agent, prompt, stage, stream_callback=None):
+    """
+    Run one agent and measure how quickly its output arrives.
+
+    Args:
+        agent (Agent): Agent to run
+        prompt (str): Prompt for this stage
+        stage (str): "plan" or "framework", passed through to the callback
+        stream_callback (func): Optional callback(stage, text_so_far) called for every streamed chunk.
+            Without it the agent runs in blocking mode.
+
+    Returns:
+        tuple: (stripped content, stats dict with ttft_s, duration_s, output_tokens and tokens_per_sec)
+    """
+    from agno.run.response import RunEvent
+
+    start = time.perf_counter()
+    first_token = None
+    chunks = 0
+
+    if stream_callback is None:
+        response = agent.run(prompt)
+        if response is None:
+            return "", None
+        content = response.content if isinstance(response.content, str) else str(getattr(response, "content", response))
+    else:
+        parts = []
+        for chunk in agent.run(prompt, stream=True):
+            # Tool calls (knowledge searches) and other events carry no text for the user
+            if getattr(chunk, "event", None) != RunEvent.run_response_content or not isinstance(chunk.content, str):
+                continue
+            if not chunk.content:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter()
+            parts.append(chunk.content)
+            chunks += 1
+            stream_callback(stage, "".join(parts))
+        content = "".join(parts)
+
+    end = time.perf_counter()
+    if first_token is None:
+        first_token = end
+    # Prefer the model's token count; fall back to streamed chunks (about one token each)
+    metrics = getattr(agent.run_response, "metrics", None) or {}
+    output_tokens = sum(metrics.get("output_tokens", [])) or chunks
+    generation_time = end - first_token
+    stats = {
+        "ttft_s": round(first_token - start, 3),
+        "duration_s": round(end - start, 3),
+        "output_tokens": output_tokens,
+        "tokens_per_sec": round(output_tokens / generation_time, 1) if output_tokens and generation_time > 0 else None,
+    }
+    return content.strip(), stats
+
+
+# --- Serve a stage from the result cache, or run it and store the result ---
+def run_cached_stage(cache, key, force_regenerate, agent, prompt, stage, stream_callback=None):
+    """
+    run_agent_stage with a lookup in the content-addressed result cache first.
+
+    Args:
+        cache (ResultCache): Result cache, or None to always run the agent
+        key (str): Cache key of this stage's inputs
+        force_regenerate (bool): Skip the lookup (the new result still replaces the cached one)
+        prompt (str or func): Prompt, or a function building it, called only when the agent runs
+
+    Returns:
+        tuple: (content, stats); stats of a cached result carry "cached": True
+    """
+    if cache is not None and not force_regenerate:
+        entry = cache.get(key)
+        if entry and entry.get("content"):
+            if stream_callback:
+                stream_callback(stage, entry["content"])
+            return entry["content"], {**entry.get("stats", {}), "cached": True}
+
+    if callable(prompt):
+        prompt = prompt()
+    content, stats = run_agent_stage(agent, prompt, stage, stream_callback)
+    if cache is not None and content and stats is not None:
+        cache.put(key, {"stage": stage, "model": getattr(agent.model, "id", None), "content": content, "stats": stats})
+    return content, stats
+
+
+def guide_excerpts(context):
+    """Prompt section carrying the retrieved guide excerpts (empty when nothing was retrieved)."""
+    if not context:
+        return ""
+    return f"""
+    Relevant excerpts from the AI Evals Guide:
+    ```
+{context}
+    ```
+"""
+
+
+# --- CORRECTED generate_chatbot_eval function ---
+def generate_chatbot_eval(
+    user_requirement,
+    planning_agent,
+    knowledge_agent,
+    progress_callback=None,
+    stream_callback=None,
+    cache=None,
+    force_regenerate=False,
+    retriever=None,
+    pdf_path=None,
+):
+    """
+    Generate a comprehensive evaluation framework for a chatbot based on user requirements.
+
+    Args:
+        user_requirement (str): Detailed description of the chatbot requirements
+        planning_agent (Agent): Agent for planning the evaluation structure
+        knowledge_agent (Agent): Agent for generating detailed evaluation framework
+        progress_callback (func): Optional callback function for updating progress
+        stream_callback (func): Optional callback(stage, text_so_far); when given, both agents stream their output
+        cache (ResultCache): Optional result cache; plan and framework are looked up and stored separately
+        force_regenerate (bool): Run both agents even if their results are cached
+        retriever (Retriever): Retrieval for this request (default: a new one over planning_agent's knowledge);
+            the guide is searched once and the same excerpts go into both prompts
+        pdf_path (str): Guide PDF(s) behind the agents' knowledge base, hashed into the cache keys
+            (default: AI_EVALS_GUIDE_PATH)
+
+    Returns:
+        dict: Containing the evaluation plan, detailed framework and per-stage timing stats, or None on error.
+    """
+    evaluation_plan = None
+    detailed_eval_framework = None
+    stats = {}
+    kb_version = knowledge_version(pdf_path) if cache is not None else None
+    if retriever is None:
+        retriever = Retriever(planning_agent.knowledge)
+
+    if progress_callback:
+        progress_callback(0.1, "Analyzing requirements with Planning Agent...")
+
+    # First, use the planning agent
+    # Prompts are built only when a stage misses the cache, so fully cached requests never search
+    def planning_prompt():
+        return f"""
+    Analyze the following chatbot requirements and create a structured evaluation plan following your instructions.
+
+    Chatbot Requirements:
+    ```
+    {user_requirement}
+    ```
+    {guide_excerpts(retriever.context(user_requirement))}
+    Ensure the output is only the structured plan in Markdown format.
+    """
+    try:
+        evaluation_plan, stats["plan"] = run_cached_stage(
+            cache,
+            plan_key(user_requirement, planning_agent, kb_version) if cache is not None else None,
+            force_regenerate,
+            planning_agent,
+            planning_prompt,
+            "plan",
+            stream_callback,
+        )
+        if stats["plan"] is None:
+            raise ValueError("Empty response from planning agent")
+
+        # Check if we actually got content after potential extraction/conversion
+        if not evaluation_plan:
+            raise ValueError("Empty plan content from planning agent")
+
+
+    except Exception as e:
+        logger.error(f"Error during planning agent execution: {e}")
+        raise # Re-raise so the caller can report it
+
+    if progress_callback:
+        progress_callback(0.5, "Creating evaluation framework with Knowledge Agent...")
+
+    # Then, use the knowledge agent
+    def knowledge_prompt():
+        return f"""
+    Based on the following chatbot requirements and evaluation plan, create a comprehensive AI evaluation framework following the 4-step process as per your instructions.
+
+    Chatbot Requirements:
+    ```
+    {user_requirement}
+    ```
+
+    Evaluation Plan:
+    ```markdown
+    {evaluation_plan}
+    ```
+    {guide_excerpts(retriever.context(user_requirement))}
+    Ensure the output is only the 4-step framework in Markdown format.
+    """
+    try:
+        detailed_eval_framework, stats["framework"] = run_cached_stage(
+            cache,
+            framework_key(user_requirement, evaluation_plan, knowledge_agent, kb_version) if cache is not None else None,
+            force_regenerate,
+            knowledge_agent,
+            knowledge_prompt,
+            "framework",
+            stream_callback,
+        )
+        if stats["framework"] is None:
+            raise ValueError("Empty response from knowledge agent")
+
+        # Check if we actually got content after potential extraction/conversion
+        if not detailed_eval_framework:
+            raise ValueError("Empty framework content from knowledge agent")
+
+    except Exception as e:
+        logger.error(f"Error during knowledge agent execution: {e}")
+        raise # Re-raise so the caller can report it
+
+    if progress_callback:
+        progress_callback(1.0, "Evaluation framework generation complete!")
+
+    # Ensure both parts were generated successfully before returning
+    # (The checks above should already guarantee this if no exception was raised)
+    if evaluation_plan and detailed_eval_framework:
+        return {
+            "plan": evaluation_plan,
+            "framework": detailed_eval_framework,
+            "stats": stats,
+        }
+    else:
+        # This case should ideally be caught by the exceptions above, but as a fallback:
+        logger.error("Failed to generate either the plan or the framework content (This shouldn't normally be reached).")
+        return None # Indicate failure
+
+
+class EvalPipeline:
+    """
+    Plan -> framework generation with the knowledge base, agents and result cache created on first use.
+
+    Args:
+        pdf_path (str): Guide PDF (default: AI_EVALS_GUIDE_PATH)
+        db_url (str): PgVector URL (default: PGVECTOR_DB_URL)
+        backend (str): "pgvector" or "local" (default: EVALS_VECTOR_DB)
+        use_cache (bool): Look up and store stage results in a ResultCache
+        knowledge_base (PDFKnowledgeBase): Ready-made knowledge base to use instead of building one
+    """
+
+    def __init__(self, pdf_path=None, db_url=None, backend=None, use_cache=True, knowledge_base=None):
+        self.pdf_path = pdf_path
+        self.db_url = db_url
+        self.backend = backend
+        self.use_cache = use_cache
+        self._knowledge_base = knowledge_base
+        self._cache = None
+        self._agents = {}
+        self._lock = threading.Lock()
+
+    @property
+    def knowledge_base(self):
+        if self._knowledge_base is None:
+            with self._lock:
+                if self._knowledge_base is None:
+                    self._knowledge_base = build_knowledge_base(
+                        pdf_path=self.pdf_path, db_url=self.db_url, backend=self.backend
+                    )
+        return self._knowledge_base
+
+    @property
+    def cache(self):
+        if self.use_cache and self._cache is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = ResultCache()
+        return self._cache
+
+    def agents(self, planning_model=None, knowledge_model=None, shared=True):
+        """
+        Planning and knowledge agents for a pair of Groq models.
+
+        Args:
+            shared (bool): Reuse one agent per model across calls; pass False when
+                calls may run concurrently, since an agent keeps per-run state
+
+        Returns:
+            tuple: (planning_agent, knowledge_agent)
+        """
+        planning_model = planning_model or DEFAULT_PLANNING_MODEL
+        knowledge_model = knowledge_model or DEFAULT_KNOWLEDGE_MODEL
+        # Built before taking the lock: the property takes it too on first use
+        knowledge_base = self.knowledge_base
+        if not shared:
+            return (
+                build_planning_agent(knowledge_base, planning_model),
+                build_knowledge_agent(knowledge_base, knowledge_model),
+            )
+        with self._lock:
+            if ("plan", planning_model) not in self._agents:
+                self._agents["plan", planning_model] = build_planning_agent(knowledge_base, planning_model)
+            if ("framework", knowledge_model) not in self._agents:
+                self._agents["framework", knowledge_model] = build_knowledge_agent(knowledge_base, knowledge_model)
+            return self._agents["plan", planning_model], self._agents["framework", knowledge_model]
+
+    def generate(
+        self,
+        user_requirement,
+        planning_model=None,
+        knowledge_model=None,
+        progress_callback=None,
+        stream_callback=None,
+        force_regenerate=False,
+        shared_agents=True,
+    ):
+        """
+        generate_chatbot_eval with this pipeline's agents and result cache.
+
+        Returns:
+            dict: plan, framework and per-stage stats, or None on error
+        """
+        planning_agent, knowledge_agent = self.agents(planning_model, knowledge_model, shared=shared_agents)
+        return generate_chatbot_eval(
+            user_requirement,
+            planning_agent,
+            knowledge_agent,
+            progress_callback=progress_callback,
+            stream_callback=stream_callback,
+            cache=self.cache,
+            force_regenerate=force_regenerate,
+            pdf_path=self.pdf_path,
+        )
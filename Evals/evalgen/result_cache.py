@@ -0,0 +1,145 @@
+"""
+Content-addressed on-disk cache of generated evaluation plans and frameworks.
+
+Each stage result is stored under a SHA-256 of everything that determines it:
+    plan       requirement, planning model id, planning instructions, knowledge-base version
+    framework  requirement, plan text, knowledge model id, knowledge instructions, knowledge-base version
+Because the framework key includes the plan text rather than the planning
+model, switching only the knowledge model reuses the cached plan and reruns
+stage two. The knowledge-base version is a hash of the guide PDFs (ingest.py
+keeps the vector store in sync with them) and of the retrieval settings that
+pick excerpts from them, so editing the guide invalidates both stages.
+
+Entries are JSON files; a hit refreshes the file's mtime, and once the cache
+grows past max_bytes the least recently used entries are deleted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from .knowledge import EMBEDDER_ID, TABLE_NAME, file_hash, pdf_files
+from .retrieval import retrieval_fingerprint
+
+# Where results are cached and how large the cache may grow
+DEFAULT_CACHE_DIR = os.getenv("EVALS_RESULT_CACHE_DIR", ".result_cache")
+DEFAULT_MAX_MB = float(os.getenv("EVALS_RESULT_CACHE_MB", "100"))
+
+# Fingerprints of PDFs already hashed, keyed by (path, mtime, size)
+_pdf_fingerprints = {}
+
+
+def knowledge_version(pdf_path=None):
+    """
+    Version of the knowledge base: a hash of the guide PDFs and how they are embedded and retrieved.
+
+    Args:
+        pdf_path (str): PDF file or directory (default: AI_EVALS_GUIDE_PATH)
+
+    Returns:
+        str: Hex digest; changes whenever a PDF is edited, added or removed
+    """
+    if pdf_path is None:
+        pdf_path = os.getenv("AI_EVALS_GUIDE_PATH", "")
+    digest = hashlib.sha256(f"{TABLE_NAME}\0{EMBEDDER_ID}\0{retrieval_fingerprint()}".encode())
+    if pdf_path and os.path.exists(pdf_path):
+        for path in pdf_files([pdf_path]):
+            stat = path.stat()
+            marker = (str(path), stat.st_mtime_ns, stat.st_size)
+            if marker not in _pdf_fingerprints:
+                _pdf_fingerprints[marker] = file_hash(path)
+            digest.update(f"\0{path.name}\0{_pdf_fingerprints[marker]}".encode())
+    return digest.hexdigest()
+
+
+def agent_fingerprint(agent):
+    """Model id and instruction list of an agent, the parts of it that shape its output."""
+    model_id = getattr(agent.model, "id", None) if agent.model is not None else None
+    instructions = agent.instructions if isinstance(agent.instructions, list) else [str(agent.instructions)]
+    return {"model": model_id, "instructions": instructions}
+
+
+def cache_key(stage, **parts):
+    """SHA-256 over a stage name and its inputs, serialised canonically."""
+    payload = json.dumps({"stage": stage, **parts}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def plan_key(user_requirement, planning_agent, kb_version):
+    return cache_key("plan", requirement=user_requirement, agent=agent_fingerprint(planning_agent), kb=kb_version)
+
+
+def framework_key(user_requirement, evaluation_plan, knowledge_agent, kb_version):
+    return cache_key(
+        "framework",
+        requirement=user_requirement,
+        plan=evaluation_plan,
+        agent=agent_fingerprint(knowledge_agent),
+        kb=kb_version,
+    )
+
+
+class ResultCache:
+    """
+    Directory of JSON entries with least-recently-used eviction by total size.
+
+    Args:
+        directory (str): Cache directory (default: EVALS_RESULT_CACHE_DIR)
+        max_bytes (int): Size limit of all entries together (default: EVALS_RESULT_CACHE_MB)
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.path = Path(directory or DEFAULT_CACHE_DIR)
+        self.max_bytes = int(max_bytes if max_bytes is not None else DEFAULT_MAX_MB * 1024 * 1024)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key):
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """Stored entry for a key, or None; a hit marks the entry as recently used."""
+        path = self._file(key)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        """Store an entry, then evict the least recently used ones if over the size limit."""
+        path = self._file(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({**entry, "created": time.time()}, ensure_ascii=False))
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for path in self.path.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self):
+        for path in self.path.glob("*/*.json"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,120 @@
+"""
+Shared retrieval stage ahead of the planning and knowledge agents.
+
+Instead of each agent running its own knowledge-base searches, the requirement
+is searched once (hybrid search on the vector store), the candidates are
+deduplicated by content and reranked, and the best chunks that fit a fixed
+character budget are pasted into both prompts. A Retriever lives for one
+request and memoizes query -> results, so the framework stage reuses the plan
+stage's search, and a request whose stages are both served from the result
+cache does not search at all.
+
+Reranking fuses the vector store's order with a BM25 ranking of the candidates
+against the requirement (reciprocal rank fusion), with ties broken by content
+hash, so the same candidates always produce the same context.
+"""
+
+import hashlib
+import os
+
+# Chunks fetched per search, and how much of them is pasted into the prompts
+RETRIEVAL_CANDIDATES = int(os.getenv("EVALS_RETRIEVAL_CANDIDATES", "20"))
+CONTEXT_BUDGET_CHARS = int(os.getenv("EVALS_CONTEXT_CHARS", "8000"))
+# Damping constant of reciprocal rank fusion (the usual value from the RRF paper)
+RRF_K = 60
+
+
+def normalize_query(text):
+    """Collapse whitespace so reformatted copies of a query share one memo entry."""
+    return " ".join(text.split())
+
+
+def content_key(document):
+    """MD5 of a chunk's whitespace-normalized text, to spot the same chunk stored twice."""
+    return hashlib.md5(normalize_query(document.content).encode("utf-8")).hexdigest()
+
+
+def rerank(query, documents):
+    """
+    Deduplicate search results and order them by fused vector-store and BM25 rank.
+
+    Args:
+        query (str): Query the documents were retrieved for
+        documents (list): Documents in the vector store's order, best first
+
+    Returns:
+        list: (content key, document) pairs, best first
+    """
+    from .local_index import BM25
+
+    unique = {}
+    for document in documents:
+        if document.content and document.content.strip():
+            unique.setdefault(content_key(document), document)
+    if not unique:
+        return []
+
+    keys = list(unique)
+    bm25 = BM25([unique[key].content for key in keys]).scores(query)
+    bm25_rank = {keys[i]: rank for rank, i in enumerate(sorted(range(len(keys)), key=lambda i: (-bm25[i], keys[i])))}
+    fused = {key: 1 / (RRF_K + rank) + 1 / (RRF_K + bm25_rank[key]) for rank, key in enumerate(keys)}
+    return sorted(((key, unique[key]) for key in keys), key=lambda item: (-fused[item[0]], item[0]))
+
+
+def format_chunk(number, document):
+    """Numbered excerpt header with the chunk's source file and page when known."""
+    source = document.meta_data.get("source") or document.name or "guide"
+    page = document.meta_data.get("page")
+    header = f"[{number}] {source}" + (f", page {page}" if page is not None else "")
+    return f"{header}\n{document.content.strip()}"
+
+
+class Retriever:
+    """
+    Knowledge-base retrieval for one request, with a query -> results memo.
+
+    Args:
+        knowledge_base (AgentKnowledge): Knowledge base to search, or None for no context
+        candidates (int): Chunks fetched per search (default: EVALS_RETRIEVAL_CANDIDATES)
+        budget_chars (int): Maximum length of the context pasted into prompts (default: EVALS_CONTEXT_CHARS)
+    """
+
+    def __init__(self, knowledge_base, candidates=None, budget_chars=None):
+        self.knowledge_base = knowledge_base
+        self.candidates = candidates or RETRIEVAL_CANDIDATES
+        self.budget_chars = budget_chars or CONTEXT_BUDGET_CHARS
+        self.searches = 0
+        self._memo = {}
+
+    def search(self, query):
+        """Hybrid search for a query, run at most once per distinct query."""
+        query = normalize_query(query)
+        if query not in self._memo:
+            self.searches += 1
+            self._memo[query] = self.knowledge_base.search(query, num_documents=self.candidates) or []
+        return self._memo[query]
+
+    def context(self, user_requirement):
+        """
+        Reranked excerpts for a requirement, packed into the character budget.
+
+        Returns:
+            str: Numbered excerpts separated by blank lines ("" without a knowledge base or results)
+        """
+        if self.knowledge_base is None or not user_requirement.strip():
+            return ""
+        excerpts = []
+        used = 0
+        for _, document in rerank(user_requirement, self.search(user_requirement)):
+            excerpt = format_chunk(len(excerpts) + 1, document)
+            # Skip chunks that don't fit rather than cutting one off mid-sentence
+            if used + len(excerpt) + 2 > self.budget_chars:
+                continue
+            excerpts.append(excerpt)
+            used += len(excerpt) + 2
+        return "\n\n".join(excerpts)
+
+
+def retrieval_fingerprint():
+    """Settings that shape the retrieved context, for result-cache keys."""
+    return f"candidates={RETRIEVAL_CANDIDATES};budget={CONTEXT_BUDGET_CHARS};rrf={RRF_K}"
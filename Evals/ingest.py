@@ -0,0 +1,6 @@
+"""Entry point kept for `python ingest.py`; the implementation lives in evalgen.ingest."""
+
+from evalgen.ingest import main
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Local stand-in for Ollama's /api/embed endpoint.
+
+Returns deterministic pseudo-embeddings (seeded by the text) after a delay
+of a fixed per-request latency plus a per-text cost, which is roughly how a
+local embedding model behaves: batching amortises the request overhead and
+concurrent requests overlap. Use it to benchmark or exercise ingestion
+without a running Ollama.
+
+Usage:
+    python mock_ollama.py --port 11435 --latency-ms 20 --per-text-ms 2
+    python ingest.py  # with OLLAMA_HOST=http://127.0.0.1:11435
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+
+def fake_embedding(model, text, dimensions):
+    """Unit-length vector derived from the model and text, identical on every call."""
+    seed = int.from_bytes(hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class MockOllamaHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self.path != "/api/embed":
+            self.send_error(404, "Only /api/embed is served")
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        texts = body.get("input", "")
+        if isinstance(texts, str):
+            texts = [texts]
+        model = body.get("model", "")
+
+        server = self.server
+        with server.lock:
+            server.stats["requests"] += 1
+            server.stats["texts"] += len(texts)
+        time.sleep((server.latency_ms + server.per_text_ms * len(texts)) / 1000)
+
+        payload = json.dumps(
+            {"model": model, "embeddings": [fake_embedding(model, text, server.dimensions) for text in texts]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockOllamaServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server answering /api/embed like Ollama.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind (0 picks a free one)
+        latency_ms (float): Fixed delay per request
+        per_text_ms (float): Extra delay per text in a request
+        dimensions (int): Length of the returned vectors
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=20.0, per_text_ms=2.0, dimensions=768):
+        super().__init__((host, port), MockOllamaHandler)
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+        self.dimensions = dimensions
+        self.stats = Counter()
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Ollama embedding API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--per-text-ms", type=float, default=2.0)
+    parser.add_argument("--dimensions", type=int, default=768)
+    args = parser.parse_args()
+
+    server = MockOllamaServer(args.host, args.port, args.latency_ms, args.per_text_ms, args.dimensions)
+    print(f"Mock Ollama API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
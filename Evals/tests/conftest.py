@@ -0,0 +1,28 @@
+import os
+import sys
+import types
+
+import pytest
+
+# evalgen is imported from the Evals directory, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeAgent:
+    def __init__(self, knowledge_base, model_id, stage):
+        self.knowledge = knowledge_base
+        self.model = types.SimpleNamespace(id=model_id)
+        self.instructions = [stage]
+        self.run_response = None
+        self.prompts = []
+
+    def run(self, prompt, stream=False):
+        self.prompts.append(prompt)
+        self.run_response = types.SimpleNamespace(content=f"{self.instructions[0]} output", metrics={"output_tokens": [3]})
+        return self.run_response
+
+
+@pytest.fixture
+def fake_agent():
+    """Agent stand-in answering "<stage> output" and recording its prompts."""
+    return FakeAgent
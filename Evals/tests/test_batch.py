@@ -0,0 +1,104 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+import evalgen.batch as batch
+from evalgen.batch import CHECKPOINT_FILE, read_checkpoint, read_requirements, run_batch
+
+
+class FakePipeline:
+    """Stands in for EvalPipeline.generate; fails rows listed in `failures` once per entry."""
+
+    def __init__(self, failures=None, delay=0.02):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, requirement, planning_model=None, knowledge_model=None, force_regenerate=False, shared_agents=True):
+        with self._lock:
+            self.calls.append(requirement)
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            error = self.failures.get(requirement)
+            if error and not isinstance(error, list):
+                self.failures.pop(requirement)
+        try:
+            time.sleep(self.delay)
+            if error:
+                raise error[0] if isinstance(error, list) else error
+            stats = {"ttft_s": 0.01, "duration_s": self.delay, "output_tokens": 3, "tokens_per_sec": 150.0}
+            return {"plan": f"plan: {requirement}", "framework": f"framework: {requirement}", "stats": {"plan": stats, "framework": stats}}
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(batch.random, "uniform", lambda a, b: 0.0)
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records))
+    return path
+
+
+def test_read_requirements_jsonl_and_csv(tmp_path):
+    rows = read_requirements(
+        write_jsonl(tmp_path / "in.jsonl", [{"id": "support bot", "requirement": " A bot "}, {"text": "B"}, {"requirement": ""}])
+    )
+    assert [row["id"] for row in rows] == ["support-bot", rows[1]["id"]]
+    assert rows[0]["requirement"] == "A bot" and rows[1]["id"].startswith("row-0002-")
+    # Ids don't depend on the run, so checkpoints match on resume
+    assert read_requirements(tmp_path / "in.jsonl") == rows
+
+    (tmp_path / "in.csv").write_text("id,requirement,knowledge_model\nx,A bot,writer\n")
+    assert read_requirements(tmp_path / "in.csv") == [
+        {"id": "x", "requirement": "A bot", "planning_model": None, "knowledge_model": "writer"}
+    ]
+
+    write_jsonl(tmp_path / "dup.jsonl", [{"id": "x", "requirement": "A"}, {"id": "x", "requirement": "B"}])
+    with pytest.raises(ValueError, match="Duplicate"):
+        read_requirements(tmp_path / "dup.jsonl")
+
+
+def test_read_checkpoint_uses_last_status_and_ignores_torn_lines(tmp_path):
+    (tmp_path / CHECKPOINT_FILE).write_text(
+        '{"id": "a", "status": "error"}\n{"id": "a", "status": "ok"}\n{"id": "b", "status": "ok"}\n'
+        '{"id": "b", "status": "error"}\n{"id": "c", "sta'
+    )
+    assert read_checkpoint(tmp_path) == {"a"}
+
+
+def test_run_batch_retries_rate_limits_and_resumes(tmp_path):
+    rows = read_requirements(
+        write_jsonl(tmp_path / "in.jsonl", [{"id": f"r{i}", "requirement": f"req {i}"} for i in range(5)])
+    )
+    out = tmp_path / "out"
+    pipeline = FakePipeline(
+        failures={"req 1": RuntimeError("Error code: 429 rate limit"), "req 3": [ValueError("bad row")]}
+    )
+
+    summary = asyncio.run(run_batch(rows, out, concurrency=2, rpm=0, max_retries=2, pipeline=pipeline))
+
+    assert summary["succeeded"] == 4 and summary["failed"] == 1 and summary["skipped"] == 0
+    assert pipeline.calls.count("req 1") == 2 and pipeline.calls.count("req 3") == 1
+    assert pipeline.peak <= 2
+    assert (out / "r0" / "framework.md").read_text() == "framework: req 0"
+    assert json.loads((out / "r0" / "stats.json").read_text())["stages"]["plan"]["output_tokens"] == 3
+    assert not (out / "r3").exists()
+    assert read_checkpoint(out) == {"r0", "r1", "r2", "r4"}
+
+    # A second run only retries the row that failed
+    rerun = FakePipeline()
+    summary = asyncio.run(run_batch(rows, out, concurrency=2, rpm=0, pipeline=rerun))
+    assert rerun.calls == ["req 3"]
+    assert summary["skipped"] == 4 and summary["succeeded"] == 1
+    assert read_checkpoint(out) == {f"r{i}" for i in range(5)}
+    assert json.loads((out / "summary.json").read_text()) == summary
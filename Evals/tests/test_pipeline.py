@@ -0,0 +1,54 @@
+import threading
+import types
+
+import pytest
+
+import evalgen.pipeline as pipeline
+from evalgen import EvalPipeline
+
+
+@pytest.fixture
+def fake_build(monkeypatch, fake_agent):
+    built = []
+    knowledge_base = object()
+
+    def build_knowledge_base(**kwargs):
+        built.append("kb")
+        return knowledge_base
+
+    monkeypatch.setattr(pipeline, "build_knowledge_base", build_knowledge_base)
+    monkeypatch.setattr(pipeline, "build_planning_agent", lambda kb, model: fake_agent(kb, model, "plan"))
+    monkeypatch.setattr(pipeline, "build_knowledge_agent", lambda kb, model: fake_agent(kb, model, "framework"))
+    return built, knowledge_base
+
+
+def call_with_timeout(fn, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "call did not return (deadlock?)"
+    return result["value"]
+
+
+def test_agents_on_fresh_pipeline_builds_knowledge_base(fake_build):
+    built, knowledge_base = fake_build
+    eval_pipeline = EvalPipeline(use_cache=False)
+
+    planning_agent, knowledge_agent = call_with_timeout(eval_pipeline.agents)
+
+    assert built == ["kb"]
+    assert planning_agent.knowledge is knowledge_base and knowledge_agent.knowledge is knowledge_base
+    assert planning_agent.model.id == pipeline.DEFAULT_PLANNING_MODEL
+    assert eval_pipeline.agents() == (planning_agent, knowledge_agent)
+    assert eval_pipeline.agents(shared=False)[0] is not planning_agent
+
+
+def test_generate_on_fresh_pipeline(fake_build, monkeypatch):
+    monkeypatch.setattr(pipeline, "Retriever", lambda kb: types.SimpleNamespace(context=lambda requirement: ""))
+    eval_pipeline = EvalPipeline(use_cache=False)
+
+    result = call_with_timeout(lambda: eval_pipeline.generate("A support bot"))
+
+    assert result["plan"] == "plan output" and result["framework"] == "framework output"
+    assert fake_build[0] == ["kb"]
@@ -0,0 +1,127 @@
+import os
+import types
+
+import pytest
+
+import evalgen.pipeline as pipeline
+import evalgen.result_cache as result_cache
+from evalgen import EvalPipeline
+from evalgen.pipeline import generate_chatbot_eval
+from evalgen.result_cache import ResultCache, cache_key, framework_key, knowledge_version, plan_key
+
+
+def test_cache_key_is_canonical():
+    assert cache_key("plan", a=1, b="x") == cache_key("plan", b="x", a=1)
+    assert cache_key("plan", a=1) != cache_key("framework", a=1)
+
+
+def test_plan_key_covers_requirement_model_instructions_and_kb(fake_agent):
+    agent = fake_agent(None, "model-a", "plan")
+    key = plan_key("bot", agent, "kb1")
+    assert key == plan_key("bot", fake_agent(None, "model-a", "plan"), "kb1")
+    assert key != plan_key("other bot", agent, "kb1")
+    assert key != plan_key("bot", fake_agent(None, "model-b", "plan"), "kb1")
+    assert key != plan_key("bot", fake_agent(None, "model-a", "edited instructions"), "kb1")
+    assert key != plan_key("bot", agent, "kb2")
+
+
+def test_framework_key_depends_on_plan_text_not_planning_model(fake_agent):
+    agent = fake_agent(None, "model-a", "framework")
+    key = framework_key("bot", "plan text", agent, "kb1")
+    assert key != framework_key("bot", "other plan", agent, "kb1")
+    assert key != framework_key("bot", "plan text", fake_agent(None, "model-b", "framework"), "kb1")
+
+
+def test_knowledge_version_tracks_pdf_content_and_retrieval_settings(tmp_path, monkeypatch):
+    pdf = tmp_path / "guide.pdf"
+    pdf.write_bytes(b"%PDF-1.4 first")
+    first = knowledge_version(str(pdf))
+    assert knowledge_version(str(pdf)) == first
+
+    pdf.write_bytes(b"%PDF-1.4 second edition")
+    edited = knowledge_version(str(pdf))
+    assert edited != first
+
+    monkeypatch.setattr(result_cache, "retrieval_fingerprint", lambda: "budget=1")
+    assert knowledge_version(str(pdf)) != edited
+
+
+def test_get_put_and_counters(tmp_path):
+    cache = ResultCache(tmp_path)
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, {"content": "plan"})
+    assert cache.get("ab" * 32)["content"] == "plan"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path, max_bytes=10**6)
+    keys = [f"{i:064x}" for i in range(3)]
+    for age, key in zip((300, 200, 100), keys):
+        cache.put(key, {"content": "x" * 1000})
+        os.utime(cache._file(key), (0, 1_000_000 - age))
+    # Reading the oldest entry makes it the most recently used
+    cache.get(keys[0])
+
+    cache.max_bytes = 2500
+    cache.evict()
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+
+@pytest.fixture
+def agents(fake_agent):
+    return {
+        "plan": fake_agent(None, "planner", "plan"),
+        "framework": fake_agent(None, "writer", "framework"),
+        "other framework": fake_agent(None, "other writer", "framework"),
+    }
+
+
+def test_generate_serves_repeat_requests_from_cache(tmp_path, monkeypatch, agents):
+    monkeypatch.setenv("AI_EVALS_GUIDE_PATH", "")
+    cache = ResultCache(tmp_path)
+    plan, framework = agents["plan"], agents["framework"]
+
+    first = generate_chatbot_eval("bot", plan, framework, cache=cache)
+    again = generate_chatbot_eval("bot", plan, framework, cache=cache)
+    assert again["plan"] == first["plan"] and again["framework"] == first["framework"]
+    assert again["stats"]["plan"]["cached"] and again["stats"]["framework"]["cached"]
+    assert len(plan.prompts) == 1 and len(framework.prompts) == 1
+
+    # Switching only the knowledge model reuses the cached plan
+    switched = generate_chatbot_eval("bot", plan, agents["other framework"], cache=cache)
+    assert switched["stats"]["plan"].get("cached") and not switched["stats"]["framework"].get("cached")
+    assert len(plan.prompts) == 1
+
+    generate_chatbot_eval("bot", plan, framework, cache=cache, force_regenerate=True)
+    assert len(plan.prompts) == 2 and len(framework.prompts) == 2
+
+
+def test_knowledge_version_differs_per_pdf_path(tmp_path):
+    first, second = tmp_path / "guide.pdf", tmp_path / "other.pdf"
+    first.write_bytes(b"%PDF-1.4 guide")
+    second.write_bytes(b"%PDF-1.4 another guide")
+    assert knowledge_version(str(first)) != knowledge_version(str(second))
+
+
+def test_pipelines_over_different_guides_do_not_share_results(tmp_path, monkeypatch, fake_agent):
+    first, second = tmp_path / "guide.pdf", tmp_path / "other.pdf"
+    first.write_bytes(b"%PDF-1.4 guide")
+    second.write_bytes(b"%PDF-1.4 another guide")
+    # The env var names the first guide; a pipeline over the second must still key on its own pdf_path
+    monkeypatch.setenv("AI_EVALS_GUIDE_PATH", str(first))
+    monkeypatch.setattr(pipeline, "build_planning_agent", lambda kb, model: fake_agent(kb, model, "plan"))
+    monkeypatch.setattr(pipeline, "build_knowledge_agent", lambda kb, model: fake_agent(kb, model, "framework"))
+    monkeypatch.setattr(pipeline, "Retriever", lambda kb: types.SimpleNamespace(context=lambda requirement: ""))
+    cache = ResultCache(tmp_path / "cache")
+
+    def run(pdf_path):
+        eval_pipeline = EvalPipeline(pdf_path=str(pdf_path), knowledge_base=object(), use_cache=False)
+        eval_pipeline._cache, eval_pipeline.use_cache = cache, True
+        return eval_pipeline.generate("bot")["stats"]
+
+    assert not run(second)["plan"].get("cached")
+    assert not run(first)["plan"].get("cached")
+    assert run(second)["plan"].get("cached")
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+
+from agno.document import Document
+
+from evalgen.pipeline import generate_chatbot_eval
+from evalgen.result_cache import ResultCache
+from evalgen.retrieval import Retriever, format_chunk, rerank
+
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class FakeKnowledgeBase:
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = []
+
+    def search(self, query, num_documents=None):
+        self.queries.append((query, num_documents))
+        return list(self.documents[:num_documents])
+
+
+def doc(content, name="guide", page=None):
+    return Document(content=content, name=name, meta_data={"page": page} if page is not None else {})
+
+
+DOCUMENTS = [
+    doc("Goldens are curated example inputs with ideal outputs.", page=3),
+    doc("Goldens  are curated example inputs with ideal outputs.", name="copy", page=3),
+    doc("Autoraters grade outputs against rubrics. " * 20, page=9),
+    doc("Synthetic data varies tone and edge cases.", page=5),
+    doc("   "),
+]
+
+
+def test_rerank_drops_duplicates_and_empty_chunks():
+    ranked = [document for _, document in rerank("goldens rubric", DOCUMENTS)]
+    assert len(ranked) == 3
+    assert ranked[0].name == "guide" and ranked[0].meta_data["page"] == 3
+
+
+def test_context_packs_whole_chunks_into_the_budget():
+    short = [format_chunk(1, DOCUMENTS[0]), format_chunk(2, DOCUMENTS[3])]
+    budget = sum(len(excerpt) + 2 for excerpt in short)
+    context = Retriever(FakeKnowledgeBase(DOCUMENTS), budget_chars=budget).context("goldens synthetic data")
+
+    # The long autorater chunk doesn't fit and is skipped, not truncated; numbering has no gaps
+    assert len(context) <= budget
+    assert "Autoraters" not in context
+    assert context.startswith("[1] guide, page 3\nGoldens") and "\n\n[2] guide, page 5\nSynthetic" in context
+
+
+def test_search_is_memoized_per_query():
+    knowledge_base = FakeKnowledgeBase(DOCUMENTS)
+    retriever = Retriever(knowledge_base, candidates=7)
+    first = retriever.context("A  support bot")
+    assert retriever.context("A support bot\n") == first
+    assert knowledge_base.queries == [("A support bot", 7)] and retriever.searches == 1
+    # A new request gets a fresh memo
+    Retriever(knowledge_base).context("A support bot")
+    assert len(knowledge_base.queries) == 2
+
+
+def test_context_without_knowledge_base_is_empty():
+    assert Retriever(None).context("A support bot") == ""
+
+
+def test_context_is_identical_across_processes():
+    # String hashing is seeded per process; the excerpts must not depend on it
+    script = (
+        "from test_retrieval import DOCUMENTS, FakeKnowledgeBase\n"
+        "from evalgen.retrieval import Retriever\n"
+        "print(Retriever(FakeKnowledgeBase(DOCUMENTS[::-1])).context('rubric goldens tone edge cases'))"
+    )
+    path = os.pathsep.join([TESTS_DIR, os.path.dirname(TESTS_DIR)])
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": path, "PYTHONHASHSEED": str(seed)},
+        ).stdout
+        for seed in (1, 2, 3)
+    }
+    assert len(outputs) == 1 and outputs.pop().startswith("[1]")
+
+
+def test_generate_searches_once_and_shares_excerpts(tmp_path, monkeypatch, fake_agent):
+    monkeypatch.setenv("AI_EVALS_GUIDE_PATH", "")
+    knowledge_base = FakeKnowledgeBase(DOCUMENTS)
+    planning_agent = fake_agent(knowledge_base, "planner", "plan")
+    knowledge_agent = fake_agent(knowledge_base, "writer", "framework")
+    cache = ResultCache(tmp_path)
+
+    generate_chatbot_eval("A bot that explains goldens", planning_agent, knowledge_agent, cache=cache)
+    assert len(knowledge_base.queries) == 1
+    excerpt = "[1] guide, page 3\nGoldens are curated"
+    assert excerpt in planning_agent.prompts[0] and excerpt in knowledge_agent.prompts[0]
+
+    # Fully cached requests don't search
+    generate_chatbot_eval("A bot that explains goldens", planning_agent, knowledge_agent, cache=cache)
+    assert len(knowledge_base.queries) == 1
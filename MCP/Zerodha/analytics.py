@@ -0,0 +1,176 @@
+"""
+Vectorised portfolio analytics over holdings, positions and stored candles.
+
+The MCP tool gathers the inputs (cached Kite responses and daily candles
+from the local candle store) and summarize() reduces them with pandas to a
+compact result: P&L, weights, concentration, and return/risk statistics for
+the current holdings and the whole portfolio, so none of the raw series has
+to pass through the model's context.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+
+def _round(value: Any, digits: int = 4) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return round(float(value), digits)
+
+
+def holdings_frame(holdings: List[Dict[str, Any]]) -> pd.DataFrame:
+    """One row per holding with quantity, cost, value and unrealised P&L"""
+    frame = pd.DataFrame(
+        holdings,
+        columns=["tradingsymbol", "exchange", "instrument_token", "quantity", "t1_quantity", "average_price", "last_price"],
+    )
+    frame["quantity"] = frame["quantity"].fillna(0) + frame["t1_quantity"].fillna(0)
+    frame = frame[frame["quantity"] != 0].set_index("tradingsymbol")
+    frame["invested"] = frame["quantity"] * frame["average_price"]
+    frame["value"] = frame["quantity"] * frame["last_price"]
+    frame["unrealised_pnl"] = frame["value"] - frame["invested"]
+    total = frame["value"].sum()
+    frame["weight"] = frame["value"] / total if total else 0.0
+    return frame
+
+
+def close_frame(candles: Dict[str, List[Dict[str, Any]]]) -> pd.DataFrame:
+    """Daily closes aligned on date, one column per symbol"""
+    series = {
+        symbol: pd.Series(
+            [c["close"] for c in rows],
+            index=pd.DatetimeIndex([c["date"] for c in rows]).normalize(),
+        )
+        for symbol, rows in candles.items()
+        if rows
+    }
+    if not series:
+        return pd.DataFrame()
+    closes = pd.DataFrame(series).sort_index()
+    return closes[~closes.index.duplicated(keep="last")]
+
+
+def max_drawdown(values: pd.DataFrame) -> pd.Series:
+    """Largest peak-to-trough fall of each column, as a negative fraction"""
+    return (values / values.cummax() - 1).min()
+
+
+def beta(returns: pd.DataFrame, benchmark: pd.Series) -> pd.Series:
+    """Beta of each return column against aligned benchmark returns"""
+    aligned = returns.join(benchmark.rename("__benchmark__"), how="inner").dropna()
+    if len(aligned) < 2:
+        return pd.Series(np.nan, index=returns.columns)
+    b = aligned.pop("__benchmark__")
+    covariance = aligned.sub(aligned.mean()).mul(b - b.mean(), axis=0).sum() / (len(b) - 1)
+    return covariance / b.var()
+
+
+def summarize(
+    holdings: List[Dict[str, Any]],
+    positions: Dict[str, List[Dict[str, Any]]],
+    candles: Dict[str, List[Dict[str, Any]]],
+    benchmark_candles: Optional[List[Dict[str, Any]]] = None,
+    window: int = 21,
+    top: int = 5,
+) -> Dict[str, Any]:
+    """
+    Compact analytics for the current portfolio.
+
+    Risk and return figures replay the current holding quantities over the
+    candle history, i.e. they describe the portfolio as it stands today.
+
+    Args:
+        holdings: Kite holdings
+        positions: Kite positions ({'net': [...], 'day': [...]})
+        candles: Daily candles per holding tradingsymbol
+        benchmark_candles: Daily candles of the benchmark index
+        window: Trading days in the rolling return window
+        top: Number of largest weights to report
+    """
+    frame = holdings_frame(holdings)
+    net_positions = positions.get("net", []) if positions else []
+    invested, value = frame["invested"].sum(), frame["value"].sum()
+
+    result: Dict[str, Any] = {
+        "holdings_count": len(frame),
+        "invested": _round(invested, 2),
+        "value": _round(value, 2),
+        "unrealised_pnl": _round(frame["unrealised_pnl"].sum(), 2),
+        "unrealised_pnl_pct": _round((value - invested) / invested if invested else None),
+        "positions_realised_pnl": _round(sum(p.get("realised", 0) or 0 for p in net_positions), 2),
+        "positions_unrealised_pnl": _round(sum(p.get("unrealised", 0) or 0 for p in net_positions), 2),
+    }
+
+    weights = frame["weight"].sort_values(ascending=False)
+    hhi = float((weights**2).sum())
+    result["concentration"] = {
+        "hhi": _round(hhi),
+        "effective_holdings": _round(1 / hhi if hhi else None, 2),
+        f"top_{top}_weight": _round(weights.head(top).sum()),
+        "top_weights": {symbol: _round(w) for symbol, w in weights.head(top).items()},
+    }
+
+    closes = close_frame({s: c for s, c in candles.items() if s in frame.index})
+    table = pd.DataFrame(index=frame.index)
+    table["weight"] = frame["weight"]
+    table["unrealised_pnl"] = frame["unrealised_pnl"]
+    table["unrealised_pnl_pct"] = frame["unrealised_pnl"] / frame["invested"].replace(0, np.nan)
+
+    bench_returns = None
+    if benchmark_candles:
+        bench_close = close_frame({"benchmark": benchmark_candles})["benchmark"]
+        bench_returns = bench_close.pct_change().dropna()
+
+    if len(closes) > 1:
+        # Leading gaps (listed later) are dropped so every column shares one history
+        closes = closes.ffill().dropna()
+        returns = closes.pct_change().iloc[1:]
+        table["return"] = closes.iloc[-1] / closes.iloc[0] - 1
+        table[f"return_{window}d"] = closes.pct_change(window).iloc[-1] if len(closes) > window else np.nan
+        table["volatility"] = returns.std() * math.sqrt(TRADING_DAYS)
+        table["max_drawdown"] = max_drawdown(closes)
+
+        portfolio = closes.mul(frame["quantity"].reindex(closes.columns), axis=1).sum(axis=1)
+        portfolio_returns = portfolio.pct_change().iloc[1:]
+        rolling = portfolio.pct_change(window).dropna()
+        risk: Dict[str, Any] = {
+            "from": closes.index[0].date().isoformat(),
+            "to": closes.index[-1].date().isoformat(),
+            "days": len(closes),
+            "total_return": _round(portfolio.iloc[-1] / portfolio.iloc[0] - 1),
+            "volatility": _round(portfolio_returns.std() * math.sqrt(TRADING_DAYS)),
+            "max_drawdown": _round((portfolio / portfolio.cummax() - 1).min()),
+            "rolling_return": {
+                "window": window,
+                "latest": _round(rolling.iloc[-1]) if len(rolling) else None,
+                "mean": _round(rolling.mean()) if len(rolling) else None,
+                "min": _round(rolling.min()) if len(rolling) else None,
+                "max": _round(rolling.max()) if len(rolling) else None,
+            },
+        }
+        if bench_returns is not None:
+            table["beta"] = beta(returns, bench_returns)
+            risk["beta"] = _round(beta(portfolio_returns.to_frame("portfolio"), bench_returns)["portfolio"])
+            bench = bench_close.loc[closes.index[0] : closes.index[-1]]
+            risk["benchmark"] = {
+                "total_return": _round(bench.iloc[-1] / bench.iloc[0] - 1) if len(bench) > 1 else None,
+                "volatility": _round(bench.pct_change().std() * math.sqrt(TRADING_DAYS)),
+                "max_drawdown": _round((bench / bench.cummax() - 1).min()),
+            }
+        result["risk"] = risk
+
+    missing = sorted(set(frame.index) - set(closes.columns))
+    if missing:
+        result["missing_history"] = missing
+
+    table = table.sort_values("weight", ascending=False)
+    result["holdings"] = {
+        "tradingsymbol": list(table.index),
+        **{column: [_round(v) for v in table[column]] for column in table.columns},
+    }
+    return result
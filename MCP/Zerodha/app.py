@@ -1,158 +1,590 @@
-from typing import Any, Dict, List, Optional, AsyncIterator
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, AsyncIterator
 import os
+import asyncio
+import sqlite3
+import functools
+import logging
+import time
 import httpx
-from contextlib import asynccontextmanager
-from dataclasses import dataclass
-from threading import Thread
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from datetime import date, timedelta
 import webbrowser
+from urllib.parse import quote, urlencode
 import uvicorn
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, PlainTextResponse
 from mcp.server.fastmcp import FastMCP, Context
 from kiteconnect import KiteConnect
+from kiteconnect import exceptions as kite_exceptions
 from dotenv import load_dotenv
 
+import analytics
+from cache import TTLCache
+from candles import CandleStore
+from indicators import DEFAULTS as INDICATOR_DEFAULTS, compute_batch, from_candles, parse_spec
+from instruments import InstrumentIndex
+from journal import OrderJournal
+from metrics import Metrics, instrument
+from orders import order_params, validate_order
+from projection import Rows, combine, shape
+from quotes import QuoteAggregator
+from ratelimit import RateLimiter
+from session import SessionState
+from ticker import TickerManager, tick_to_dict
+from timeutil import today_ist
+
 # Load environment variables from .env file
 load_dotenv()
 
+logger = logging.getLogger("zerodha")
+
 # Constants
 KITE_API_KEY = os.getenv("KITE_API_KEY")
 KITE_API_SECRET = os.getenv("KITE_API_SECRET")
-REDIRECT_URL = "http://127.0.0.1:5000/zerodha/auth/redirect"
-TOKEN_STORE_PATH = os.path.join(os.path.dirname(__file__), ".tokens")
+REDIRECT_HOST = "127.0.0.1"
+REDIRECT_PORT = 5000
+REDIRECT_URL = f"http://{REDIRECT_HOST}:{REDIRECT_PORT}/zerodha/auth/redirect"
+TOKEN_STORE_PATH = os.getenv(
+    "KITE_TOKEN_STORE", os.path.join(os.path.dirname(__file__), ".tokens")
+)
+# Accounts served by this process (e.g. KITE_ACCOUNTS=AB1234,CD5678). Each
+# reads KITE_API_KEY_<ID> / KITE_API_SECRET_<ID>, falling back to the keys
+# above, and keeps its token in KITE_TOKEN_STORE.<ID>
+DEFAULT_ACCOUNT = "default"
+KITE_ACCOUNTS = [
+    account.strip()
+    for account in os.getenv("KITE_ACCOUNTS", "").split(",")
+    if account.strip()
+] or [DEFAULT_ACCOUNT]
+# Optional override of the Kite REST root, e.g. to point at mock_kite.py
+KITE_ROOT = os.getenv("KITE_ROOT")
+# Upper bound on concurrent blocking KiteConnect calls
+KITE_MAX_WORKERS = int(os.getenv("KITE_MAX_WORKERS", "8"))
+
+# Window in which concurrent get_quote requests are merged into one call
+QUOTE_COALESCE_MS = float(os.getenv("KITE_QUOTE_COALESCE_MS", "5"))
+
+# Optional override of the ticker websocket root, e.g. to point at fake_ticker.py
+KITE_TICKER_ROOT = os.getenv("KITE_TICKER_ROOT")
+# Ticks kept in memory per streamed instrument
+KITE_TICK_BUFFER = int(os.getenv("KITE_TICK_BUFFER", "1024"))
+
+INSTRUMENTS_DB_PATH = os.getenv(
+    "KITE_INSTRUMENTS_DB", os.path.join(os.path.dirname(__file__), ".instruments.db")
+)
+# Worker processes for indicator computation across many instruments
+KITE_INDICATOR_WORKERS = int(os.getenv("KITE_INDICATOR_WORKERS", str(os.cpu_count() or 1)))
+
+CANDLES_DB_PATH = os.getenv(
+    "KITE_CANDLES_DB", os.path.join(os.path.dirname(__file__), ".candles.db")
+)
+
+JOURNAL_DB_PATH = os.getenv(
+    "KITE_JOURNAL_DB", os.path.join(os.path.dirname(__file__), ".journal.db")
+)
+# Seconds between background reconciles of the journal with Kite's order
+# and trade books (0 disables; writes always trigger one)
+KITE_RECONCILE_SECONDS = float(os.getenv("KITE_RECONCILE_SECONDS", "60"))
+
+# Seconds to cache read-only endpoints, overridable per endpoint with
+# KITE_CACHE_TTL_<ENDPOINT> (e.g. KITE_CACHE_TTL_HOLDINGS=60, 0 disables)
+CACHE_TTLS = {
+    endpoint: float(os.getenv(f"KITE_CACHE_TTL_{endpoint.upper()}", default))
+    for endpoint, default in {
+        "holdings": 30,
+        "positions": 5,
+        "margins": 10,
+        "mf_holdings": 60,
+        "mf_sips": 60,
+    }.items()
+}
+
+# Requests per second for each Kite endpoint class, overridable with
+# KITE_RATE_LIMIT_<CLASS> (e.g. KITE_RATE_LIMIT_HISTORICAL=2)
+RATE_LIMITS = {
+    name: float(os.getenv(f"KITE_RATE_LIMIT_{name.upper()}", default))
+    for name, default in {
+        "quote": 1,
+        "historical": 3,
+        "order": 10,
+        "default": 10,
+    }.items()
+}
+# Retries for calls Kite rejects with HTTP 429
+KITE_MAX_RETRIES = int(os.getenv("KITE_MAX_RETRIES", "3"))
+
+# Cached endpoints each write call can change; these calls are also journaled
+WRITE_INVALIDATES = {
+    "place_order": ("holdings", "positions", "margins"),
+    "place_mf_order": ("mf_holdings", "margins"),
+    "cancel_mf_order": ("mf_holdings", "margins"),
+    "place_mf_sip": ("mf_sips",),
+    "modify_mf_sip": ("mf_sips",),
+    "cancel_mf_sip": ("mf_sips",),
+}
+
+# Tool and Kite call instrumentation shared by every tool
+METRICS = Metrics()
+instrumented = instrument(METRICS)
 
 # Initialize FastAPI app for handling redirect
 app = FastAPI(title="Zerodha Login Handler")
 
-# Global variables for auth flow
-_request_token: Optional[str] = None
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Tool and Kite call histograms in the Prometheus text format"""
+    return PlainTextResponse(
+        METRICS.prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.get("/zerodha/auth/redirect")
+async def callback(
+    request: Request,
+    request_token: str = None,
+    status: str = None,
+    account: str = None,
+):
+    """Handle the redirect from Zerodha login for the account named in redirect_params"""
+    pool: ZerodhaPool = request.app.state.zerodha
+    try:
+        ctx = pool.get(account)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if status != "success":
+        logger.warning(f"Login failed with status: {status}")
+        raise HTTPException(
+            status_code=400, detail=f"Login failed with status: {status}"
+        )
+    if not request_token:
+        logger.warning("No request token received")
+        raise HTTPException(status_code=400, detail="No request token received")
+
+    try:
+        # Generate session on the worker pool so the shared loop keeps serving tools
+        logger.info(f"Generating session with request token for account {ctx.account}")
+        data = await ctx.run(
+            ctx.kite.generate_session, request_token, api_secret=ctx.api_secret
+        )
+        access_token = data["access_token"]
+
+        # Save and set the access token
+        logger.info("Saving and setting access token")
+        try:
+            await ctx.run(ctx.session.save, access_token)
+        except OSError as e:
+            logger.warning(f"Could not save access token: {e}")
+        ctx.kite.set_access_token(access_token)
+        ctx.cache.invalidate()
+        ctx.request_token = request_token
+        logger.info(f"Login successful for account {ctx.account}")
+
+        return HTMLResponse(
+            content="""
+            <html>
+                <body style="font-family: Arial, sans-serif; display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0; background-color: #f5f5f5;">
+                    <div style="text-align: center; padding: 2rem; background-color: white; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
+                        <h1 style="color: #2ecc71;">Login Successful!</h1>
+                        <p>You can close this window now.</p>
+                    </div>
+                </body>
+            </html>
+            """
+        )
+    except Exception as e:
+        error_msg = f"Failed to generate session: {str(e)}"
+        logger.error(error_msg)
+        raise HTTPException(status_code=500, detail=error_msg)
+
+
+class RedirectServer(uvicorn.Server):
+    """
+    uvicorn server run as a task on the MCP server's event loop. Signal
+    handling is left to the MCP server, and a failure to bind is logged
+    instead of exiting the process.
+    """
+
+    @contextmanager
+    def capture_signals(self) -> Iterator[None]:
+        yield
+
+    async def serve(self, sockets=None) -> None:
+        try:
+            await super().serve(sockets)
+        except SystemExit:
+            logger.error(
+                f"Redirect server could not start on {REDIRECT_HOST}:{REDIRECT_PORT}"
+            )
 
 
 @dataclass
 class ZerodhaContext:
-    """Typed context for the Zerodha MCP server"""
+    """Typed context for one Zerodha account"""
 
     kite: KiteConnect
     api_key: str
     api_secret: str
-    app: FastAPI
-    server_thread: Optional[Thread] = None
+    account: str = DEFAULT_ACCOUNT
+    session: SessionState = field(
+        default_factory=lambda: SessionState(TOKEN_STORE_PATH)
+    )
+    request_token: Optional[str] = None
+    executor: ThreadPoolExecutor = field(
+        default_factory=lambda: ThreadPoolExecutor(
+            max_workers=KITE_MAX_WORKERS, thread_name_prefix="kite"
+        )
+    )
+    cache: TTLCache = field(default_factory=lambda: TTLCache(CACHE_TTLS))
+    limiter: RateLimiter = field(
+        default_factory=lambda: RateLimiter(
+            RATE_LIMITS, slots=KITE_MAX_WORKERS, max_retries=KITE_MAX_RETRIES
+        )
+    )
+    instruments: InstrumentIndex = field(
+        default_factory=lambda: InstrumentIndex(INSTRUMENTS_DB_PATH)
+    )
+    instruments_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+    journal: OrderJournal = field(
+        default_factory=lambda: OrderJournal(JOURNAL_DB_PATH), repr=False
+    )
+    reconcile_wanted: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+    quotes: QuoteAggregator = field(init=False, repr=False)
+    candles: CandleStore = field(init=False, repr=False)
+    ticker: Optional[TickerManager] = None
+    processes: Optional[ProcessPoolExecutor] = field(default=None, repr=False)
+    metrics: Metrics = field(default_factory=lambda: METRICS, repr=False)
+
+    def __post_init__(self):
+        self.quotes = QuoteAggregator(self.call, window_ms=QUOTE_COALESCE_MS)
+        self.candles = CandleStore(CANDLES_DB_PATH, call=self.call, run=self.run)
+
+    async def run(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function on the context's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(fn, *args, **kwargs)
+        )
 
+    async def run_cpu(self, fn: Any, *args: Any, **kwargs: Any) -> Any:
+        """Run a CPU-bound, picklable function on the lazily started process pool"""
+        if self.processes is None:
+            self.processes = ProcessPoolExecutor(max_workers=KITE_INDICATOR_WORKERS)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.processes, functools.partial(fn, *args, **kwargs)
+        )
 
-def load_stored_token() -> Optional[str]:
-    """Load stored access token if it exists"""
-    try:
-        if os.path.exists(TOKEN_STORE_PATH):
-            with open(TOKEN_STORE_PATH, "r") as f:
-                return f.read().strip()
-    except Exception:
-        return None
-    return None
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking KiteConnect method on the context's thread pool so
+        concurrent tool calls overlap instead of stalling the event loop.
+        Calls are paced by the rate limiter, and write methods invalidate
+        the cached endpoints they affect. A TokenException triggers one
+        retry if a newer token has been saved since, otherwise the session
+        is cleared.
+
+        Args:
+            method: Name of the KiteConnect method (e.g., 'holdings')
+        """
+        fn = getattr(self.kite, method)
+
+        async def timed() -> Any:
+            start = time.perf_counter()
+            try:
+                result = await self.run(fn, *args, **kwargs)
+            except Exception as e:
+                self.metrics.record_upstream(method, (time.perf_counter() - start) * 1000, e)
+                raise
+            self.metrics.record_upstream(method, (time.perf_counter() - start) * 1000)
+            return result
+
+        result, error = None, None
+        try:
+            try:
+                result = await self.limiter.schedule(method, timed)
+            except kite_exceptions.TokenException:
+                rejected = self.kite.access_token
+                token = await self.run(self.session.load)
+                if not token or token == rejected:
+                    self.session.clear(rejected)
+                    raise
+                self.kite.set_access_token(token)
+                result = await self.limiter.schedule(method, timed)
+            self.session.mark_validated()
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if method in WRITE_INVALIDATES:
+                self.cache.invalidate(*WRITE_INVALIDATES[method])
+                await self.record_write(method, args, kwargs, result, error)
+
+    async def record_write(
+        self,
+        method: str,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        result: Any,
+        error: Optional[BaseException],
+    ) -> None:
+        """Journal a write call and wake the reconciler; journal failures are only logged"""
+        params = {**kwargs, "args": list(args)} if args else kwargs
+        try:
+            await self.run(self.journal.record, self.account, method, params, result, error)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not journal {method} for account {self.account}: {e}")
+        self.reconcile_wanted.set()
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """Copy Kite's order book and trade book for this account into the journal"""
+        orders, trades = await asyncio.gather(self.call("orders"), self.call("trades"))
+        return await self.run(self.journal.reconcile, self.account, orders, trades)
+
+    async def reconcile_forever(self, interval: float) -> None:
+        """Reconcile every interval seconds (0: only after writes) while authenticated"""
+        while True:
+            try:
+                await asyncio.wait_for(self.reconcile_wanted.wait(), interval or None)
+            except asyncio.TimeoutError:
+                pass
+            self.reconcile_wanted.clear()
+            if not self.session.is_valid:
+                continue
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.warning(f"Order reconcile failed for account {self.account}: {e}")
 
+    async def cached_call(self, method: str) -> Any:
+        """Call a read-only KiteConnect method through the TTL cache"""
+        return await self.cache.get_or_fetch(method, lambda: self.call(method))
 
-def save_access_token(token: str):
-    """Save access token to file"""
-    try:
-        with open(TOKEN_STORE_PATH, "w") as f:
-            f.write(token)
-    except Exception as e:
-        print(f"Warning: Could not save access token: {e}")
+    async def download_csv(self, path: str) -> str:
+        """Download a raw CSV dump (e.g., '/instruments') from the Kite API"""
+        headers = {"X-Kite-Version": "3"}
+        if self.kite.access_token:
+            headers["Authorization"] = f"token {self.api_key}:{self.kite.access_token}"
+
+        async def download() -> str:
+            start = time.perf_counter()
+            try:
+                async with httpx.AsyncClient(base_url=self.kite.root, timeout=60) as client:
+                    response = await client.get(path, headers=headers)
+                    response.raise_for_status()
+            except Exception as e:
+                self.metrics.record_upstream(path, (time.perf_counter() - start) * 1000, e)
+                raise
+            self.metrics.record_upstream(path, (time.perf_counter() - start) * 1000)
+            return response.text
+
+        return await self.limiter.schedule("instruments", download)
+
+    async def ensure_instruments(self, force: bool = False) -> InstrumentIndex:
+        """
+        Refresh the local instrument index once per trading day. If the
+        download fails, an existing (stale) index is still served.
+        """
+        async with self.instruments_lock:
+            if force or await self.run(self.instruments.needs_refresh):
+                try:
+                    instruments_csv, mf_instruments_csv = await asyncio.gather(
+                        self.download_csv("/instruments"),
+                        self.download_csv("/mf/instruments"),
+                    )
+                    counts = await self.run(
+                        self.instruments.load, instruments_csv, mf_instruments_csv
+                    )
+                    logger.info(f"Instrument index refreshed: {counts}")
+                except Exception as e:
+                    if await self.run(self.instruments.is_empty):
+                        raise
+                    logger.warning(f"Could not refresh instruments, using stale index: {e}")
+        return self.instruments
+
+    async def resolve_tokens(self, symbols: List[str]) -> Dict[str, Optional[int]]:
+        """Map 'EXCHANGE:TRADINGSYMBOL' symbols to instrument tokens"""
+        index = await self.ensure_instruments()
+        return {symbol: index.token(symbol) for symbol in symbols}
+
+
+def account_credentials(account: str) -> Tuple[Optional[str], Optional[str], str]:
+    """API key, API secret and token store path for an account ID"""
+    if account == DEFAULT_ACCOUNT:
+        return KITE_API_KEY, KITE_API_SECRET, TOKEN_STORE_PATH
+    suffix = account.upper()
+    return (
+        os.getenv(f"KITE_API_KEY_{suffix}", KITE_API_KEY),
+        os.getenv(f"KITE_API_SECRET_{suffix}", KITE_API_SECRET),
+        f"{TOKEN_STORE_PATH}.{account}",
+    )
 
 
-def start_server():
-    """Start the FastAPI server"""
-    print("Starting FastAPI server on http://127.0.0.1:5000")
-    uvicorn.run(app, host="127.0.0.1", port=5000, log_level="error")
+@dataclass
+class ZerodhaPool:
+    """
+    Lifespan context holding one ZerodhaContext per account. Accounts share
+    the worker threads, process pool and instrument index; each has its own
+    Kite session, token store, rate limiter, caches and ticker.
+    """
+
+    accounts: Dict[str, ZerodhaContext]
+    app: FastAPI
+    redirect_server: Optional[RedirectServer] = field(default=None, repr=False)
+    redirect_task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    @property
+    def default(self) -> ZerodhaContext:
+        return next(iter(self.accounts.values()))
+
+    def get(self, account: Optional[str] = None) -> ZerodhaContext:
+        """The context for an account ID, or the first account when omitted"""
+        if not account:
+            return self.default
+        try:
+            return self.accounts[account]
+        except KeyError:
+            raise ValueError(
+                f"Unknown account '{account}', expected one of {list(self.accounts)}"
+            ) from None
+
+    async def gather(
+        self, fn: Callable[[ZerodhaContext], Awaitable[Any]]
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Run fn against every account concurrently.
+
+        Returns:
+            Results and error messages, each keyed by account ID
+        """
+        outcomes = await asyncio.gather(
+            *(fn(ctx) for ctx in self.accounts.values()), return_exceptions=True
+        )
+        results, errors = {}, {}
+        for account, outcome in zip(self.accounts, outcomes):
+            if isinstance(outcome, Exception):
+                errors[account] = str(outcome)
+            else:
+                results[account] = outcome
+        return results, errors
+
+    def start_redirect_server(self) -> None:
+        """Serve the login redirect (and /metrics) on this event loop, once"""
+        if self.redirect_task is not None and not self.redirect_task.done():
+            return
+        self.app.state.zerodha = self
+        self.redirect_server = RedirectServer(
+            uvicorn.Config(
+                self.app,
+                host=REDIRECT_HOST,
+                port=REDIRECT_PORT,
+                log_level="error",
+                lifespan="off",
+            )
+        )
+        logger.info(f"Starting FastAPI server on http://{REDIRECT_HOST}:{REDIRECT_PORT}")
+        self.redirect_task = asyncio.create_task(self.redirect_server.serve())
+
+    async def stop_redirect_server(self) -> None:
+        if self.redirect_task is None:
+            return
+        self.redirect_server.should_exit = True
+        try:
+            await asyncio.wait_for(self.redirect_task, timeout=5)
+        except asyncio.TimeoutError:
+            self.redirect_task.cancel()
 
 
 @asynccontextmanager
-async def zerodha_lifespan(server: FastMCP) -> AsyncIterator[ZerodhaContext]:
+async def zerodha_lifespan(server: FastMCP) -> AsyncIterator[ZerodhaPool]:
     """Manage application lifecycle for Zerodha integration"""
     # Initialize Kite Connect
-    print("Initializing Zerodha context...")
+    logger.info(f"Initializing Zerodha context for accounts {KITE_ACCOUNTS}...")
 
-    if not KITE_API_KEY or not KITE_API_SECRET:
+    credentials = {account: account_credentials(account) for account in KITE_ACCOUNTS}
+    missing = [account for account, (key, secret, _) in credentials.items() if not key or not secret]
+    if missing:
         raise ValueError(
-            "KITE_API_KEY and KITE_API_SECRET must be set in the .env file"
+            f"KITE_API_KEY and KITE_API_SECRET must be set in the .env file (missing for {missing})"
         )
 
-    kite = KiteConnect(api_key=KITE_API_KEY)
-
-    # Try to load existing token
-    stored_token = load_stored_token()
-    if stored_token:
-        try:
-            kite.set_access_token(stored_token)
-            # Verify token is still valid with a simple API call
-            kite.margins()
-            print("Successfully restored previous session")
-        except Exception:
-            print("Stored token is invalid, will wait for new login...")
-            if os.path.exists(TOKEN_STORE_PATH):
-                os.remove(TOKEN_STORE_PATH)
-
-    # Create context
-    ctx = ZerodhaContext(
-        kite=kite,
-        api_key=KITE_API_KEY,
-        api_secret=KITE_API_SECRET,
-        app=app,
+    # Threads are shared, with room for every account's limiter slots
+    executor = ThreadPoolExecutor(
+        max_workers=KITE_MAX_WORKERS * len(KITE_ACCOUNTS), thread_name_prefix="kite"
     )
+    processes = ProcessPoolExecutor(max_workers=KITE_INDICATOR_WORKERS)
+    instruments = InstrumentIndex(INSTRUMENTS_DB_PATH)
+    instruments_lock = asyncio.Lock()
+    journal = OrderJournal(JOURNAL_DB_PATH)
+
+    accounts = {}
+    for account, (api_key, api_secret, token_path) in credentials.items():
+        # Size the HTTP connection pool to match the worker pool
+        kite = KiteConnect(
+            api_key=api_key,
+            root=KITE_ROOT,
+            pool={"pool_connections": KITE_MAX_WORKERS, "pool_maxsize": KITE_MAX_WORKERS},
+        )
 
-    try:
-        # Setup FastAPI endpoint for auth callback
-        @app.get("/zerodha/auth/redirect")
-        async def callback(request_token: str = None, status: str = None):
-            """Handle the redirect from Zerodha login"""
-            global _request_token
-
-            if status != "success":
-                print(f"Login failed with status: {status}")
-                raise HTTPException(
-                    status_code=400, detail=f"Login failed with status: {status}"
-                )
-            if not request_token:
-                print("No request token received")
-                raise HTTPException(status_code=400, detail="No request token received")
+        # Restore a stored token unless it has passed its daily expiry; it is
+        # checked for real by the first API call that uses it
+        session = SessionState(token_path)
+        stored_token = session.load()
+        if stored_token:
+            kite.set_access_token(stored_token)
+            logger.info(
+                f"Restored session for account {account}, valid until {session.expires_at:%Y-%m-%d %H:%M} IST"
+            )
+        else:
+            logger.info(f"No valid stored token for account {account}, will wait for new login...")
+
+        accounts[account] = ZerodhaContext(
+            kite=kite,
+            api_key=api_key,
+            api_secret=api_secret,
+            account=account,
+            session=session,
+            executor=executor,
+            instruments=instruments,
+            instruments_lock=instruments_lock,
+            journal=journal,
+            ticker=TickerManager(
+                api_key, root=KITE_TICKER_ROOT, capacity=KITE_TICK_BUFFER
+            ),
+            processes=processes,
+        )
 
-            try:
-                # Generate session
-                print("Generating session with request token")
-                data = ctx.kite.generate_session(
-                    request_token, api_secret=ctx.api_secret
-                )
-                access_token = data["access_token"]
-
-                # Save and set the access token
-                print("Saving and setting access token")
-                save_access_token(access_token)
-                ctx.kite.set_access_token(access_token)
-                _request_token = request_token
-                print("Login successful")
-
-                return HTMLResponse(
-                    content="""
-                    <html>
-                        <body style="font-family: Arial, sans-serif; display: flex; justify-content: center; align-items: center; height: 100vh; margin: 0; background-color: #f5f5f5;">
-                            <div style="text-align: center; padding: 2rem; background-color: white; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                                <h1 style="color: #2ecc71;">Login Successful!</h1>
-                                <p>You can close this window now.</p>
-                            </div>
-                        </body>
-                    </html>
-                    """
-                )
-            except Exception as e:
-                error_msg = f"Failed to generate session: {str(e)}"
-                print(error_msg)
-                raise HTTPException(status_code=500, detail=error_msg)
+    pool = ZerodhaPool(accounts=accounts, app=app)
+    pool.start_redirect_server()
+    reconcilers = [
+        asyncio.create_task(ctx.reconcile_forever(KITE_RECONCILE_SECONDS))
+        for ctx in accounts.values()
+    ]
 
-        # Yield the context to the tools
-        yield ctx
+    try:
+        # Yield the pool to the tools
+        yield pool
     finally:
         # Cleanup on shutdown
-        print("Shutting down Zerodha context...")
-        # Additional cleanup could go here if needed
+        logger.info("Shutting down Zerodha context...")
+        for task in reconcilers:
+            task.cancel()
+        await pool.stop_redirect_server()
+        for ctx in accounts.values():
+            ctx.ticker.close()
+        executor.shutdown(wait=False, cancel_futures=True)
+        processes.shutdown(wait=False, cancel_futures=True)
+
+
+def account_context(ctx: Context, account: Optional[str] = None) -> ZerodhaContext:
+    """The per-account context for a tool call"""
+    pool: ZerodhaPool = ctx.request_context.lifespan_context
+    return pool.get(account)
 
 
 # Initialize FastMCP server with lifespan and dependencies
@@ -164,86 +596,172 @@ mcp = FastMCP(
 
 
 @mcp.tool()
-def initiate_login(ctx: Context) -> Dict[str, Any]:
+@instrumented
+async def initiate_login(ctx: Context, account: Optional[str] = None) -> Dict[str, Any]:
     """
-    Start the Zerodha login flow by opening the login URL in a browser
-    and starting a local server to handle the redirect
+    Start the Zerodha login flow by opening the login URL in a browser;
+    the local server started with the MCP server handles the redirect
+
+    Args:
+        account: Account ID (default: the first configured account)
     """
     try:
-        # Reset the request token
-        global _request_token
-        _request_token = None
-        print("Initiating Zerodha login flow")
-
         # Get strongly typed context
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
+        pool: ZerodhaPool = ctx.request_context.lifespan_context
+        zerodha_ctx = pool.get(account)
 
-        # Start the local server in a separate thread if not already running
-        if not zerodha_ctx.server_thread or not zerodha_ctx.server_thread.is_alive():
-            server_thread = Thread(target=start_server)
-            server_thread.daemon = True
-            server_thread.start()
-            zerodha_ctx.server_thread = server_thread
+        # Reset the request token
+        zerodha_ctx.request_token = None
+        logger.info(f"Initiating Zerodha login flow for account {zerodha_ctx.account}")
 
-        # Get the login URL
-        login_url = zerodha_ctx.kite.login_url()
-        print(f"Generated login URL: {login_url}")
+        # Restart the redirect server if it has stopped (e.g. the port was busy)
+        pool.start_redirect_server()
+
+        # Get the login URL; Kite passes redirect_params back to the callback
+        login_url = zerodha_ctx.kite.login_url() + "&redirect_params=" + quote(
+            urlencode({"account": zerodha_ctx.account})
+        )
+        logger.info(f"Generated login URL: {login_url}")
 
         # Open the login URL in browser
-        webbrowser.open(login_url)
-        print("Opened login URL in browser")
+        await zerodha_ctx.run(webbrowser.open, login_url)
+        logger.info("Opened login URL in browser")
 
         return {
             "message": "Login page opened in browser. Please complete the login process."
         }
     except Exception as e:
         error_msg = f"Error initiating login: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         return {"error": error_msg}
 
 
 @mcp.tool()
-def get_request_token(ctx: Context) -> Dict[str, Any]:
-    """Get the current request token after login redirect"""
-    if _request_token:
-        return {"request_token": _request_token}
+@instrumented
+async def get_request_token(
+    ctx: Context, account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get the current request token after login redirect
+
+    Args:
+        account: Account ID (default: the first configured account)
+    """
+    zerodha_ctx = account_context(ctx, account)
+    if zerodha_ctx.request_token:
+        return {"request_token": zerodha_ctx.request_token}
     return {
         "error": "No request token available. Please complete the login process first."
     }
 
 
 @mcp.tool()
-def get_holdings(ctx: Context) -> List[Dict[str, Any]]:
-    """Get user's holdings/portfolio"""
+@instrumented
+async def get_holdings(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    exchange: Optional[str] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get user's holdings/portfolio
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'quantity'])
+        symbols: Only rows for these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        exchange: Only rows on this exchange (NSE, BSE, ...)
+        nonzero: Only rows with a non-zero quantity
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.holdings()
+        zerodha_ctx = account_context(ctx, account)
+        return shape(
+            await zerodha_ctx.cached_call("holdings"),
+            fields=fields,
+            symbols=symbols,
+            exchange=exchange,
+            nonzero=nonzero,
+            limit=limit,
+            offset=offset,
+            columnar=columnar,
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_positions(ctx: Context) -> Dict[str, Any]:
-    """Get user's positions"""
+@instrumented
+async def get_positions(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    exchange: Optional[str] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Get user's positions, as 'net' and 'day' lists shaped independently
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'quantity'])
+        symbols: Only rows for these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        exchange: Only rows on this exchange (NSE, BSE, ...)
+        nonzero: Only rows with a non-zero quantity
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.positions()
+        zerodha_ctx = account_context(ctx, account)
+        positions = await zerodha_ctx.cached_call("positions")
+        return {
+            kind: shape(
+                rows,
+                fields=fields,
+                symbols=symbols,
+                exchange=exchange,
+                nonzero=nonzero,
+                limit=limit,
+                offset=offset,
+                columnar=columnar,
+            )
+            for kind, rows in positions.items()
+        }
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_margins(ctx: Context) -> Dict[str, Any]:
-    """Get account margins"""
+@instrumented
+async def get_margins(ctx: Context, account: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get account margins
+
+    Args:
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.margins()
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.cached_call("margins")
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def place_order(
+@instrumented
+async def place_order(
     ctx: Context,
     tradingsymbol: str,
     exchange: str,
@@ -253,6 +771,7 @@ def place_order(
     order_type: str,
     price: Optional[float] = None,
     trigger_price: Optional[float] = None,
+    account: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Place an order on Zerodha
@@ -266,10 +785,15 @@ def place_order(
         order_type: Order type (MARKET, LIMIT, SL, SL-M)
         price: Price for LIMIT orders
         trigger_price: Trigger price for SL orders
+        account: Account ID (default: the first configured account)
+
+    Returns:
+        {"order_id": ...} on success, {"error": ...} on failure
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.place_order(
+        zerodha_ctx = account_context(ctx, account)
+        order_id = await zerodha_ctx.call(
+            "place_order",
             variety="regular",
             exchange=exchange,
             tradingsymbol=tradingsymbol,
@@ -280,78 +804,462 @@ def place_order(
             price=price,
             trigger_price=trigger_price,
         )
+        return {"order_id": order_id}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def place_basket(
+    ctx: Context,
+    orders: List[Dict[str, Any]],
+    check_margins: bool = False,
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Place several orders at once. Every leg is validated locally first and
+    nothing is sent if any leg is invalid; valid legs are then placed
+    concurrently within the order rate limit.
+
+    Args:
+        orders: Order specs with the same fields as place_order
+            (tradingsymbol, exchange, transaction_type, quantity, product,
+            order_type, and optionally price, trigger_price, variety, tag)
+        check_margins: Check Kite's basket margin requirement against
+            available margin before placing anything
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        if not orders:
+            return {"error": "No orders given"}
+
+        invalid = [
+            {"leg": i, "tradingsymbol": spec.get("tradingsymbol"), "errors": errors}
+            for i, spec in enumerate(orders)
+            for errors in [validate_order(spec)]
+            if errors
+        ]
+        if invalid:
+            return {"status": "invalid", "placed": 0, "legs": invalid}
+        legs = [order_params(spec) for spec in orders]
+
+        result: Dict[str, Any] = {}
+        if check_margins:
+            basket, margins = await asyncio.gather(
+                zerodha_ctx.call(
+                    "basket_order_margins",
+                    [{k: v for k, v in leg.items() if k != "tag"} for leg in legs],
+                    consider_positions=True,
+                    mode="compact",
+                ),
+                zerodha_ctx.call("margins"),
+            )
+            required = basket["final"]["total"]
+            segments = ["equity"] + (
+                ["commodity"] if any(leg["exchange"] == "MCX" for leg in legs) else []
+            )
+            available = sum(margins.get(s, {}).get("net", 0) for s in segments)
+            result["margins"] = {"required": required, "available": available}
+            if required > available:
+                return {"status": "insufficient_margin", "placed": 0, **result}
+
+        outcomes = await asyncio.gather(
+            *(zerodha_ctx.call("place_order", **leg) for leg in legs),
+            return_exceptions=True,
+        )
+        result["legs"] = [
+            {
+                "leg": i,
+                "tradingsymbol": leg["tradingsymbol"],
+                "transaction_type": leg["transaction_type"],
+                "quantity": leg["quantity"],
+                **(
+                    {"status": "failed", "error": str(outcome)}
+                    if isinstance(outcome, Exception)
+                    else {"status": "placed", "order_id": outcome}
+                ),
+            }
+            for i, (leg, outcome) in enumerate(zip(legs, outcomes))
+        ]
+        placed = sum(leg["status"] == "placed" for leg in result["legs"])
+        result["placed"] = placed
+        result["failed"] = len(legs) - placed
+        result["status"] = "placed" if placed == len(legs) else "partial" if placed else "failed"
+        return result
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_quote(ctx: Context, symbols: List[str]) -> Dict[str, Any]:
+@instrumented
+async def get_quote(
+    ctx: Context,
+    symbols: List[str],
+    mode: str = "full",
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
     """
-    Get quote for symbols
+    Get quote for symbols. Large lists are split to Kite's per-request
+    limits and concurrent requests for the same symbols share one call.
 
     Args:
         symbols: List of symbols (e.g., ['NSE:INFY', 'BSE:RELIANCE'])
+        mode: 'full' (with market depth), 'ohlc' (OHLC and last price) or 'ltp' (last price only).
+            ltp/ohlc quotes for symbols streamed via subscribe_ticks are served from memory.
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        quotes = {}
+        if zerodha_ctx.ticker and mode in ("ltp", "ohlc"):
+            # Serve streamed instruments straight from the tick store
+            quotes = zerodha_ctx.ticker.quotes(symbols, mode)
+        remaining = [symbol for symbol in symbols if symbol not in quotes]
+        if remaining:
+            quotes.update(await zerodha_ctx.quotes.get(remaining, mode))
+        return quotes
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# Order Journal Tools
+
+
+@mcp.tool()
+@instrumented
+async def get_orders(
+    ctx: Context,
+    symbols: Optional[List[str]] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    order_id: Optional[str] = None,
+    tag: Optional[str] = None,
+    refresh: bool = False,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get orders, newest first, from the local journal. It is kept in step
+    with Kite's order book in the background and after every write; orders
+    placed since the last reconcile show status SUBMITTED.
+
+    Args:
+        symbols: Only orders for these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        status: Only orders with this status (COMPLETE, OPEN, REJECTED, CANCELLED, ...)
+        since: Only orders placed on or after this date or datetime (IST, e.g. '2024-06-03')
+        until: Only orders placed on or before this date or datetime (IST)
+        order_id: Only this order
+        tag: Only orders with this tag
+        refresh: Reconcile with Kite's order book before answering
+        fields: Only return these keys (e.g., ['order_id', 'status', 'filled_quantity'])
+        limit: Maximum number of rows
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        if refresh:
+            await zerodha_ctx.reconcile()
+        orders = await zerodha_ctx.run(
+            zerodha_ctx.journal.orders,
+            account=zerodha_ctx.account,
+            symbols=symbols,
+            status=status,
+            since=since,
+            until=until,
+            order_id=order_id,
+            tag=tag,
+            limit=limit,
+        )
+        return shape(orders, fields=fields, columnar=columnar)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_trades(
+    ctx: Context,
+    symbols: Optional[List[str]] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    order_id: Optional[str] = None,
+    refresh: bool = False,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get executed trades, newest first, from the local copy of Kite's trade book
+
+    Args:
+        symbols: Only trades in these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        since: Only trades filled on or after this date or datetime (IST, e.g. '2024-06-03')
+        until: Only trades filled on or before this date or datetime (IST)
+        order_id: Only fills of this order
+        refresh: Reconcile with Kite's trade book before answering
+        fields: Only return these keys (e.g., ['tradingsymbol', 'quantity', 'average_price'])
+        limit: Maximum number of rows
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        if refresh:
+            await zerodha_ctx.reconcile()
+        trades = await zerodha_ctx.run(
+            zerodha_ctx.journal.trades,
+            account=zerodha_ctx.account,
+            symbols=symbols,
+            since=since,
+            until=until,
+            order_id=order_id,
+            limit=limit,
+        )
+        return shape(trades, fields=fields, columnar=columnar)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_order_journal(
+    ctx: Context,
+    action: Optional[str] = None,
+    order_id: Optional[str] = None,
+    since: Optional[str] = None,
+    limit: int = 50,
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Get journaled write calls (orders, MF orders, SIP changes), newest first,
+    with their parameters and Kite's response or error, plus the outcome of
+    the last reconcile
+
+    Args:
+        action: Only this write call (place_order, place_mf_order, cancel_mf_order,
+            place_mf_sip, modify_mf_sip, cancel_mf_sip)
+        order_id: Only entries for this order or SIP ID
+        since: Only entries on or after this date or datetime (IST)
+        limit: Maximum number of entries
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        entries = await zerodha_ctx.run(
+            zerodha_ctx.journal.entries,
+            account=zerodha_ctx.account,
+            action=action,
+            order_id=order_id,
+            since=since,
+            limit=limit,
+        )
+        return {
+            "entries": entries,
+            "last_reconcile": zerodha_ctx.journal.reconciled.get(zerodha_ctx.account),
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# Streaming Tools
+
+
+@mcp.tool()
+@instrumented
+async def subscribe_ticks(
+    ctx: Context,
+    symbols: List[str],
+    mode: str = "quote",
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Stream live ticks for symbols over the Kite websocket into an in-memory
+    tick store
+
+    Args:
+        symbols: List of symbols (e.g., ['NSE:INFY', 'NSE:NIFTY 50'])
+        mode: Streaming mode (ltp, quote or full)
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        if not zerodha_ctx.kite.access_token:
+            return {"error": "Not authenticated. Please complete the login process first."}
+        tokens = await zerodha_ctx.resolve_tokens(symbols)
+        found = {token: symbol for symbol, token in tokens.items() if token is not None}
+        if found:
+            await zerodha_ctx.run(
+                zerodha_ctx.ticker.subscribe, zerodha_ctx.kite.access_token, found, mode
+            )
+        return {
+            "subscribed": {symbol: token for token, symbol in found.items()},
+            "unknown": [symbol for symbol, token in tokens.items() if token is None],
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def unsubscribe_ticks(
+    ctx: Context, symbols: List[str], account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stop streaming ticks for symbols and drop their stored ticks
+
+    Args:
+        symbols: List of symbols (e.g., ['NSE:INFY'])
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        ticker = zerodha_ctx.ticker
+        tokens = [ticker.tokens[symbol] for symbol in symbols if symbol in ticker.tokens]
+        await zerodha_ctx.run(ticker.unsubscribe, tokens)
+        return {"unsubscribed": len(tokens), "streaming": sorted(ticker.tokens)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_latest_ticks(
+    ctx: Context, symbols: List[str], account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get the most recent streamed tick for each symbol (None if not streaming)
+
+    Args:
+        symbols: List of subscribed symbols (e.g., ['NSE:INFY'])
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.quote(symbols)
+        zerodha_ctx = account_context(ctx, account)
+        ticker = zerodha_ctx.ticker
+        latest = {}
+        for symbol in symbols:
+            token = ticker.tokens.get(symbol)
+            tick = ticker.store.latest(token) if token is not None else None
+            latest[symbol] = tick_to_dict(tick, token) if tick is not None else None
+        return latest
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_historical_data(
-    ctx: Context, instrument_token: int, from_date: str, to_date: str, interval: str
-) -> List[Dict[str, Any]]:
+@instrumented
+async def get_recent_ticks(
+    ctx: Context,
+    symbol: str,
+    n: int = 100,
+    fields: Optional[List[str]] = None,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get the last n streamed ticks for a subscribed symbol, oldest first
+
+    Args:
+        symbol: Subscribed symbol (e.g., 'NSE:INFY')
+        n: Number of ticks (capped by the KITE_TICK_BUFFER size)
+        fields: Only return these keys (e.g., ['timestamp', 'last_price'])
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        ticker = zerodha_ctx.ticker
+        token = ticker.tokens.get(symbol)
+        if token is None:
+            return {"error": f"{symbol} is not subscribed. Call subscribe_ticks first."}
+        ticks = [tick_to_dict(tick, token) for tick in ticker.store.recent(token, n)]
+        return shape(ticks, fields=fields, columnar=columnar)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_historical_data(
+    ctx: Context,
+    instrument_token: int,
+    from_date: str,
+    to_date: str,
+    interval: str,
+    refresh: bool = False,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
     """
-    Get historical data for an instrument
+    Get historical data for an instrument. Candles are kept in a local
+    store, so only ranges not fetched before are requested from Kite.
 
     Args:
         instrument_token: Instrument token
-        from_date: From date (format: 2024-01-01)
-        to_date: To date (format: 2024-03-13)
+        from_date: From date (format: 2024-01-01 or 2024-01-01 09:15:00)
+        to_date: To date (format: 2024-03-13 or 2024-03-13 15:30:00)
         interval: Candle interval (minute, day, 3minute, etc.)
+        refresh: Refetch the whole range from Kite instead of using stored candles
+        fields: Only return these keys (e.g., ['date', 'close'])
+        limit: Maximum number of candles
+        offset: Number of candles to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.historical_data(
-            instrument_token=instrument_token,
-            from_date=from_date,
-            to_date=to_date,
-            interval=interval,
+        zerodha_ctx = account_context(ctx, account)
+        candles = await zerodha_ctx.candles.get(
+            instrument_token, from_date, to_date, interval, refresh=refresh
         )
+        return shape(candles, fields=fields, limit=limit, offset=offset, columnar=columnar)
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def check_and_authenticate(ctx: Context) -> Dict[str, Any]:
+@instrumented
+async def check_and_authenticate(
+    ctx: Context, account: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Check if Kite is authenticated and initiate authentication if needed.
     Returns the authentication status and any relevant messages.
+
+    Args:
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
+        zerodha_ctx = account_context(ctx, account)
 
-        # First try to load existing token
-        stored_token = load_stored_token()
-        if stored_token:
-            try:
+        session = zerodha_ctx.session
+
+        # A login completed elsewhere may have stored a newer token
+        if not session.is_valid:
+            stored_token = await zerodha_ctx.run(session.load)
+            if stored_token:
                 zerodha_ctx.kite.set_access_token(stored_token)
-                # Verify token is still valid with a simple API call
-                zerodha_ctx.kite.margins()
-                return {
-                    "status": "authenticated",
-                    "message": "Already authenticated with valid token",
-                }
-            except Exception:
-                print("Stored token is invalid, will initiate new login...")
-                if os.path.exists(TOKEN_STORE_PATH):
-                    os.remove(TOKEN_STORE_PATH)
+
+        # Validity is known locally; a rejected token is caught by the next call
+        if session.is_valid:
+            return {
+                "status": "authenticated",
+                "message": "Already authenticated with valid token",
+                "expires_at": session.expires_at.isoformat(),
+            }
 
         # If we reach here, we need to authenticate
         # Call the existing initiate_login function
-        login_result = initiate_login(ctx)
+        login_result = await initiate_login(ctx, account)
 
         if "error" in login_result:
             return {"status": "error", "message": login_result["error"]}
@@ -360,30 +1268,479 @@ def check_and_authenticate(ctx: Context) -> Dict[str, Any]:
 
     except Exception as e:
         error_msg = f"Error checking/initiating authentication: {str(e)}"
-        print(error_msg)
+        logger.error(error_msg)
         return {"status": "error", "message": error_msg}
 
 
+# Account Tools
+
+
+@mcp.tool()
+@instrumented
+async def get_accounts(ctx: Context) -> Dict[str, Any]:
+    """Get the configured accounts with their session status"""
+    pool: ZerodhaPool = ctx.request_context.lifespan_context
+    return {
+        account: {"api_key": zerodha_ctx.api_key, **zerodha_ctx.session.status()}
+        for account, zerodha_ctx in pool.accounts.items()
+    }
+
+
+@mcp.tool()
+@instrumented
+async def get_all_holdings(
+    ctx: Context,
+    combined: bool = False,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    exchange: Optional[str] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+) -> Dict[str, Any]:
+    """
+    Get holdings from every account, fetched concurrently, with each row
+    tagged by its 'account'. Accounts that fail are listed under 'errors'.
+
+    Args:
+        combined: Merge the same instrument across accounts, summing
+            quantities and re-weighting the average price
+        fields: Only return these keys (e.g., ['account', 'tradingsymbol', 'quantity'])
+        symbols: Only rows for these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        exchange: Only rows on this exchange (NSE, BSE, ...)
+        nonzero: Only rows with a non-zero quantity
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+    """
+    try:
+        pool: ZerodhaPool = ctx.request_context.lifespan_context
+        results, errors = await pool.gather(
+            lambda zerodha_ctx: zerodha_ctx.cached_call("holdings")
+        )
+        rows = [
+            {**row, "account": account}
+            for account, holdings in results.items()
+            for row in holdings
+        ]
+        return {
+            "holdings": shape(
+                combine(rows) if combined else rows,
+                fields=fields,
+                symbols=symbols,
+                exchange=exchange,
+                nonzero=nonzero,
+                limit=limit,
+                offset=offset,
+                columnar=columnar,
+            ),
+            "errors": errors,
+        }
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_all_positions(
+    ctx: Context,
+    combined: bool = False,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    exchange: Optional[str] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+) -> Dict[str, Any]:
+    """
+    Get 'net' and 'day' positions from every account, fetched concurrently,
+    with each row tagged by its 'account'. Accounts that fail are listed
+    under 'errors'.
+
+    Args:
+        combined: Merge the same instrument and product across accounts,
+            summing quantities, values and P&L
+        fields: Only return these keys (e.g., ['account', 'tradingsymbol', 'pnl'])
+        symbols: Only rows for these trading symbols (e.g., ['INFY', 'NSE:TCS'])
+        exchange: Only rows on this exchange (NSE, BSE, NFO, ...)
+        nonzero: Only rows with a non-zero quantity
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+    """
+    try:
+        pool: ZerodhaPool = ctx.request_context.lifespan_context
+        results, errors = await pool.gather(
+            lambda zerodha_ctx: zerodha_ctx.cached_call("positions")
+        )
+        out: Dict[str, Any] = {}
+        for kind in ("net", "day"):
+            rows = [
+                {**row, "account": account}
+                for account, positions in results.items()
+                for row in positions.get(kind, [])
+            ]
+            out[kind] = shape(
+                combine(rows) if combined else rows,
+                fields=fields,
+                symbols=symbols,
+                exchange=exchange,
+                nonzero=nonzero,
+                limit=limit,
+                offset=offset,
+                columnar=columnar,
+            )
+        out["errors"] = errors
+        return out
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# Analytics Tools
+
+
+@mcp.tool()
+@instrumented
+async def portfolio_analytics(
+    ctx: Context,
+    lookback_days: int = 365,
+    benchmark: str = "NSE:NIFTY 50",
+    window: int = 21,
+    top: int = 5,
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Summarise the portfolio server-side: P&L, weights, concentration, and
+    return, volatility, beta and max drawdown from stored daily candles.
+    Risk figures replay current holding quantities over the lookback.
+
+    Args:
+        lookback_days: Calendar days of daily candles to analyse
+        benchmark: Index to compute beta against (e.g., 'NSE:NIFTY 50')
+        window: Trading days in the rolling return window
+        top: Number of largest weights to report
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        holdings, positions, tokens = await asyncio.gather(
+            zerodha_ctx.cached_call("holdings"),
+            zerodha_ctx.cached_call("positions"),
+            zerodha_ctx.resolve_tokens([benchmark]),
+        )
+
+        to_date = date.fromisoformat(today_ist())
+        from_date = to_date - timedelta(days=lookback_days)
+        series = {h["tradingsymbol"]: h["instrument_token"] for h in holdings}
+        if tokens[benchmark] is not None:
+            series[benchmark] = tokens[benchmark]
+        results = await asyncio.gather(
+            *(
+                zerodha_ctx.candles.get(token, from_date, to_date, "day")
+                for token in series.values()
+            ),
+            return_exceptions=True,
+        )
+        candles = {
+            symbol: result
+            for symbol, result in zip(series, results)
+            if not isinstance(result, Exception)
+        }
+
+        summary = await zerodha_ctx.run(
+            analytics.summarize,
+            holdings,
+            positions,
+            candles,
+            candles.pop(benchmark, None),
+            window=window,
+            top=top,
+        )
+        if benchmark not in series:
+            summary["warning"] = f"Unknown benchmark {benchmark}, beta not computed"
+        return summary
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def compute_indicators(
+    ctx: Context,
+    symbols: List[str],
+    interval: str = "day",
+    from_date: Optional[str] = None,
+    to_date: Optional[str] = None,
+    indicators: Optional[List[str]] = None,
+    last: Optional[int] = 50,
+    account: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compute technical indicators from stored candles. Many instruments are
+    computed in parallel on a process pool, and each series is returned
+    as {column: [values]}.
+
+    Args:
+        symbols: List of symbols (e.g., ['NSE:INFY', 'NSE:TCS'])
+        interval: Candle interval (minute, day, 3minute, etc.)
+        from_date: Start date (default: 1 year back for day candles, 30 days for intraday)
+        to_date: End date (default: today)
+        indicators: Indicators with optional parameters, e.g. ['sma:50', 'ema:20',
+            'rsi:14', 'macd:12,26,9', 'bollinger:20,2', 'atr:14', 'vwap'];
+            defaults to all of them with default parameters
+        last: Only return the last n rows of each series (None for all)
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        specs = [parse_spec(text) for text in indicators or INDICATOR_DEFAULTS]
+        intraday = interval != "day"
+        to_date = to_date or today_ist()
+        from_date = from_date or (
+            date.fromisoformat(to_date[:10]) - timedelta(days=30 if intraday else 365)
+        ).isoformat()
+
+        tokens = await zerodha_ctx.resolve_tokens(symbols)
+        found = [symbol for symbol, token in tokens.items() if token is not None]
+        results = await asyncio.gather(
+            *(zerodha_ctx.candles.get(tokens[s], from_date, to_date, interval) for s in found),
+            return_exceptions=True,
+        )
+        candles = {s: r for s, r in zip(found, results) if not isinstance(r, Exception)}
+        response: Dict[str, Any] = {"indicators": {}}
+        errors = {s: str(r) for s, r in zip(found, results) if isinstance(r, Exception)}
+
+        batch = [
+            (symbol, from_candles(rows, intraday))
+            for symbol, rows in candles.items()
+            if rows
+        ]
+        if len(batch) > 1 and KITE_INDICATOR_WORKERS > 1:
+            # One chunk per worker keeps pickling overhead to a few round trips
+            size = -(-len(batch) // KITE_INDICATOR_WORKERS)
+            chunks = await asyncio.gather(
+                *(
+                    zerodha_ctx.run_cpu(compute_batch, batch[i : i + size], specs)
+                    for i in range(0, len(batch), size)
+                )
+            )
+            computed = dict(pair for chunk in chunks for pair in chunk)
+        elif batch:
+            computed = dict(await zerodha_ctx.run(compute_batch, batch, specs))
+        else:
+            computed = {}
+
+        for symbol, series in computed.items():
+            rows = candles[symbol][-last:] if last else candles[symbol]
+            n = len(rows)
+            response["indicators"][symbol] = {
+                "date": [c["date"].isoformat() for c in rows],
+                "close": [c["close"] for c in rows],
+                **{
+                    name: [None if np.isnan(v) else round(float(v), 4) for v in values[-n:]]
+                    for name, values in series.items()
+                },
+            }
+
+        empty = [s for s in found if s in candles and not candles[s]]
+        if empty:
+            errors.update({s: "No candles in range" for s in empty})
+        unknown = [symbol for symbol, token in tokens.items() if token is None]
+        if unknown:
+            response["unknown"] = unknown
+        if errors:
+            response["errors"] = errors
+        return response
+    except Exception as e:
+        return {"error": str(e)}
+
+
+# Instrument Tools
+
+
+@mcp.tool()
+@instrumented
+async def lookup_instruments(
+    ctx: Context, symbols: List[str], account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Resolve symbols to instrument details, including the instrument_token
+    needed by get_historical_data, from the local instrument index
+
+    Args:
+        symbols: List of symbols (e.g., ['NSE:INFY', 'NFO:NIFTY24DECFUT'])
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        index = await zerodha_ctx.ensure_instruments()
+        return await zerodha_ctx.run(index.lookup, symbols)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def search_instruments(
+    ctx: Context,
+    query: str,
+    exchange: Optional[str] = None,
+    segment: Optional[str] = None,
+    instrument_type: Optional[str] = None,
+    fuzzy: bool = False,
+    limit: int = 20,
+    offset: int = 0,
+    fields: Optional[List[str]] = None,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Search the local instrument index by trading symbol prefix, or fuzzily
+    by symbol and company name
+
+    Args:
+        query: Symbol prefix (e.g., 'INF') or, with fuzzy=True, free text (e.g., 'infosys')
+        exchange: Optional exchange filter (NSE, BSE, NFO, etc.)
+        segment: Optional segment filter (e.g., 'NFO-OPT')
+        instrument_type: Optional type filter (EQ, FUT, CE, PE)
+        fuzzy: Match anywhere in symbol/name and rank by similarity
+        limit: Maximum number of results
+        offset: Number of results to skip, for paging
+        fields: Only return these keys (e.g., ['tradingsymbol', 'instrument_token'])
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        index = await zerodha_ctx.ensure_instruments()
+        results = await zerodha_ctx.run(
+            index.search,
+            query,
+            exchange=exchange,
+            segment=segment,
+            instrument_type=instrument_type,
+            fuzzy=fuzzy,
+            limit=offset + limit,
+        )
+        return shape(results, fields=fields, offset=offset, columnar=columnar)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def refresh_instruments(
+    ctx: Context, account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Force a fresh download of the instrument master into the local index
+
+    Args:
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        index = await zerodha_ctx.ensure_instruments(force=True)
+        return {"refreshed_on": await zerodha_ctx.run(index.refreshed_on)}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_cache_stats(
+    ctx: Context, account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get hit/miss counts, TTLs and entry ages of the read-only endpoint cache
+
+    Args:
+        account: Account ID (default: the first configured account)
+    """
+    zerodha_ctx = account_context(ctx, account)
+    return zerodha_ctx.cache.stats()
+
+
+@mcp.tool()
+@instrumented
+async def get_rate_limit_stats(
+    ctx: Context, account: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Get per-endpoint-class request rates, queue depth, wait times and 429 retries
+
+    Args:
+        account: Account ID (default: the first configured account)
+    """
+    zerodha_ctx = account_context(ctx, account)
+    return zerodha_ctx.limiter.stats()
+
+
+@mcp.tool()
+@instrumented
+async def server_stats(ctx: Context, tool: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get per-tool wall time, Kite time and payload size percentiles with
+    error counts by class, plus latency per Kite API method
+
+    Args:
+        tool: Only report this tool
+    """
+    # Metrics are process-wide, shared by every account
+    zerodha_ctx = account_context(ctx)
+    return zerodha_ctx.metrics.stats(tool)
+
+
 # Mutual Fund Tools
 
 
 @mcp.tool()
-def get_mf_orders(ctx: Context) -> List[Dict[str, Any]]:
-    """Get all mutual fund orders"""
+@instrumented
+async def get_mf_orders(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get all mutual fund orders
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'quantity'])
+        symbols: Only orders for these scheme symbols (e.g., ['INF090I01239'])
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.mf_orders()
+        zerodha_ctx = account_context(ctx, account)
+        return shape(
+            await zerodha_ctx.call("mf_orders"),
+            fields=fields,
+            symbols=symbols,
+            limit=limit,
+            offset=offset,
+            columnar=columnar,
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def place_mf_order(
+@instrumented
+async def place_mf_order(
     ctx: Context,
     tradingsymbol: str,
     transaction_type: str,
     amount: float,
     tag: Optional[str] = None,
+    account: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Place a mutual fund order
@@ -393,10 +1750,12 @@ def place_mf_order(
         transaction_type: BUY or SELL
         amount: Amount to invest or redeem
         tag: Optional tag for the order
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.place_mf_order(
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.call(
+            "place_mf_order",
             tradingsymbol=tradingsymbol,
             transaction_type=transaction_type,
             amount=amount,
@@ -407,52 +1766,183 @@ def place_mf_order(
 
 
 @mcp.tool()
-def cancel_mf_order(ctx: Context, order_id: str) -> Dict[str, Any]:
+@instrumented
+async def cancel_mf_order(
+    ctx: Context, order_id: str, account: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Cancel a mutual fund order
 
     Args:
         order_id: Order ID to cancel
+        account: Account ID (default: the first configured account)
+    """
+    try:
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.call("cancel_mf_order", order_id=order_id)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool()
+@instrumented
+async def get_mf_instruments(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get all available mutual fund instruments (served from the local instrument index)
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'name'])
+        symbols: Only these scheme symbols (e.g., ['INF090I01239'])
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.cancel_mf_order(order_id=order_id)
+        zerodha_ctx = account_context(ctx, account)
+        index = await zerodha_ctx.ensure_instruments()
+        return shape(
+            await zerodha_ctx.run(index.search_mf, limit=None),
+            fields=fields,
+            symbols=symbols,
+            limit=limit,
+            offset=offset,
+            columnar=columnar,
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_mf_instruments(ctx: Context) -> List[Dict[str, Any]]:
-    """Get all available mutual fund instruments"""
+@instrumented
+async def search_mf_instruments(
+    ctx: Context,
+    query: str = "",
+    amc: Optional[str] = None,
+    plan: Optional[str] = None,
+    scheme_type: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    fields: Optional[List[str]] = None,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Search mutual fund schemes in the local instrument index
+
+    Args:
+        query: Words to match in the scheme name or ISIN (e.g., 'parag flexi')
+        amc: Optional AMC filter (e.g., 'PPFAS_MF')
+        plan: Optional plan filter (direct or regular)
+        scheme_type: Optional scheme type filter (equity, debt, ...)
+        limit: Maximum number of results
+        offset: Number of results to skip, for paging
+        fields: Only return these keys (e.g., ['tradingsymbol', 'name'])
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.mf_instruments()
+        zerodha_ctx = account_context(ctx, account)
+        index = await zerodha_ctx.ensure_instruments()
+        results = await zerodha_ctx.run(
+            index.search_mf,
+            query,
+            amc=amc,
+            plan=plan,
+            scheme_type=scheme_type,
+            limit=offset + limit,
+        )
+        return shape(results, fields=fields, offset=offset, columnar=columnar)
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_mf_holdings(ctx: Context) -> List[Dict[str, Any]]:
-    """Get user's mutual fund holdings"""
+@instrumented
+async def get_mf_holdings(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get user's mutual fund holdings
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'quantity'])
+        symbols: Only holdings of these scheme symbols (e.g., ['INF090I01239'])
+        nonzero: Only rows with a non-zero quantity
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.mf_holdings()
+        zerodha_ctx = account_context(ctx, account)
+        return shape(
+            await zerodha_ctx.cached_call("mf_holdings"),
+            fields=fields,
+            symbols=symbols,
+            nonzero=nonzero,
+            limit=limit,
+            offset=offset,
+            columnar=columnar,
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def get_mf_sips(ctx: Context) -> List[Dict[str, Any]]:
-    """Get all mutual fund SIPs"""
+@instrumented
+async def get_mf_sips(
+    ctx: Context,
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+    account: Optional[str] = None,
+) -> Rows:
+    """
+    Get all mutual fund SIPs
+
+    Args:
+        fields: Only return these keys (e.g., ['tradingsymbol', 'instalment_amount'])
+        symbols: Only SIPs in these scheme symbols (e.g., ['INF090I01239'])
+        limit: Maximum number of rows
+        offset: Number of matching rows to skip, for paging
+        columnar: Return {column: [values]} instead of a list of rows
+        account: Account ID (default: the first configured account)
+    """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.mf_sips()
+        zerodha_ctx = account_context(ctx, account)
+        return shape(
+            await zerodha_ctx.cached_call("mf_sips"),
+            fields=fields,
+            symbols=symbols,
+            limit=limit,
+            offset=offset,
+            columnar=columnar,
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool()
-def place_mf_sip(
+@instrumented
+async def place_mf_sip(
     ctx: Context,
     tradingsymbol: str,
     amount: float,
@@ -461,6 +1951,7 @@ def place_mf_sip(
     initial_amount: Optional[float] = None,
     instalment_day: Optional[int] = None,
     tag: Optional[str] = None,
+    account: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Place a mutual fund SIP (Systematic Investment Plan)
@@ -473,10 +1964,12 @@ def place_mf_sip(
         initial_amount: Optional initial amount
         instalment_day: Optional day of month/week for instalment (1-31 for monthly, 1-7 for weekly)
         tag: Optional tag for the SIP
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.place_mf_sip(
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.call(
+            "place_mf_sip",
             tradingsymbol=tradingsymbol,
             amount=amount,
             instalments=instalments,
@@ -490,7 +1983,8 @@ def place_mf_sip(
 
 
 @mcp.tool()
-def modify_mf_sip(
+@instrumented
+async def modify_mf_sip(
     ctx: Context,
     sip_id: str,
     amount: Optional[float] = None,
@@ -498,6 +1992,7 @@ def modify_mf_sip(
     instalments: Optional[int] = None,
     instalment_day: Optional[int] = None,
     status: Optional[str] = None,
+    account: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Modify a mutual fund SIP
@@ -509,10 +2004,12 @@ def modify_mf_sip(
         instalments: New number of instalments
         instalment_day: New day of month/week for instalment
         status: SIP status (active or paused)
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.modify_mf_sip(
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.call(
+            "modify_mf_sip",
             sip_id=sip_id,
             amount=amount,
             frequency=frequency,
@@ -525,21 +2022,25 @@ def modify_mf_sip(
 
 
 @mcp.tool()
-def cancel_mf_sip(ctx: Context, sip_id: str) -> Dict[str, Any]:
+@instrumented
+async def cancel_mf_sip(
+    ctx: Context, sip_id: str, account: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Cancel a mutual fund SIP
 
     Args:
         sip_id: SIP ID to cancel
+        account: Account ID (default: the first configured account)
     """
     try:
-        zerodha_ctx: ZerodhaContext = ctx.request_context.lifespan_context
-        return zerodha_ctx.kite.cancel_mf_sip(sip_id=sip_id)
+        zerodha_ctx = account_context(ctx, account)
+        return await zerodha_ctx.call("cancel_mf_sip", sip_id=sip_id)
     except Exception as e:
         return {"error": str(e)}
 
 
 if __name__ == "__main__":
     # We don't need the main function anymore since MCP handles the lifecycle
-    print("Starting Zerodha MCP server...")
+    logger.info("Starting Zerodha MCP server...")
     mcp.run()
@@ -0,0 +1,72 @@
+"""
+Throughput of concurrent Kite calls through ZerodhaContext.call versus the
+old sequential, blocking tool behaviour, measured against mock_kite.py.
+
+Usage:
+    python benchmarks/bench_concurrency.py --calls 64 --latency-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kiteconnect import KiteConnect  # noqa: E402
+
+from app import KITE_MAX_WORKERS, RATE_LIMITS, ZerodhaContext  # noqa: E402
+from mock_kite import MockKiteServer  # noqa: E402
+from ratelimit import RateLimiter  # noqa: E402
+
+METHODS = [("holdings", ()), ("positions", ()), ("margins", ()), ("quote", (["NSE:INFY"],))]
+
+
+def run_sequential(kite: KiteConnect, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        method, args = METHODS[i % len(METHODS)]
+        getattr(kite, method)(*args)
+    return time.perf_counter() - start
+
+
+async def run_concurrent(ctx: ZerodhaContext, calls: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(ctx.call(METHODS[i % len(METHODS)][0], *METHODS[i % len(METHODS)][1]) for i in range(calls))
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    server = MockKiteServer(latency_ms=args.latency_ms).start()
+    try:
+        kite = KiteConnect(api_key="bench", access_token="bench", root=server.url)
+        # Lift Kite's per-second limits so the thread pool itself is measured
+        limiter = RateLimiter({name: 1e6 for name in RATE_LIMITS}, slots=KITE_MAX_WORKERS)
+        ctx = ZerodhaContext(
+            kite=kite, api_key="bench", api_secret="bench", limiter=limiter
+        )
+
+        sequential = run_sequential(kite, args.calls)
+        concurrent = asyncio.run(run_concurrent(ctx, args.calls))
+        ctx.executor.shutdown()
+
+        print(f"{args.calls} calls, {args.latency_ms:.0f} ms simulated latency")
+        print(f"  sequential : {sequential:7.3f} s  {args.calls / sequential:8.1f} calls/s")
+        print(
+            f"  concurrent : {concurrent:7.3f} s  {args.calls / concurrent:8.1f} calls/s"
+            f"  ({ctx.executor._max_workers} workers, {sequential / concurrent:.1f}x)"
+        )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Load test of the Zerodha MCP server against mock_kite.py: opens an MCP
+client session to the server, fires a mix of concurrent tool calls and
+reports p50/p95/p99 latency per tool.
+
+The mock can add latency jitter, enforce Kite's per-second limits with
+HTTP 429s, throttle at random and expire the access token mid-run, so the
+server's rate limiting, retries and session handling are exercised too.
+
+Usage:
+    python benchmarks/load_test.py --calls 500 --concurrency 32 --latency-ms 50
+    python benchmarks/load_test.py --kite-limits --throttle-rate 0.05 --token-ttl 10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mock_kite import KITE_LIMITS, MockKiteServer  # noqa: E402
+
+SYMBOLS = ["NSE:INFY", "NSE:TCS", "NSE:RELIANCE", "BSE:INFY"]
+
+# (tool, weight, argument factory)
+WORKLOAD: List[Tuple[str, int, Any]] = [
+    ("get_holdings", 20, lambda: {}),
+    ("get_positions", 15, lambda: {}),
+    ("get_margins", 10, lambda: {}),
+    ("get_quote", 25, lambda: {"symbols": random.sample(SYMBOLS, 2), "mode": random.choice(["full", "ltp"])}),
+    ("lookup_instruments", 10, lambda: {"symbols": random.sample(SYMBOLS, 2)}),
+    (
+        "get_historical_data",
+        10,
+        lambda: {
+            "instrument_token": random.choice([408065, 2953217, 738561]),
+            "from_date": "2024-01-01",
+            "to_date": "2024-06-30",
+            "interval": "day",
+            "fields": ["date", "close"],
+            "limit": 5,
+        },
+    ),
+    ("portfolio_analytics", 5, lambda: {"lookback_days": 180}),
+]
+
+
+def is_error(result: Any) -> bool:
+    if result.isError:
+        return True
+    for block in result.content:
+        try:
+            payload = json.loads(block.text)
+        except (AttributeError, ValueError):
+            continue
+        if isinstance(payload, dict) and "error" in payload:
+            return True
+    return False
+
+
+async def run_load(session: Any, calls: int, concurrency: int) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    tools = [tool for tool, _, _ in WORKLOAD]
+    weights = [weight for _, weight, _ in WORKLOAD]
+    args_for = {tool: factory for tool, _, factory in WORKLOAD}
+    plan = random.choices(tools, weights=weights, k=calls)
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    queue: asyncio.Queue = asyncio.Queue()
+    for tool in plan:
+        queue.put_nowait(tool)
+
+    async def worker() -> None:
+        while not queue.empty():
+            tool = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                failed = is_error(await session.call_tool(tool, args_for[tool]()))
+            except Exception:
+                failed = True
+            latencies[tool].append((time.perf_counter() - start) * 1000)
+            errors[tool] += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(latencies: Dict[str, List[float]], errors: Dict[str, int], elapsed: float) -> None:
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} calls in {elapsed:.2f} s ({total / elapsed:.1f} calls/s)")
+    print(f"  {'tool':<24}{'calls':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for tool in sorted(latencies, key=lambda t: -len(latencies[t])):
+        p50, p95, p99 = np.percentile(latencies[tool], [50, 95, 99])
+        print(
+            f"  {tool:<24}{len(latencies[tool]):>7}{errors[tool]:>8}"
+            f"{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}{max(latencies[tool]):>10.1f}"
+        )
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    # Imported only now so app picks up the environment pointing it at the mock
+    import app
+    from mcp.shared.memory import create_connected_server_and_client_session
+
+    async with create_connected_server_and_client_session(app.mcp._mcp_server) as session:
+        # Warm the instrument index so the first calls don't all wait for it
+        await session.call_tool("lookup_instruments", {"symbols": SYMBOLS[:1]})
+        latencies, errors, elapsed = await run_load(session, args.calls, args.concurrency)
+        limiter = json.loads((await session.call_tool("get_rate_limit_stats", {})).content[0].text)
+    report(latencies, errors, elapsed)
+    print("  server-side throttling:", {name: s["throttled"] for name, s in limiter.items()})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--kite-limits", action="store_true", help="Mock enforces Kite's per-second limits")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    server = MockKiteServer(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limits=KITE_LIMITS if args.kite_limits else None,
+        throttle_rate=args.throttle_rate,
+        token_ttl=args.token_ttl,
+    ).start()
+    with tempfile.TemporaryDirectory() as workdir:
+        token_store = os.path.join(workdir, ".tokens")
+        with open(token_store, "w") as f:
+            f.write("load-test")
+        os.environ.update(
+            KITE_API_KEY=os.getenv("KITE_API_KEY", "load-test"),
+            KITE_API_SECRET=os.getenv("KITE_API_SECRET", "load-test"),
+            KITE_ROOT=server.url,
+            KITE_TOKEN_STORE=token_store,
+            KITE_INSTRUMENTS_DB=os.path.join(workdir, "instruments.db"),
+            KITE_CANDLES_DB=os.path.join(workdir, "candles.db"),
+            KITE_JOURNAL_DB=os.path.join(workdir, "journal.db"),
+        )
+        try:
+            asyncio.run(main_async(args))
+        finally:
+            server.stop()
+    print("  mock Kite:", dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+TTL cache for read-only Kite endpoints.
+
+Entries are keyed by endpoint name (e.g. 'holdings') and expire after the
+TTL configured for that endpoint. Concurrent misses for the same endpoint
+share one upstream fetch, and write tools invalidate the entries they can
+change.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class TTLCache:
+    """Per-endpoint TTL cache with hit/miss accounting"""
+
+    def __init__(self, ttls: Dict[str, float]):
+        self.ttls = dict(ttls)
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.invalidations: Counter = Counter()
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # Bumped on invalidation so an in-flight fetch can't store stale data
+        self._generations: Counter = Counter()
+
+    def _fresh(self, key: str) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return True, entry[1]
+        return False, None
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for key, calling fetch on a miss.
+
+        Args:
+            key: Endpoint name used for the TTL lookup and stats
+            fetch: Coroutine factory producing the fresh value
+        """
+        ttl = self.ttls.get(key, 0)
+        if ttl <= 0:
+            self.misses[key] += 1
+            return await fetch()
+
+        hit, value = self._fresh(key)
+        if hit:
+            self.hits[key] += 1
+            return value
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            # Another caller may have filled the entry while we waited
+            hit, value = self._fresh(key)
+            if hit:
+                self.hits[key] += 1
+                return value
+
+            self.misses[key] += 1
+            generation = self._generations[key]
+            value = await fetch()
+            if generation == self._generations[key]:
+                self._entries[key] = (time.monotonic() + ttl, value)
+            return value
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop the given entries, or every entry if no keys are passed"""
+        for key in keys or tuple(self._entries):
+            self._generations[key] += 1
+            if self._entries.pop(key, None) is not None:
+                self.invalidations[key] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit/miss counts, TTL and entry age for every known endpoint"""
+        now = time.monotonic()
+        stats = {}
+        for key in sorted(set(self.ttls) | set(self.hits) | set(self.misses)):
+            entry = self._entries.get(key)
+            ttl = self.ttls.get(key, 0)
+            stats[key] = {
+                "ttl_seconds": ttl,
+                "hits": self.hits[key],
+                "misses": self.misses[key],
+                "invalidations": self.invalidations[key],
+                "cached": bool(entry and entry[0] > now),
+                "age_seconds": round(now - (entry[0] - ttl), 3) if entry else None,
+            }
+        return stats
@@ -0,0 +1,229 @@
+"""
+Persistent OHLCV candle store for Kite historical data.
+
+Candles are kept in a SQLite file keyed by (instrument_token, interval,
+timestamp), alongside the time ranges already fetched for each series.
+A request only fetches the gaps between held ranges; gaps longer than
+Kite's per-interval window are split into chunks fetched in parallel.
+Repeat queries over held ranges are answered from disk with no network I/O.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from timeutil import IST, DateLike, parse_bound
+
+# Longest range (in days) Kite returns in one historical_data call per interval
+MAX_DAYS = {
+    "minute": 60,
+    "3minute": 100,
+    "5minute": 100,
+    "10minute": 100,
+    "15minute": 200,
+    "30minute": 200,
+    "60minute": 400,
+    "day": 2000,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candles (
+    instrument_token INTEGER NOT NULL,
+    interval TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL,
+    volume INTEGER,
+    PRIMARY KEY (instrument_token, interval, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    instrument_token INTEGER NOT NULL,
+    interval TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_coverage ON coverage (instrument_token, interval, start);
+"""
+
+Range = Tuple[int, int]
+
+
+def subtract(want: Range, held: List[Range]) -> List[Range]:
+    """Parts of the inclusive range want not covered by sorted held ranges"""
+    gaps, cursor = [], want[0]
+    for start, end in held:
+        if end < cursor or start > want[1]:
+            continue
+        if start > cursor:
+            gaps.append((cursor, start - 1))
+        cursor = max(cursor, end + 1)
+    if cursor <= want[1]:
+        gaps.append((cursor, want[1]))
+    return gaps
+
+
+def split(gap: Range, max_days: int) -> List[Range]:
+    """Split an inclusive range into windows Kite accepts in one call"""
+    step = max_days * 86400
+    return [(s, min(s + step - 1, gap[1])) for s in range(gap[0], gap[1] + 1, step)]
+
+
+class CandleStore:
+    """SQLite-backed candle cache that fetches only missing ranges"""
+
+    def __init__(
+        self,
+        path: str,
+        call: Callable[..., Awaitable[Any]],
+        run: Callable[..., Awaitable[Any]],
+    ):
+        """
+        Args:
+            path: SQLite file holding candles and fetched ranges
+            call: Coroutine calling a KiteConnect method by name
+            run: Coroutine running a blocking function off the event loop
+        """
+        self.path = path
+        self.call = call
+        self.run = run
+        self._write_lock = threading.Lock()
+        self._series_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        if not self._initialized:
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def held(self, token: int, interval: str) -> List[Range]:
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT start, end FROM coverage WHERE instrument_token = ? AND interval = ? ORDER BY start",
+                (token, interval),
+            ).fetchall()
+
+    def _save(self, token: int, interval: str, candles: List[Dict[str, Any]], fetched: List[Range]) -> None:
+        """Insert candles and merge the fetched ranges into coverage"""
+        rows = [
+            (
+                token,
+                interval,
+                int(c["date"].timestamp()),
+                c["open"],
+                c["high"],
+                c["low"],
+                c["close"],
+                c.get("volume"),
+            )
+            for c in candles
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            ranges = sorted(
+                conn.execute(
+                    "SELECT start, end FROM coverage WHERE instrument_token = ? AND interval = ?",
+                    (token, interval),
+                ).fetchall()
+                + fetched
+            )
+            merged: List[List[int]] = []
+            for start, end in ranges:
+                if merged and start <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], end)
+                else:
+                    merged.append([start, end])
+            conn.execute(
+                "DELETE FROM coverage WHERE instrument_token = ? AND interval = ?", (token, interval)
+            )
+            conn.executemany(
+                "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                [(token, interval, start, end) for start, end in merged],
+            )
+
+    def read(self, token: int, interval: str, start: int, end: int) -> List[Dict[str, Any]]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ts, open, high, low, close, volume FROM candles "
+                "WHERE instrument_token = ? AND interval = ? AND ts BETWEEN ? AND ? ORDER BY ts",
+                (token, interval, start, end),
+            ).fetchall()
+        return [
+            {
+                "date": datetime.fromtimestamp(ts, IST),
+                "open": o,
+                "high": h,
+                "low": low,
+                "close": c,
+                "volume": v,
+            }
+            for ts, o, h, low, c, v in rows
+        ]
+
+    async def get(
+        self,
+        token: int,
+        from_date: DateLike,
+        to_date: DateLike,
+        interval: str,
+        refresh: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """
+        Candles for token between from_date and to_date (inclusive),
+        fetching only the ranges not already held on disk.
+
+        Args:
+            token: Instrument token
+            from_date: Start date or datetime (IST)
+            to_date: End date or datetime (IST); a date covers the whole day
+            interval: Candle interval (minute, day, 3minute, etc.)
+            refresh: Refetch the whole range even if it is held
+        """
+        if interval not in MAX_DAYS:
+            raise ValueError(f"Unknown interval '{interval}', expected one of {list(MAX_DAYS)}")
+        start, end = parse_bound(from_date), parse_bound(to_date, end=True)
+        if start > end:
+            raise ValueError("from_date must not be after to_date")
+
+        async with self._series_locks.setdefault((token, interval), asyncio.Lock()):
+            held = [] if refresh else await self.run(self.held, token, interval)
+            chunks = [
+                chunk
+                for gap in subtract((start, end), held)
+                for chunk in split(gap, MAX_DAYS[interval])
+            ]
+            if chunks:
+                results = await asyncio.gather(
+                    *(
+                        self.call(
+                            "historical_data",
+                            instrument_token=token,
+                            from_date=datetime.fromtimestamp(s, IST).replace(tzinfo=None),
+                            to_date=datetime.fromtimestamp(e, IST).replace(tzinfo=None),
+                            interval=interval,
+                        )
+                        for s, e in chunks
+                    )
+                )
+                # Today's candles are still forming, so only earlier days count as held
+                today = int(datetime.combine(datetime.now(IST).date(), time(), IST).timestamp())
+                fetched = [(s, min(e, today - 1)) for s, e in chunks if s < today]
+                await self.run(
+                    self._save,
+                    token,
+                    interval,
+                    [candle for result in results for candle in result],
+                    fetched,
+                )
+        return await self.run(self.read, token, interval, start, end)
@@ -0,0 +1,129 @@
+"""
+Local stand-in for the Kite ticker websocket.
+
+Accepts KiteTicker subscribe/mode/unsubscribe messages and streams binary
+quote-mode packets (the same wire format as wss://ws.kite.trade) for the
+subscribed instruments at a fixed interval, so the streaming tools can be
+exercised without a live Zerodha account.
+
+Usage:
+    python fake_ticker.py --port 5056 --interval-ms 100
+    KITE_TICKER_ROOT=ws://127.0.0.1:5056 python app.py
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import struct
+from threading import Event, Thread
+from typing import Dict, Optional, Set
+
+from websockets.asyncio.server import ServerConnection, serve
+
+
+def quote_packet(token: int, price: float) -> bytes:
+    """44-byte quote-mode packet; prices are sent in paise"""
+    paise = int(round(price * 100))
+    return struct.pack(
+        ">11I",
+        token,
+        paise,
+        1,  # last traded quantity
+        paise,  # average traded price
+        100000,  # volume
+        500,  # total buy quantity
+        400,  # total sell quantity
+        paise,  # open
+        int(paise * 1.01),  # high
+        int(paise * 0.99),  # low
+        paise,  # close
+    )
+
+
+def frame(packets: list) -> bytes:
+    return struct.pack(">H", len(packets)) + b"".join(
+        struct.pack(">H", len(packet)) + packet for packet in packets
+    )
+
+
+class FakeTickerFeed:
+    """Websocket server emitting random-walk ticks for subscribed tokens"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, interval_ms: float = 100.0):
+        self.host = host
+        self.port = port
+        self.interval = interval_ms / 1000
+        self.prices: Dict[int, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._thread: Optional[Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handle(self, connection: ServerConnection) -> None:
+        subscribed: Set[int] = set()
+
+        async def stream() -> None:
+            while True:
+                await asyncio.sleep(self.interval)
+                packets = []
+                for token in list(subscribed):
+                    price = self.prices.setdefault(token, 100 + token % 1000)
+                    self.prices[token] = price = max(0.05, price + random.uniform(-0.5, 0.5))
+                    packets.append(quote_packet(token, price))
+                if packets:
+                    await connection.send(frame(packets))
+
+        streamer = asyncio.create_task(stream())
+        try:
+            async for message in connection:
+                request = json.loads(message)
+                if request.get("a") == "subscribe":
+                    subscribed.update(request["v"])
+                elif request.get("a") == "unsubscribe":
+                    subscribed.difference_update(request["v"])
+        finally:
+            streamer.cancel()
+
+    async def serve(self, started: Optional[Event] = None) -> None:
+        self._stop = asyncio.Event()
+        async with serve(self._handle, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            if started is not None:
+                started.set()
+            await self._stop.wait()
+
+    def start(self) -> "FakeTickerFeed":
+        """Serve on a private event loop in a background daemon thread"""
+        self._loop = asyncio.new_event_loop()
+        started = Event()
+        self._thread = Thread(
+            target=self._loop.run_until_complete, args=(self.serve(started),), daemon=True
+        )
+        self._thread.start()
+        if not started.wait(5):
+            raise TimeoutError("Fake ticker feed did not start")
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+            self._thread.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake Kite ticker websocket")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5056)
+    parser.add_argument("--interval-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    feed = FakeTickerFeed(args.host, args.port, args.interval_ms)
+    print(f"Fake Kite ticker listening on {feed.url}")
+    try:
+        asyncio.run(feed.serve())
+    except KeyboardInterrupt:
+        pass
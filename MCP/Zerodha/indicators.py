@@ -0,0 +1,167 @@
+"""
+Vectorised technical indicators over OHLCV arrays.
+
+Rolling-window indicators (SMA, Bollinger bands, VWAP) use NumPy cumulative
+sums and sliding windows; the recursive ones (EMA, RSI, MACD, ATR) use
+pandas' exponentially weighted means, which run in compiled code. compute()
+and compute_batch() are plain module-level functions so they can be shipped
+to a process pool when many instruments are requested at once.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Indicator name -> default parameters
+DEFAULTS: Dict[str, Tuple[float, ...]] = {
+    "sma": (20,),
+    "ema": (20,),
+    "rsi": (14,),
+    "macd": (12, 26, 9),
+    "bollinger": (20, 2),
+    "atr": (14,),
+    "vwap": (),
+}
+
+Spec = Tuple[str, Tuple[float, ...]]
+Arrays = Dict[str, np.ndarray]
+
+
+def parse_spec(text: str) -> Spec:
+    """
+    Parse 'name' or 'name:p1,p2' (e.g. 'sma:50', 'bollinger:20,2.5'),
+    falling back to DEFAULTS for omitted parameters.
+    """
+    name, _, params = text.strip().lower().partition(":")
+    if name not in DEFAULTS:
+        raise ValueError(f"Unknown indicator '{name}', expected one of {list(DEFAULTS)}")
+    values = tuple(float(p) for p in params.split(",") if p.strip()) if params else ()
+    return name, values + DEFAULTS[name][len(values) :]
+
+
+def rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing window sums, NaN until the window is full"""
+    out = np.full(len(values), np.nan)
+    if window <= len(values):
+        cumsum = np.concatenate(([0.0], np.cumsum(values, dtype=float)))
+        out[window - 1 :] = cumsum[window:] - cumsum[:-window]
+    return out
+
+
+def sma(close: np.ndarray, period: int) -> np.ndarray:
+    return rolling_sum(close, period) / period
+
+
+def rolling_std(close: np.ndarray, period: int) -> np.ndarray:
+    """Population standard deviation over trailing windows"""
+    out = np.full(len(close), np.nan)
+    if period <= len(close):
+        windows = np.lib.stride_tricks.sliding_window_view(close, period)
+        out[period - 1 :] = windows.std(axis=1)
+    return out
+
+
+def ema(values: np.ndarray, span: float) -> np.ndarray:
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (an EMA with alpha = 1/period)"""
+    return pd.Series(values).ewm(alpha=1 / period, adjust=False, min_periods=period).mean().to_numpy()
+
+
+def rsi(close: np.ndarray, period: int) -> np.ndarray:
+    change = np.diff(close, prepend=np.nan)
+    gain = wilder(np.where(change > 0, change, 0.0)[1:], period)
+    loss = wilder(np.where(change < 0, -change, 0.0)[1:], period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100 - 100 / (1 + gain / loss)
+    values = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), values)
+    return np.concatenate(([np.nan], np.where(np.isnan(gain), np.nan, values)))
+
+
+def macd(close: np.ndarray, fast: int, slow: int, signal: int) -> Arrays:
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line, signal)
+    return {"macd": line, "macd_signal": signal_line, "macd_hist": line - signal_line}
+
+
+def bollinger(close: np.ndarray, period: int, width: float) -> Arrays:
+    middle = sma(close, period)
+    band = width * rolling_std(close, period)
+    return {"bb_middle": middle, "bb_upper": middle + band, "bb_lower": middle - band}
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int) -> np.ndarray:
+    previous = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.nanmax(np.stack([high - low, np.abs(high - previous), np.abs(low - previous)]), axis=0)
+    return wilder(true_range, period)
+
+
+def vwap(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    session: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Volume-weighted average of the typical price, cumulative over the
+    series or, when session labels are given, reset at each new session.
+    """
+    weighted = (high + low + close) / 3 * volume
+    cum_weighted, cum_volume = np.cumsum(weighted), np.cumsum(volume, dtype=float)
+    if session is not None and len(session):
+        # Subtract the running totals reached before each session began
+        starts = np.flatnonzero(np.concatenate(([True], session[1:] != session[:-1])))
+        owner = np.repeat(starts, np.diff(np.append(starts, len(session))))
+        cum_weighted = cum_weighted - (cum_weighted - weighted)[owner]
+        cum_volume = cum_volume - (cum_volume - volume)[owner]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cum_volume > 0, cum_weighted / cum_volume, np.nan)
+
+
+def compute(arrays: Arrays, specs: List[Spec]) -> Arrays:
+    """
+    Indicator series for one instrument.
+
+    Args:
+        arrays: 'open', 'high', 'low', 'close', 'volume' arrays, plus an
+            optional 'session' array of day labels for intraday VWAP
+        specs: Parsed (name, params) pairs from parse_spec
+    """
+    close, high, low = arrays["close"], arrays["high"], arrays["low"]
+    out: Arrays = {}
+    for name, params in specs:
+        if name == "sma":
+            out[f"sma_{int(params[0])}"] = sma(close, int(params[0]))
+        elif name == "ema":
+            out[f"ema_{int(params[0])}"] = ema(close, params[0])
+        elif name == "rsi":
+            out[f"rsi_{int(params[0])}"] = rsi(close, int(params[0]))
+        elif name == "macd":
+            out.update(macd(close, *(int(p) for p in params)))
+        elif name == "bollinger":
+            out.update(bollinger(close, int(params[0]), params[1]))
+        elif name == "atr":
+            out[f"atr_{int(params[0])}"] = atr(high, low, close, int(params[0]))
+        elif name == "vwap":
+            out["vwap"] = vwap(high, low, close, arrays["volume"], arrays.get("session"))
+    return out
+
+
+def compute_batch(batch: List[Tuple[str, Arrays]], specs: List[Spec]) -> List[Tuple[str, Arrays]]:
+    """compute() over several instruments; the unit of work sent to a worker process"""
+    return [(key, compute(arrays, specs)) for key, arrays in batch]
+
+
+def from_candles(candles: List[Dict[str, Any]], intraday: bool = False) -> Arrays:
+    """OHLCV arrays from candle dicts, with session labels for intraday VWAP"""
+    arrays = {
+        key: np.fromiter((c[key] or 0 for c in candles), dtype=float, count=len(candles))
+        for key in ("open", "high", "low", "close", "volume")
+    }
+    if intraday:
+        arrays["session"] = np.array([c["date"].toordinal() for c in candles])
+    return arrays
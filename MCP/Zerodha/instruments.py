@@ -0,0 +1,293 @@
+"""
+On-disk index of the Kite instrument master.
+
+The daily instrument and mutual fund CSV dumps are loaded into a SQLite
+file so symbol-to-token resolution and instrument search don't require
+pulling the full dump through the MCP transport. Exact lookups go through
+an in-memory dict built from the index; prefix, fuzzy and filtered
+searches run against indexed SQLite columns.
+"""
+
+import csv
+import difflib
+import io
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from timeutil import today_ist
+
+INSTRUMENT_COLUMNS = [
+    "instrument_token",
+    "exchange_token",
+    "tradingsymbol",
+    "name",
+    "last_price",
+    "expiry",
+    "strike",
+    "tick_size",
+    "lot_size",
+    "instrument_type",
+    "segment",
+    "exchange",
+]
+
+MF_INSTRUMENT_COLUMNS = [
+    "tradingsymbol",
+    "amc",
+    "name",
+    "purchase_allowed",
+    "redemption_allowed",
+    "minimum_purchase_amount",
+    "purchase_amount_multiplier",
+    "minimum_additional_purchase_amount",
+    "minimum_redemption_quantity",
+    "redemption_quantity_multiplier",
+    "dividend_type",
+    "scheme_type",
+    "plan",
+    "settlement_type",
+    "last_price",
+    "last_price_date",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS instruments (
+    instrument_token INTEGER PRIMARY KEY,
+    exchange_token TEXT,
+    tradingsymbol TEXT NOT NULL,
+    name TEXT,
+    last_price REAL,
+    expiry TEXT,
+    strike REAL,
+    tick_size REAL,
+    lot_size INTEGER,
+    instrument_type TEXT,
+    segment TEXT,
+    exchange TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_instruments_symbol ON instruments (tradingsymbol, exchange);
+CREATE INDEX IF NOT EXISTS idx_instruments_segment ON instruments (segment, tradingsymbol);
+CREATE TABLE IF NOT EXISTS mf_instruments (
+    tradingsymbol TEXT PRIMARY KEY,
+    amc TEXT,
+    name TEXT,
+    purchase_allowed INTEGER,
+    redemption_allowed INTEGER,
+    minimum_purchase_amount REAL,
+    purchase_amount_multiplier REAL,
+    minimum_additional_purchase_amount REAL,
+    minimum_redemption_quantity REAL,
+    redemption_quantity_multiplier REAL,
+    dividend_type TEXT,
+    scheme_type TEXT,
+    plan TEXT,
+    settlement_type TEXT,
+    last_price REAL,
+    last_price_date TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_mf_instruments_amc ON mf_instruments (amc);
+"""
+
+
+class InstrumentIndex:
+    """SQLite-backed instrument master with O(1) symbol lookup"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._tokens: Optional[Dict[str, int]] = None
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def refreshed_on(self) -> Optional[str]:
+        """IST date of the last successful load, if any"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'refreshed_on'").fetchone()
+        return row["value"] if row else None
+
+    def needs_refresh(self) -> bool:
+        return self.refreshed_on() != today_ist()
+
+    def load(self, instruments_csv: str, mf_instruments_csv: str) -> Dict[str, int]:
+        """
+        Replace the index contents with freshly downloaded CSV dumps.
+
+        Args:
+            instruments_csv: Body of Kite's /instruments dump
+            mf_instruments_csv: Body of Kite's /mf/instruments dump
+        """
+        instruments = csv.DictReader(io.StringIO(instruments_csv))
+        mf_instruments = csv.DictReader(io.StringIO(mf_instruments_csv))
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM instruments")
+            conn.execute("DELETE FROM mf_instruments")
+            conn.executemany(
+                f"INSERT OR REPLACE INTO instruments VALUES ({', '.join('?' * len(INSTRUMENT_COLUMNS))})",
+                ([row.get(c) or None for c in INSTRUMENT_COLUMNS] for row in instruments),
+            )
+            conn.executemany(
+                f"INSERT OR REPLACE INTO mf_instruments VALUES ({', '.join('?' * len(MF_INSTRUMENT_COLUMNS))})",
+                ([row.get(c) or None for c in MF_INSTRUMENT_COLUMNS] for row in mf_instruments),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('refreshed_on', ?)", (today_ist(),)
+            )
+            counts = {
+                "instruments": conn.execute("SELECT COUNT(*) FROM instruments").fetchone()[0],
+                "mf_instruments": conn.execute("SELECT COUNT(*) FROM mf_instruments").fetchone()[0],
+            }
+            self._tokens = None
+        return counts
+
+    def _token_map(self) -> Dict[str, int]:
+        with self._lock:
+            if self._tokens is None:
+                with self._connect() as conn:
+                    self._tokens = {
+                        f"{exchange}:{symbol}": token
+                        for token, symbol, exchange in conn.execute(
+                            "SELECT instrument_token, tradingsymbol, exchange FROM instruments"
+                        )
+                    }
+            return self._tokens
+
+    def token(self, symbol: str) -> Optional[int]:
+        """Resolve 'EXCHANGE:TRADINGSYMBOL' to an instrument token"""
+        return self._token_map().get(symbol.strip().upper())
+
+    def lookup(self, symbols: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Full instrument rows for exact 'EXCHANGE:TRADINGSYMBOL' symbols"""
+        tokens = {symbol: self.token(symbol) for symbol in symbols}
+        found = [t for t in tokens.values() if t is not None]
+        rows: Dict[int, Dict[str, Any]] = {}
+        if found:
+            with self._connect() as conn:
+                for row in conn.execute(
+                    f"SELECT * FROM instruments WHERE instrument_token IN ({', '.join('?' * len(found))})",
+                    found,
+                ):
+                    rows[row["instrument_token"]] = dict(row)
+        return {symbol: rows.get(token) for symbol, token in tokens.items()}
+
+    def search(
+        self,
+        query: str,
+        exchange: Optional[str] = None,
+        segment: Optional[str] = None,
+        instrument_type: Optional[str] = None,
+        fuzzy: bool = False,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search instruments by trading symbol prefix, or fuzzily by symbol
+        and name, optionally filtered by exchange, segment and type.
+        """
+        query = query.strip().upper()
+        filters, params = [], []
+        for column, value in (
+            ("exchange", exchange),
+            ("segment", segment),
+            ("instrument_type", instrument_type),
+        ):
+            if value:
+                filters.append(f"{column} = ?")
+                params.append(value.upper())
+
+        with self._connect() as conn:
+            if not fuzzy:
+                # Range scan on the tradingsymbol index instead of LIKE
+                where = ["tradingsymbol >= ?", "tradingsymbol < ?"] + filters
+                rows = conn.execute(
+                    f"SELECT * FROM instruments WHERE {' AND '.join(where)} "
+                    "ORDER BY tradingsymbol, exchange LIMIT ?",
+                    [query, query + "\uffff"] + params + [limit],
+                ).fetchall()
+                return [dict(row) for row in rows]
+
+            terms = query.split() or [query]
+            where = [
+                "(tradingsymbol LIKE ? OR UPPER(name) LIKE ?)" for _ in terms
+            ] + filters
+            like_params = [p for term in terms for p in (f"%{term}%", f"%{term}%")]
+            rows = conn.execute(
+                f"SELECT * FROM instruments WHERE {' AND '.join(where)} LIMIT 2000",
+                like_params + params,
+            ).fetchall()
+            if not rows:
+                # No substring match: fall back to edit-distance on symbols
+                symbols = [
+                    r[0]
+                    for r in conn.execute(
+                        f"SELECT DISTINCT tradingsymbol FROM instruments"
+                        f"{' WHERE ' + ' AND '.join(filters) if filters else ''}",
+                        params,
+                    )
+                ]
+                close = difflib.get_close_matches(query, symbols, n=limit, cutoff=0.6)
+                if close:
+                    rows = conn.execute(
+                        f"SELECT * FROM instruments WHERE tradingsymbol IN ({', '.join('?' * len(close))})"
+                        f"{' AND ' + ' AND '.join(filters) if filters else ''}",
+                        close + params,
+                    ).fetchall()
+
+        def score(row: sqlite3.Row) -> float:
+            return max(
+                difflib.SequenceMatcher(None, query, row["tradingsymbol"]).ratio(),
+                difflib.SequenceMatcher(None, query, (row["name"] or "").upper()).ratio(),
+            )
+
+        return [dict(row) for row in sorted(rows, key=score, reverse=True)[:limit]]
+
+    def search_mf(
+        self,
+        query: str = "",
+        amc: Optional[str] = None,
+        plan: Optional[str] = None,
+        scheme_type: Optional[str] = None,
+        limit: Optional[int] = 20,
+    ) -> List[Dict[str, Any]]:
+        """Search mutual fund schemes by name/ISIN and optional filters"""
+        where, params = [], []
+        for term in query.upper().split():
+            where.append("(tradingsymbol LIKE ? OR UPPER(name) LIKE ?)")
+            params += [f"%{term}%", f"%{term}%"]
+        for column, value in (("amc", amc), ("plan", plan), ("scheme_type", scheme_type)):
+            if value:
+                where.append(f"UPPER({column}) = ?")
+                params.append(value.upper())
+        sql = "SELECT * FROM mf_instruments"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [
+            dict(
+                row,
+                purchase_allowed=bool(row["purchase_allowed"]),
+                redemption_allowed=bool(row["redemption_allowed"]),
+            )
+            for row in rows
+        ]
+
+    def is_empty(self) -> bool:
+        return self.refreshed_on() is None
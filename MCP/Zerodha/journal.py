@@ -0,0 +1,370 @@
+"""
+Local journal of order and SIP writes, plus a queryable copy of Kite's
+order book and trade book.
+
+Every write call is appended to an append-only SQLite table together with
+Kite's response or error; update and delete are rejected by triggers. The
+file runs in WAL mode so appends from tool calls don't block the readers
+answering queries. A background reconcile copies Kite's orders and trades
+into indexed tables, so questions like "orders for INFY today" are answered
+locally instead of pulling the full order book each time.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from timeutil import IST, DateLike, parse_bound
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    account TEXT NOT NULL,
+    action TEXT NOT NULL,
+    order_id TEXT,
+    params TEXT NOT NULL,
+    response TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_journal_account_ts ON journal (account, ts);
+CREATE INDEX IF NOT EXISTS idx_journal_order ON journal (order_id);
+CREATE TRIGGER IF NOT EXISTS journal_no_update BEFORE UPDATE ON journal
+BEGIN SELECT RAISE(ABORT, 'journal is append-only'); END;
+CREATE TRIGGER IF NOT EXISTS journal_no_delete BEFORE DELETE ON journal
+BEGIN SELECT RAISE(ABORT, 'journal is append-only'); END;
+
+CREATE TABLE IF NOT EXISTS orders (
+    account TEXT NOT NULL,
+    order_id TEXT NOT NULL,
+    exchange TEXT,
+    tradingsymbol TEXT,
+    transaction_type TEXT,
+    product TEXT,
+    order_type TEXT,
+    variety TEXT,
+    quantity INTEGER,
+    filled_quantity INTEGER,
+    price REAL,
+    trigger_price REAL,
+    average_price REAL,
+    status TEXT,
+    status_message TEXT,
+    tag TEXT,
+    order_timestamp INTEGER,
+    source TEXT NOT NULL,
+    PRIMARY KEY (account, order_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_orders_symbol ON orders (account, tradingsymbol, order_timestamp);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (account, status, order_timestamp);
+CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders (account, order_timestamp);
+
+CREATE TABLE IF NOT EXISTS trades (
+    account TEXT NOT NULL,
+    trade_id TEXT NOT NULL,
+    order_id TEXT,
+    exchange TEXT,
+    tradingsymbol TEXT,
+    transaction_type TEXT,
+    product TEXT,
+    quantity INTEGER,
+    average_price REAL,
+    fill_timestamp INTEGER,
+    PRIMARY KEY (account, trade_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades (account, tradingsymbol, fill_timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_order ON trades (account, order_id);
+"""
+
+ORDER_COLUMNS = (
+    "account",
+    "order_id",
+    "exchange",
+    "tradingsymbol",
+    "transaction_type",
+    "product",
+    "order_type",
+    "variety",
+    "quantity",
+    "filled_quantity",
+    "price",
+    "trigger_price",
+    "average_price",
+    "status",
+    "status_message",
+    "tag",
+    "order_timestamp",
+    "source",
+)
+TRADE_COLUMNS = (
+    "account",
+    "trade_id",
+    "order_id",
+    "exchange",
+    "tradingsymbol",
+    "transaction_type",
+    "product",
+    "quantity",
+    "average_price",
+    "fill_timestamp",
+)
+
+# Status given to a placed order until a reconcile brings Kite's own
+SUBMITTED = "SUBMITTED"
+
+
+def _epoch(value: Any) -> Optional[int]:
+    """Epoch seconds for a Kite timestamp (naive datetimes are IST)"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=IST)
+    return int(value.timestamp())
+
+
+def _iso(epoch: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(epoch, IST).isoformat() if epoch is not None else None
+
+
+def _reference(params: Dict[str, Any], response: Any) -> Optional[str]:
+    """Order or SIP id a write refers to"""
+    if isinstance(response, (str, int)):
+        return str(response)
+    if isinstance(response, dict):
+        for key in ("order_id", "sip_id"):
+            if response.get(key):
+                return str(response[key])
+    for key in ("order_id", "sip_id"):
+        if params.get(key):
+            return str(params[key])
+    return None
+
+
+def _values(record: Dict[str, Any], columns: Tuple[str, ...], **overrides: Any) -> List[Any]:
+    merged = {**record, **overrides}
+    return [merged.get(column) for column in columns]
+
+
+def _upsert(table: str, columns: Tuple[str, ...], replace: bool = True) -> str:
+    verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _symbol_filter(symbols: List[str]) -> Tuple[str, List[str]]:
+    """SQL condition matching 'SYMBOL' or 'EXCHANGE:SYMBOL' entries"""
+    clauses, params = [], []
+    for symbol in symbols:
+        exchange, _, tradingsymbol = symbol.upper().rpartition(":")
+        if exchange:
+            clauses.append("(exchange = ? AND tradingsymbol = ?)")
+            params += [exchange, tradingsymbol]
+        else:
+            clauses.append("tradingsymbol = ?")
+            params.append(tradingsymbol)
+    return "(" + " OR ".join(clauses) + ")", params
+
+
+class OrderJournal:
+    """Append-only write journal with indexed order and trade tables"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._write_lock = threading.Lock()
+        self._initialized = False
+        # Account -> outcome of its last reconcile
+        self.reconciled: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        # Committed appends only need to survive a crash of this process
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._initialized = True
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(
+        self,
+        account: str,
+        action: str,
+        params: Dict[str, Any],
+        response: Any = None,
+        error: Optional[BaseException] = None,
+    ) -> int:
+        """
+        Append one write call and its outcome; a placed order also gets a
+        provisional order-book row until the next reconcile.
+
+        Returns:
+            Sequence number of the journal entry
+        """
+        now = time.time()
+        order_id = _reference(params, response)
+        with self._write_lock, self._connect() as conn:
+            seq = conn.execute(
+                "INSERT INTO journal (ts, account, action, order_id, params, response, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    now,
+                    account,
+                    action,
+                    order_id,
+                    json.dumps(params, default=str),
+                    json.dumps(response, default=str) if error is None else None,
+                    f"{type(error).__name__}: {error}" if error is not None else None,
+                ),
+            ).lastrowid
+            if action == "place_order" and error is None and order_id:
+                conn.execute(
+                    _upsert("orders", ORDER_COLUMNS, replace=False),
+                    _values(
+                        params,
+                        ORDER_COLUMNS,
+                        account=account,
+                        order_id=order_id,
+                        filled_quantity=0,
+                        status=SUBMITTED,
+                        order_timestamp=int(now),
+                        source="journal",
+                    ),
+                )
+        return seq
+
+    def reconcile(self, account: str, orders: List[Dict[str, Any]], trades: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Replace local rows with Kite's view of the given orders and trades"""
+        order_rows = [
+            _values(
+                order,
+                ORDER_COLUMNS,
+                account=account,
+                order_timestamp=_epoch(order.get("order_timestamp")),
+                source="kite",
+            )
+            for order in orders
+        ]
+        trade_rows = [
+            _values(trade, TRADE_COLUMNS, account=account, fill_timestamp=_epoch(trade.get("fill_timestamp")))
+            for trade in trades
+        ]
+        with self._write_lock, self._connect() as conn:
+            conn.executemany(_upsert("orders", ORDER_COLUMNS), order_rows)
+            conn.executemany(_upsert("trades", TRADE_COLUMNS), trade_rows)
+            pending = conn.execute(
+                "SELECT COUNT(*) FROM orders WHERE account = ? AND status = ?", (account, SUBMITTED)
+            ).fetchone()[0]
+        self.reconciled[account] = {
+            "at": _iso(time.time()),
+            "orders": len(order_rows),
+            "trades": len(trade_rows),
+            "unconfirmed": pending,
+        }
+        return self.reconciled[account]
+
+    def _query(
+        self,
+        table: str,
+        ts_column: str,
+        account: Optional[str],
+        symbols: Optional[List[str]],
+        since: Optional[DateLike],
+        until: Optional[DateLike],
+        conditions: Dict[str, Any],
+        limit: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        where, params = [], []
+        if account:
+            where.append("account = ?")
+            params.append(account)
+        if symbols:
+            clause, symbol_params = _symbol_filter(symbols)
+            where.append(clause)
+            params += symbol_params
+        if since is not None:
+            where.append(f"{ts_column} >= ?")
+            params.append(parse_bound(since))
+        if until is not None:
+            where.append(f"{ts_column} <= ?")
+            params.append(parse_bound(until, end=True))
+        for column, value in conditions.items():
+            if value is not None:
+                where.append(f"{column} = ?")
+                params.append(value)
+        sql = f"SELECT * FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {ts_column} DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as conn:
+            rows = [dict(row) for row in conn.execute(sql, params)]
+        for row in rows:
+            row[ts_column] = _iso(row[ts_column])
+        return rows
+
+    def orders(
+        self,
+        account: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+        status: Optional[str] = None,
+        since: Optional[DateLike] = None,
+        until: Optional[DateLike] = None,
+        order_id: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Orders newest first, filtered on indexed columns"""
+        return self._query(
+            "orders",
+            "order_timestamp",
+            account,
+            symbols,
+            since,
+            until,
+            {"status": status.upper() if status else None, "order_id": order_id, "tag": tag},
+            limit,
+        )
+
+    def trades(
+        self,
+        account: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+        since: Optional[DateLike] = None,
+        until: Optional[DateLike] = None,
+        order_id: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Trades newest first, filtered on indexed columns"""
+        return self._query(
+            "trades", "fill_timestamp", account, symbols, since, until, {"order_id": order_id}, limit
+        )
+
+    def entries(
+        self,
+        account: Optional[str] = None,
+        action: Optional[str] = None,
+        order_id: Optional[str] = None,
+        since: Optional[DateLike] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Journal entries newest first, with params and responses decoded"""
+        rows = self._query(
+            "journal", "ts", account, None, since, None, {"action": action, "order_id": order_id}, limit
+        )
+        for row in rows:
+            row["params"] = json.loads(row["params"])
+            row["response"] = json.loads(row["response"]) if row["response"] else None
+        return rows
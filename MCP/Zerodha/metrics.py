@@ -0,0 +1,219 @@
+"""
+In-process instrumentation of MCP tools and upstream Kite calls.
+
+The @instrumented decorator records, for every tool invocation, its wall
+time, the time spent inside Kite calls made on its behalf, the size of the
+JSON payload returned and the class of any error. Values go into fixed-
+bucket histograms that can be summarised as percentiles (server_stats) or
+rendered in the Prometheus text exposition format (/metrics).
+"""
+
+import bisect
+import contextvars
+import functools
+import json
+import time
+from collections import Counter, defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+# Upper bounds (ms) of latency buckets and (bytes) of payload-size buckets
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+SIZE_BUCKETS_BYTES = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count, sum, min and max"""
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation within its bucket, clamped to the observed range"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.bounds[i - 1] if i else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / n
+                return max(self.min, min(estimate, self.max))
+            seen += n
+        return self.max
+
+    def summary(self, digits: int = 2) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.sum / self.count, digits) if self.count else None,
+            "p50": round(self.quantile(0.5), digits) if self.count else None,
+            "p95": round(self.quantile(0.95), digits) if self.count else None,
+            "p99": round(self.quantile(0.99), digits) if self.count else None,
+            "max": round(self.max, digits),
+        }
+
+    def prometheus(self, name: str, labels: str) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, n in zip(self.bounds + ["+Inf"], self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class Invocation:
+    """Upstream time and last upstream error accumulated during one tool call"""
+
+    __slots__ = ("upstream_ms", "upstream_calls", "error_class")
+
+    def __init__(self) -> None:
+        self.upstream_ms = 0.0
+        self.upstream_calls = 0
+        self.error_class: Optional[str] = None
+
+
+# The tool invocation the current task is working for; inherited by tasks it spawns
+current_invocation: contextvars.ContextVar[Optional[Invocation]] = contextvars.ContextVar(
+    "current_invocation", default=None
+)
+
+
+class Metrics:
+    """Per-tool and per-Kite-method histograms and error counts"""
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.wall = defaultdict(lambda: Histogram(LATENCY_BUCKETS_MS))
+        self.upstream = defaultdict(lambda: Histogram(LATENCY_BUCKETS_MS))
+        self.payload = defaultdict(lambda: Histogram(SIZE_BUCKETS_BYTES))
+        self.errors: Dict[str, Counter] = defaultdict(Counter)
+        self.kite = defaultdict(lambda: Histogram(LATENCY_BUCKETS_MS))
+        self.kite_errors: Dict[str, Counter] = defaultdict(Counter)
+
+    def record_upstream(self, method: str, elapsed_ms: float, error: Optional[BaseException] = None) -> None:
+        """Record one Kite call and charge it to the tool invocation in progress"""
+        self.kite[method].observe(elapsed_ms)
+        if error is not None:
+            self.kite_errors[method][type(error).__name__] += 1
+        invocation = current_invocation.get()
+        if invocation is not None:
+            invocation.upstream_ms += elapsed_ms
+            invocation.upstream_calls += 1
+            if error is not None:
+                invocation.error_class = type(error).__name__
+
+    def record_tool(
+        self,
+        tool: str,
+        wall_ms: float,
+        invocation: Invocation,
+        payload_bytes: Optional[int],
+        error_class: Optional[str],
+    ) -> None:
+        self.wall[tool].observe(wall_ms)
+        if invocation.upstream_calls:
+            self.upstream[tool].observe(invocation.upstream_ms)
+        if payload_bytes is not None:
+            self.payload[tool].observe(payload_bytes)
+        if error_class:
+            self.errors[tool][error_class] += 1
+
+    def stats(self, tool: Optional[str] = None) -> Dict[str, Any]:
+        """Percentile summaries per tool (slowest total time first) and per Kite method"""
+        tools = [tool] if tool else sorted(self.wall, key=lambda t: -self.wall[t].sum)
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "tools": {
+                name: {
+                    "calls": self.wall[name].count,
+                    "errors": dict(self.errors[name]),
+                    "wall_ms": self.wall[name].summary(),
+                    "upstream_ms": self.upstream[name].summary(),
+                    "payload_bytes": self.payload[name].summary(0),
+                }
+                for name in tools
+                if name in self.wall
+            },
+            "kite": {
+                method: {**histogram.summary(), "errors": dict(self.kite_errors[method])}
+                for method, histogram in sorted(self.kite.items())
+            },
+        }
+
+    def prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for name, help_text, histograms, label in (
+            ("zerodha_tool_duration_ms", "Tool wall time in milliseconds", self.wall, "tool"),
+            ("zerodha_tool_upstream_ms", "Kite time per tool call in milliseconds", self.upstream, "tool"),
+            ("zerodha_tool_payload_bytes", "JSON size of tool results in bytes", self.payload, "tool"),
+            ("zerodha_kite_duration_ms", "Kite API call time in milliseconds", self.kite, "method"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for key, histogram in sorted(histograms.items()):
+                lines += histogram.prometheus(name, f'{label}="{key}"')
+        for name, help_text, errors, label in (
+            ("zerodha_tool_errors_total", "Tool errors by class", self.errors, "tool"),
+            ("zerodha_kite_errors_total", "Kite API errors by class", self.kite_errors, "method"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for key, counts in sorted(errors.items()):
+                lines += [f'{name}{{{label}="{key}",error="{cls}"}} {n}' for cls, n in sorted(counts.items())]
+        return "\n".join(lines) + "\n"
+
+
+def payload_size(result: Any) -> Optional[int]:
+    try:
+        return len(json.dumps(result, default=str))
+    except (TypeError, ValueError):
+        return None
+
+
+def instrument(metrics: Metrics) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """
+    Decorator factory timing an async tool and recording its result size and
+    error class. A returned {'error': ...} dict counts as an error, classed
+    by the last failing Kite call or as 'ToolError'.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            invocation = Invocation()
+            token = current_invocation.set(invocation)
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                elapsed = (time.perf_counter() - start) * 1000
+                metrics.record_tool(fn.__name__, elapsed, invocation, None, type(e).__name__)
+                raise
+            finally:
+                current_invocation.reset(token)
+            error_class = None
+            if isinstance(result, dict) and "error" in result:
+                error_class = invocation.error_class or "ToolError"
+            metrics.record_tool(
+                fn.__name__,
+                (time.perf_counter() - start) * 1000,
+                invocation,
+                payload_size(result),
+                error_class,
+            )
+            return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,420 @@
+"""
+Local stand-in for the Kite Connect REST API.
+
+Serves canned responses for the endpoints used by the Zerodha MCP server,
+with a configurable per-request latency, so the server can be exercised and
+benchmarked without a live Zerodha account. Optionally it also enforces
+Kite's per-second limits with HTTP 429s, throttles a random share of
+requests, and expires access tokens after a set lifetime with the same
+403 TokenException Kite sends once a session has lapsed.
+
+Usage:
+    python mock_kite.py --port 5055 --latency-ms 50
+    python mock_kite.py --latency-ms 50 --jitter-ms 20 --kite-limits --token-ttl 300
+    KITE_ROOT=http://127.0.0.1:5055 python app.py
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import time
+import uuid
+import zlib
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+# Kite's published requests-per-second limits per endpoint class
+KITE_LIMITS = {"quote": 1.0, "historical": 3.0, "order": 10.0, "default": 10.0}
+
+# Routes that don't need an access token
+PUBLIC_PATHS = re.compile(r"/session/token|/instruments(/\w+)?|/mf/instruments")
+
+
+def endpoint_class(method: str, path: str) -> str:
+    if path.startswith("/quote"):
+        return "quote"
+    if path.startswith("/instruments/historical"):
+        return "historical"
+    if method != "GET" and path.startswith(("/orders", "/mf/orders", "/mf/sips")):
+        return "order"
+    return "default"
+
+
+# Kite timestamps are naive IST
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Order fields copied onto the trade of a filled order
+TRADE_FIELDS = ("order_id", "exchange", "tradingsymbol", "transaction_type", "product", "quantity", "average_price")
+
+
+def _price(symbol: str) -> float:
+    """Deterministic pseudo price for a symbol"""
+    return round(100 + (zlib.crc32(symbol.encode()) % 400000) / 100, 2)
+
+
+def _quote(symbol: str) -> Dict[str, Any]:
+    price = _price(symbol)
+    return {
+        "instrument_token": zlib.crc32(symbol.encode()) % 10000000,
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "last_price": price,
+        "volume": 100000,
+        "ohlc": {"open": price, "high": price * 1.01, "low": price * 0.99, "close": price},
+        "depth": {
+            "buy": [{"price": price - 0.05, "quantity": 10, "orders": 1}] * 5,
+            "sell": [{"price": price + 0.05, "quantity": 10, "orders": 1}] * 5,
+        },
+    }
+
+
+def _holdings() -> List[Dict[str, Any]]:
+    return [
+        {
+            "tradingsymbol": symbol,
+            "exchange": "NSE",
+            "instrument_token": zlib.crc32(f"NSE:{symbol}".encode()) % 10000000,
+            "quantity": quantity,
+            "average_price": _price(f"NSE:{symbol}") * 0.9,
+            "last_price": _price(f"NSE:{symbol}"),
+            "pnl": _price(f"NSE:{symbol}") * 0.1 * quantity,
+            "product": "CNC",
+        }
+        for symbol, quantity in (("INFY", 10), ("TCS", 5), ("RELIANCE", 8))
+    ]
+
+
+def _candles(token: int, from_date: str, to_date: str) -> List[List[Any]]:
+    """Weekday candles following a deterministic per-token price path"""
+    start = datetime.fromisoformat(from_date[:10])
+    end = datetime.fromisoformat(to_date[:10])
+    candles = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            n = day.toordinal()
+            noise = (zlib.crc32(f"{token}:{n}".encode()) % 2001 - 1000) / 100000
+            close = round((100 + token % 400) * (1 + 0.15 * math.sin(n / (40 + token % 17)) + noise), 2)
+            candles.append(
+                [
+                    day.strftime("%Y-%m-%dT%H:%M:%S+0530"),
+                    round(close * 0.995, 2),
+                    round(close * 1.01, 2),
+                    round(close * 0.99, 2),
+                    close,
+                    1000 + zlib.crc32(f"{n}:{token}".encode()) % 9000,
+                ]
+            )
+        day += timedelta(days=1)
+    return candles
+
+
+INSTRUMENTS_CSV = "\n".join(
+    [
+        "instrument_token,exchange_token,tradingsymbol,name,last_price,expiry,strike,tick_size,lot_size,instrument_type,segment,exchange",
+        "408065,1594,INFY,INFOSYS,0,,0,0.05,1,EQ,NSE,NSE",
+        "2953217,11536,TCS,TATA CONSULTANCY SERV LT,0,,0,0.05,1,EQ,NSE,NSE",
+        "738561,2885,RELIANCE,RELIANCE INDUSTRIES,0,,0,0.05,1,EQ,NSE,NSE",
+        "256265,1001,NIFTY 50,,0,,0,0,0,EQ,INDICES,NSE",
+        "128053508,500209,INFY,INFOSYS,0,,0,0.05,1,EQ,BSE,BSE",
+    ]
+)
+
+MF_INSTRUMENTS_CSV = "\n".join(
+    [
+        "tradingsymbol,amc,name,purchase_allowed,redemption_allowed,minimum_purchase_amount,purchase_amount_multiplier,minimum_additional_purchase_amount,minimum_redemption_quantity,redemption_quantity_multiplier,dividend_type,scheme_type,plan,settlement_type,last_price,last_price_date",
+        "INF879O01027,PPFAS_MF,Parag Parikh Flexi Cap Fund - Direct Plan,1,1,1000,1,1000,0.001,0.001,growth,equity,direct,T3,75.5,2024-03-12",
+        "INF090I01239,FranklinTempletonMF,Franklin India Prima Fund - Direct Plan,1,1,5000,1,1000,0.001,0.001,growth,equity,direct,T3,2100.1,2024-03-12",
+    ]
+)
+
+
+class MockKiteHandler(BaseHTTPRequestHandler):
+    """Request handler answering Kite routes from in-memory fixtures"""
+
+    server: "MockKiteServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload).encode(), "application/json")
+
+    def _send_error(self, status: int, error_type: str, message: str) -> None:
+        self._send_json(status, {"status": "error", "error_type": error_type, "message": message})
+
+    def _dispatch(self, method: str, body: bytes = b"") -> None:
+        self.server.simulate_latency()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if body and self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            query.update(parse_qs(body.decode()))
+
+        if not PUBLIC_PATHS.fullmatch(url.path):
+            authorization = self.headers.get("Authorization", "")
+            if not self.server.token_valid(authorization.rpartition(":")[2]):
+                self.server.count("token_expired")
+                self._send_error(403, "TokenException", "Incorrect `api_key` or `access_token`.")
+                return
+        if self.server.throttled(endpoint_class(method, url.path)):
+            self.server.count("throttled")
+            self._send_error(429, "NetworkException", "Too many requests")
+            return
+
+        self.server.count("requests")
+        for route_method, pattern, handler in self.server.routes:
+            match = pattern.fullmatch(url.path)
+            if route_method == method and match:
+                data = handler(query, **match.groupdict())
+                if isinstance(data, str):
+                    self._send(200, data.encode(), "text/csv")
+                else:
+                    self._send_json(200, {"status": "success", "data": data})
+                return
+        self._send_error(404, "GeneralException", "Route not found")
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST", self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+
+    def do_PUT(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self._dispatch("PUT")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+
+Route = Tuple[str, "re.Pattern[str]", Callable[..., Any]]
+
+
+class MockKiteServer(ThreadingHTTPServer):
+    """Threaded HTTP server that mimics the Kite Connect REST API"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        rate_limits: Optional[Dict[str, float]] = None,
+        throttle_rate: float = 0.0,
+        token_ttl: Optional[float] = None,
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency_ms: Mean delay added to every request
+            jitter_ms: Uniform +/- variation around latency_ms
+            rate_limits: Requests per second per endpoint class (see KITE_LIMITS);
+                requests over the limit get HTTP 429
+            throttle_rate: Share of requests answered with HTTP 429 at random
+            token_ttl: Seconds an access token stays valid after first use;
+                None never expires tokens
+        """
+        super().__init__((host, port), MockKiteHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limits = rate_limits or {}
+        self.throttle_rate = throttle_rate
+        self.token_ttl = token_ttl
+        self.stats: Counter = Counter()
+        self._order_seq = itertools.count(1)
+        self._orders: List[Dict[str, Any]] = []
+        self._trades: List[Dict[str, Any]] = []
+        self._tokens: Dict[str, float] = {}
+        self._windows: Dict[str, deque] = {name: deque() for name in self.rate_limits}
+        self._lock = Lock()
+        self._thread: Optional[Thread] = None
+        self.routes: List[Route] = [
+            ("POST", re.compile(r"/session/token"), lambda q: self._new_session()),
+            ("GET", re.compile(r"/user/margins"), lambda q: {"equity": {"net": 100000.0}}),
+            ("GET", re.compile(r"/portfolio/holdings"), lambda q: _holdings()),
+            ("GET", re.compile(r"/portfolio/positions"), lambda q: {"net": [], "day": []}),
+            ("GET", re.compile(r"/quote"), lambda q: {s: _quote(s) for s in q.get("i", [])}),
+            (
+                "GET",
+                re.compile(r"/quote/ltp"),
+                lambda q: {s: {"last_price": _price(s)} for s in q.get("i", [])},
+            ),
+            (
+                "GET",
+                re.compile(r"/quote/ohlc"),
+                lambda q: {s: {k: v for k, v in _quote(s).items() if k != "depth"} for s in q.get("i", [])},
+            ),
+            (
+                "GET",
+                re.compile(r"/instruments/historical/(?P<token>\d+)/(?P<interval>\w+)"),
+                lambda q, token, interval: {"candles": _candles(int(token), q["from"][0], q["to"][0])},
+            ),
+            ("GET", re.compile(r"/orders"), lambda q: self._book("orders")),
+            ("GET", re.compile(r"/trades"), lambda q: self._book("trades")),
+            ("POST", re.compile(r"/orders/(?P<variety>\w+)"), lambda q, variety: self._place_order(variety, q)),
+            (
+                "POST",
+                re.compile(r"/margins/basket"),
+                lambda q: {"initial": {"total": 25000.0}, "final": {"total": 20000.0}, "orders": []},
+            ),
+            ("GET", re.compile(r"/instruments"), lambda q: INSTRUMENTS_CSV),
+            ("GET", re.compile(r"/mf/instruments"), lambda q: MF_INSTRUMENTS_CSV),
+            ("GET", re.compile(r"/mf/orders"), lambda q: []),
+            ("POST", re.compile(r"/mf/orders"), lambda q: self._next_order()),
+            ("DELETE", re.compile(r"/mf/orders/(?P<order_id>\w+)"), lambda q, order_id: {"order_id": order_id}),
+            ("GET", re.compile(r"/mf/holdings"), lambda q: []),
+            ("GET", re.compile(r"/mf/sips"), lambda q: []),
+            ("POST", re.compile(r"/mf/sips"), lambda q: {"sip_id": "sip1"}),
+            ("PUT", re.compile(r"/mf/sips/(?P<sip_id>\w+)"), lambda q, sip_id: {"sip_id": sip_id}),
+            ("DELETE", re.compile(r"/mf/sips/(?P<sip_id>\w+)"), lambda q, sip_id: {"sip_id": sip_id}),
+        ]
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def simulate_latency(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def token_valid(self, token: str) -> bool:
+        """Accept any token; it expires token_ttl seconds after it was first seen"""
+        if not token:
+            return False
+        with self._lock:
+            first_seen = self._tokens.setdefault(token, time.monotonic())
+        return self.token_ttl is None or time.monotonic() - first_seen < self.token_ttl
+
+    def expire_tokens(self) -> None:
+        """Make every token seen so far invalid, as at Kite's daily cutoff"""
+        with self._lock:
+            self._tokens = {token: float("-inf") for token in self._tokens}
+
+    def throttled(self, name: str) -> bool:
+        """True if this request breaches its class's per-second limit"""
+        if self.throttle_rate and random.random() < self.throttle_rate:
+            return True
+        limit = self.rate_limits.get(name)
+        if not limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows[name]
+            while window and now - window[0] >= 1.0:
+                window.popleft()
+            if len(window) >= limit:
+                return True
+            window.append(now)
+        return False
+
+    def _new_session(self) -> Dict[str, str]:
+        token = uuid.uuid4().hex
+        with self._lock:
+            self._tokens[token] = time.monotonic()
+        return {
+            "user_id": "AB1234",
+            "user_name": "Mock User",
+            "access_token": token,
+            "public_token": token[:8],
+            "login_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def _next_order(self) -> Dict[str, str]:
+        return {"order_id": f"{next(self._order_seq):015d}"}
+
+    def _place_order(self, variety: str, form: Dict[str, List[str]]) -> Dict[str, str]:
+        """Add an order to the book; market orders fill at once with one trade"""
+        placed = self._next_order()
+        params = {key: values[0] for key, values in form.items()}
+        symbol = f"{params.get('exchange', 'NSE')}:{params.get('tradingsymbol', '')}"
+        quantity = int(params.get("quantity") or 0)
+        filled = params.get("order_type") == "MARKET"
+        now = datetime.now(IST).strftime("%Y-%m-%d %H:%M:%S")
+        order = {
+            "order_id": placed["order_id"],
+            "variety": variety,
+            "exchange": params.get("exchange"),
+            "tradingsymbol": params.get("tradingsymbol"),
+            "transaction_type": params.get("transaction_type"),
+            "product": params.get("product"),
+            "order_type": params.get("order_type"),
+            "quantity": quantity,
+            "filled_quantity": quantity if filled else 0,
+            "price": float(params.get("price") or 0),
+            "trigger_price": float(params.get("trigger_price") or 0),
+            "average_price": _price(symbol) if filled else 0,
+            "status": "COMPLETE" if filled else "OPEN",
+            "status_message": None,
+            "tag": params.get("tag"),
+            "order_timestamp": now,
+        }
+        with self._lock:
+            self._orders.append(order)
+            if filled:
+                trade = {key: order[key] for key in TRADE_FIELDS}
+                self._trades.append({**trade, "trade_id": f"T{placed['order_id']}", "fill_timestamp": now})
+        return placed
+
+    def _book(self, name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in (self._orders if name == "orders" else self._trades)]
+
+    def start(self) -> "MockKiteServer":
+        """Serve in a background daemon thread"""
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Kite Connect REST API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--kite-limits", action="store_true", help="Enforce Kite's per-second limits with 429s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests to 429 at random")
+    parser.add_argument("--token-ttl", type=float, default=None, help="Seconds before an access token expires")
+    args = parser.parse_args()
+
+    server = MockKiteServer(
+        args.host,
+        args.port,
+        args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        rate_limits=KITE_LIMITS if args.kite_limits else None,
+        throttle_rate=args.throttle_rate,
+        token_ttl=args.token_ttl,
+    )
+    print(f"Mock Kite API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
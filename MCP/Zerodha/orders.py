@@ -0,0 +1,72 @@
+"""
+Local validation of order specs before they are sent to Kite.
+"""
+
+from typing import Any, Dict, List
+
+EXCHANGES = {"NSE", "BSE", "NFO", "CDS", "BFO", "MCX", "BCD"}
+TRANSACTION_TYPES = {"BUY", "SELL"}
+PRODUCTS = {"CNC", "MIS", "NRML", "MTF"}
+ORDER_TYPES = {"MARKET", "LIMIT", "SL", "SL-M"}
+VARIETIES = {"regular", "amo", "co", "iceberg", "auction"}
+
+REQUIRED_FIELDS = (
+    "tradingsymbol",
+    "exchange",
+    "transaction_type",
+    "quantity",
+    "product",
+    "order_type",
+)
+
+
+def _positive(value: Any) -> bool:
+    try:
+        return float(value) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def validate_order(spec: Dict[str, Any]) -> List[str]:
+    """Return the problems with an order spec; empty if it looks placeable"""
+    errors = [f"missing '{name}'" for name in REQUIRED_FIELDS if spec.get(name) in (None, "")]
+    if errors:
+        return errors
+
+    for name, allowed in (
+        ("exchange", EXCHANGES),
+        ("transaction_type", TRANSACTION_TYPES),
+        ("product", PRODUCTS),
+        ("order_type", ORDER_TYPES),
+    ):
+        if str(spec[name]).upper() not in allowed:
+            errors.append(f"invalid {name} '{spec[name]}', expected one of {sorted(allowed)}")
+    if spec.get("variety", "regular") not in VARIETIES:
+        errors.append(f"invalid variety '{spec['variety']}', expected one of {sorted(VARIETIES)}")
+
+    quantity = spec["quantity"]
+    if isinstance(quantity, bool) or not isinstance(quantity, int) or quantity <= 0:
+        errors.append(f"quantity must be a positive integer, got {quantity!r}")
+
+    order_type = str(spec["order_type"]).upper()
+    if order_type in ("LIMIT", "SL") and not _positive(spec.get("price")):
+        errors.append(f"{order_type} orders need a positive price")
+    if order_type in ("SL", "SL-M") and not _positive(spec.get("trigger_price")):
+        errors.append(f"{order_type} orders need a positive trigger_price")
+    return errors
+
+
+def order_params(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalised KiteConnect.place_order keyword arguments for a valid spec"""
+    return {
+        "variety": spec.get("variety", "regular"),
+        "exchange": spec["exchange"].upper(),
+        "tradingsymbol": spec["tradingsymbol"],
+        "transaction_type": spec["transaction_type"].upper(),
+        "quantity": spec["quantity"],
+        "product": spec["product"].upper(),
+        "order_type": spec["order_type"].upper(),
+        "price": spec.get("price"),
+        "trigger_price": spec.get("trigger_price"),
+        "tag": spec.get("tag"),
+    }
@@ -0,0 +1,119 @@
+"""
+Server-side filtering, field projection and pagination of list responses.
+
+Kite returns verbose records (holdings, positions, MF instruments, ...)
+and every key is serialised through MCP into the model's context. Tools
+pass their rows through shape() so callers can ask for just the rows and
+columns they need, optionally as a dict of columns, which repeats each key
+once instead of once per row.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+# A list of rows, or columns (or an error) keyed by name
+Rows = Union[List[Dict[str, Any]], Dict[str, Any]]
+
+
+def _matches_symbol(row: Dict[str, Any], wanted: set) -> bool:
+    symbol = str(row.get("tradingsymbol", "")).upper()
+    return symbol in wanted or f"{row.get('exchange', '')}:{symbol}".upper() in wanted
+
+
+def shape(
+    rows: Iterable[Dict[str, Any]],
+    fields: Optional[List[str]] = None,
+    symbols: Optional[List[str]] = None,
+    exchange: Optional[str] = None,
+    nonzero: bool = False,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    columnar: bool = False,
+) -> Rows:
+    """
+    Filter, paginate and project rows without modifying the originals.
+
+    Args:
+        rows: Records as returned by Kite or the local indexes
+        fields: Keys to keep in each record; all keys when omitted
+        symbols: Keep rows whose tradingsymbol (or 'EXCHANGE:SYMBOL') is listed
+        exchange: Keep rows on this exchange
+        nonzero: Keep rows with a non-zero quantity
+        limit: Maximum number of rows after offset
+        offset: Number of matching rows to skip
+        columnar: Return a dict of column lists instead of a list of dicts
+    """
+    if symbols:
+        wanted = {s.upper() for s in symbols}
+        rows = (row for row in rows if _matches_symbol(row, wanted))
+    if exchange:
+        rows = (row for row in rows if str(row.get("exchange", "")).upper() == exchange.upper())
+    if nonzero:
+        rows = (row for row in rows if row.get("quantity"))
+
+    rows = list(rows)
+    rows = rows[offset : offset + limit if limit is not None else None]
+
+    if columnar:
+        keys = fields or list(dict.fromkeys(key for row in rows for key in row))
+        return {key: [row.get(key) for row in rows] for key in keys}
+    if fields:
+        return [{key: row.get(key) for key in fields} for row in rows]
+    return rows
+
+
+# Quantities and amounts that add up when the same instrument is held in several accounts
+ADDITIVE_FIELDS = (
+    "quantity",
+    "t1_quantity",
+    "realised_quantity",
+    "used_quantity",
+    "collateral_quantity",
+    "opening_quantity",
+    "overnight_quantity",
+    "buy_quantity",
+    "sell_quantity",
+    "buy_value",
+    "sell_value",
+    "day_buy_quantity",
+    "day_sell_quantity",
+    "day_buy_value",
+    "day_sell_value",
+    "value",
+    "pnl",
+    "m2m",
+    "realised",
+    "unrealised",
+)
+
+
+def combine(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge rows for the same instrument (and product, for positions) across
+    accounts: additive fields are summed, average_price is re-weighted by
+    quantity and 'account' becomes the list of contributing accounts.
+    """
+    merged: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (row.get("exchange"), row.get("tradingsymbol"), row.get("product"))
+        quantity = row.get("quantity") or 0
+        if key not in merged:
+            merged[key] = {
+                **row,
+                "account": [row.get("account")],
+                "_cost": (row.get("average_price") or 0) * quantity,
+            }
+            continue
+        target = merged[key]
+        target["account"].append(row.get("account"))
+        target["_cost"] += (row.get("average_price") or 0) * quantity
+        for name in ADDITIVE_FIELDS:
+            if name in row:
+                target[name] = (target.get(name) or 0) + (row[name] or 0)
+
+    out = []
+    for row in merged.values():
+        cost = row.pop("_cost")
+        if row.get("quantity"):
+            row["average_price"] = cost / row["quantity"]
+        out.append(row)
+    return out
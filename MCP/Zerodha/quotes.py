@@ -0,0 +1,106 @@
+"""
+Quote aggregator for the Kite quote endpoints.
+
+Requests arriving within a short coalescing window are merged into one
+batch, de-duplicated, split into chunks no larger than Kite's per-request
+instrument cap and fetched in parallel. Requests whose symbols are already
+covered by an in-flight batch wait on that batch instead of issuing a new
+round trip.
+"""
+
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+# KiteConnect method and per-request instrument cap for each quote mode
+QUOTE_MODES = {
+    "full": ("quote", 500),
+    "ohlc": ("ohlc", 1000),
+    "ltp": ("ltp", 1000),
+}
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.symbols: Set[str] = set()
+        self.future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+
+
+class QuoteAggregator:
+    """Coalesces, de-duplicates and chunks quote requests"""
+
+    def __init__(self, call: Callable[..., Awaitable[Any]], window_ms: float = 5.0):
+        """
+        Args:
+            call: Coroutine calling a KiteConnect method by name
+            window_ms: How long a new batch waits to collect more symbols
+        """
+        self.call = call
+        self.window = window_ms / 1000
+        self.stats: Counter = Counter()
+        self._pending: Dict[str, _Batch] = {}
+        self._in_flight: Dict[str, List[_Batch]] = {mode: [] for mode in QUOTE_MODES}
+        # The loop only keeps weak references to tasks, so flushes are held here until done
+        self._flushes: Set["asyncio.Task[None]"] = set()
+
+    async def get(self, symbols: List[str], mode: str = "full") -> Dict[str, Any]:
+        """
+        Fetch quotes for symbols, sharing upstream calls with concurrent requests.
+
+        Args:
+            symbols: List of symbols (e.g., ['NSE:INFY', 'BSE:RELIANCE'])
+            mode: 'full' (with market depth), 'ohlc' or 'ltp'
+        """
+        if mode not in QUOTE_MODES:
+            raise ValueError(f"Unknown quote mode '{mode}', expected one of {list(QUOTE_MODES)}")
+        wanted = {symbol.strip() for symbol in symbols if symbol.strip()}
+        self.stats["requests"] += 1
+        self.stats["symbols_requested"] += len(wanted)
+        if not wanted:
+            return {}
+
+        batch = self._join_in_flight(mode, wanted)
+        if batch is not None:
+            self.stats["coalesced"] += 1
+        else:
+            batch = self._pending.get(mode)
+            if batch is None:
+                batch = self._pending[mode] = _Batch()
+                asyncio.get_running_loop().call_later(self.window, self._start_flush, mode)
+            else:
+                self.stats["coalesced"] += 1
+            batch.symbols |= wanted
+
+        result = await asyncio.shield(batch.future)
+        return {symbol: result[symbol] for symbol in symbols if symbol in result}
+
+    def _join_in_flight(self, mode: str, wanted: Set[str]) -> Optional[_Batch]:
+        for batch in self._in_flight[mode]:
+            if wanted <= batch.symbols:
+                return batch
+        return None
+
+    def _start_flush(self, mode: str) -> None:
+        task = asyncio.get_running_loop().create_task(self._flush(mode))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, mode: str) -> None:
+        batch = self._pending.pop(mode)
+        self._in_flight[mode].append(batch)
+        method, limit = QUOTE_MODES[mode]
+        symbols = sorted(batch.symbols)
+        chunks = [symbols[i : i + limit] for i in range(0, len(symbols), limit)]
+        self.stats["upstream_calls"] += len(chunks)
+        self.stats["symbols_fetched"] += len(symbols)
+        try:
+            merged: Dict[str, Any] = {}
+            for chunk_result in await asyncio.gather(*(self.call(method, chunk) for chunk in chunks)):
+                merged.update(chunk_result or {})
+            batch.future.set_result(merged)
+        except Exception as e:
+            batch.future.set_exception(e)
+            # Mark retrieved so an all-cancelled batch doesn't log a warning
+            batch.future.exception()
+        finally:
+            self._in_flight[mode].remove(batch)
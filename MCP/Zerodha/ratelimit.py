@@ -0,0 +1,185 @@
+"""
+Client-side rate limiting and scheduling for Kite API calls.
+
+Each endpoint class (quote, historical, order, default) has its own token
+bucket sized to Kite's published per-second limits. Calls that pass their
+bucket then wait for one of a fixed number of upstream slots; order
+placement and cancellation are handed free slots ahead of queued reads.
+Calls rejected with HTTP 429 are retried with jittered exponential backoff.
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from kiteconnect import exceptions as kite_exceptions
+
+# Endpoint class of each KiteConnect method; anything unlisted is 'default'
+ENDPOINT_CLASSES = {
+    "quote": "quote",
+    "ohlc": "quote",
+    "ltp": "quote",
+    "historical_data": "historical",
+    "place_order": "order",
+    "modify_order": "order",
+    "cancel_order": "order",
+    "exit_order": "order",
+    "place_mf_order": "order",
+    "cancel_mf_order": "order",
+    "place_mf_sip": "order",
+    "modify_mf_sip": "order",
+    "cancel_mf_sip": "order",
+}
+
+# Lower runs first when upstream slots are contended
+PRIORITIES = {"order": 0, "quote": 1, "historical": 1, "default": 1}
+
+
+def endpoint_class(method: str) -> str:
+    return ENDPOINT_CLASSES.get(method, "default")
+
+
+def is_throttled(error: Exception) -> bool:
+    """True for Kite's 'Too many requests' (HTTP 429) rejections"""
+    return isinstance(error, kite_exceptions.KiteException) and getattr(error, "code", None) == 429
+
+
+class TokenBucket:
+    """Token bucket allowing `rate` calls per second with bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # The lock keeps waiters first-come first-served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class PrioritySemaphore:
+    """Semaphore that hands released slots to the highest-priority waiter"""
+
+    def __init__(self, slots: int):
+        self.available = slots
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self.available > 0 and not self._waiters:
+            self.available -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was handed over just as we were cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.available += 1
+
+
+class RateLimiter:
+    """Per-endpoint-class token buckets, prioritised slots and 429 retries"""
+
+    def __init__(
+        self,
+        rates: Dict[str, float],
+        slots: int,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+    ):
+        """
+        Args:
+            rates: Requests per second for each endpoint class
+            slots: Maximum concurrent upstream calls
+            max_retries: Retries for a call rejected with HTTP 429
+            backoff: Base delay in seconds before the first retry
+        """
+        self.buckets = {name: TokenBucket(rate) for name, rate in rates.items()}
+        self.slots = PrioritySemaphore(slots)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.metrics: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+
+    async def schedule(self, method: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once the endpoint's bucket and an upstream slot allow it.
+
+        Args:
+            method: KiteConnect method name, used to pick the endpoint class
+            fn: Coroutine factory performing the actual call
+        """
+        name = endpoint_class(method)
+        bucket = self.buckets.get(name) or self.buckets["default"]
+        stats = self.metrics[name]
+        stats["requests"] += 1
+
+        for attempt in range(self.max_retries + 1):
+            queued = time.monotonic()
+            stats["queue_depth"] += 1
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], stats["queue_depth"])
+            try:
+                await bucket.acquire()
+                await self.slots.acquire(PRIORITIES.get(name, 1))
+            finally:
+                stats["queue_depth"] -= 1
+            waited = time.monotonic() - queued
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_throttled(e):
+                    raise
+                stats["throttled"] += 1
+                if attempt == self.max_retries:
+                    raise
+                stats["retries"] += 1
+            finally:
+                self.slots.release()
+            await asyncio.sleep(self.backoff * 2**attempt * random.uniform(0.5, 1.5))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, wait times and throttling counts per endpoint class"""
+        stats = {}
+        for name, bucket in self.buckets.items():
+            m = self.metrics[name]
+            attempts = m["requests"] + m["retries"]
+            stats[name] = {
+                "rate_per_second": bucket.rate,
+                "requests": int(m["requests"]),
+                "queue_depth": int(m["queue_depth"]),
+                "max_queue_depth": int(m["max_queue_depth"]),
+                "avg_wait_ms": round(1000 * m["wait_seconds_total"] / attempts, 3) if attempts else 0.0,
+                "max_wait_ms": round(1000 * m["wait_seconds_max"], 3),
+                "throttled": int(m["throttled"]),
+                "retries": int(m["retries"]),
+            }
+        return stats
@@ -0,0 +1,115 @@
+"""
+In-memory state of the Kite login session.
+
+Kite access tokens are valid until a fixed time (around 06:00 IST) on the
+day after login, so validity can be decided locally from the login time
+instead of probing the API. The token is persisted to disk with an atomic
+replace, and the session is only revalidated lazily when a real API call
+fails with a TokenException.
+"""
+
+import os
+import tempfile
+import threading
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+from timeutil import IST
+
+# Kite invalidates every access token daily at this time (IST)
+EXPIRY_TIME = time(6, 0)
+
+
+def token_expiry(issued_at: datetime) -> datetime:
+    """First daily expiry after a token was issued"""
+    issued = issued_at.astimezone(IST)
+    expiry = datetime.combine(issued.date(), EXPIRY_TIME, IST)
+    return expiry if issued < expiry else expiry + timedelta(days=1)
+
+
+class SessionState:
+    """Current access token, when it was validated and when it expires"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: File the access token is persisted to
+        """
+        self.path = path
+        self.access_token: Optional[str] = None
+        self.issued_at: Optional[datetime] = None
+        self.validated_at: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        return token_expiry(self.issued_at) if self.issued_at else None
+
+    @property
+    def is_valid(self) -> bool:
+        """True while a token is held and its daily expiry hasn't passed"""
+        return bool(self.access_token) and datetime.now(IST) < self.expires_at
+
+    def load(self) -> Optional[str]:
+        """
+        Read the persisted token, using the file's modification time as the
+        login time. Expired tokens are discarded along with the file.
+        """
+        try:
+            with open(self.path, "r") as f:
+                token = f.read().strip()
+            issued_at = datetime.fromtimestamp(os.path.getmtime(self.path), IST)
+        except OSError:
+            return None
+        if not token or datetime.now(IST) >= token_expiry(issued_at):
+            self.clear()
+            return None
+        with self._lock:
+            self.access_token, self.issued_at = token, issued_at
+        return token
+
+    def save(self, token: str) -> None:
+        """Record a freshly generated token and persist it atomically"""
+        now = datetime.now(IST)
+        with self._lock:
+            self.access_token, self.issued_at, self.validated_at = token, now, now
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tokens.")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    f.write(token)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def mark_validated(self) -> None:
+        """Note that an API call just succeeded with the current token"""
+        self.validated_at = datetime.now(IST)
+
+    def clear(self, token: Optional[str] = None) -> None:
+        """
+        Forget the session and remove the persisted token.
+
+        Args:
+            token: Only clear if this is still the current token, so a
+                rejection of an old token can't discard a newer login
+        """
+        with self._lock:
+            if token is not None and token != self.access_token:
+                return
+            self.access_token = self.issued_at = self.validated_at = None
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def status(self) -> dict:
+        return {
+            "authenticated": self.is_valid,
+            "issued_at": self.issued_at.isoformat() if self.issued_at else None,
+            "validated_at": self.validated_at.isoformat() if self.validated_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None,
+        }
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# The server modules are imported as top-level modules, as app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep app.py's default token store and SQLite files out of the source tree
+_STATE_DIR = tempfile.mkdtemp(prefix="zerodha-tests-")
+for _name, _file in {
+    "KITE_TOKEN_STORE": ".tokens",
+    "KITE_INSTRUMENTS_DB": "instruments.db",
+    "KITE_CANDLES_DB": "candles.db",
+    "KITE_JOURNAL_DB": "journal.db",
+}.items():
+    os.environ.setdefault(_name, os.path.join(_STATE_DIR, _file))
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from candles import MAX_DAYS, CandleStore, split, subtract
+from timeutil import IST, parse_bound
+
+DAY = 86400
+
+
+def test_subtract_skips_held_and_overlapping_ranges():
+    assert subtract((0, 99), []) == [(0, 99)]
+    assert subtract((0, 99), [(0, 99)]) == []
+    assert subtract((10, 20), [(0, 99)]) == []
+    # Overlapping and adjacent held ranges leave only the real gaps
+    assert subtract((0, 99), [(5, 30), (20, 40), (41, 50), (70, 200)]) == [(0, 4), (51, 69)]
+    # Ranges entirely outside want are ignored
+    assert subtract((50, 60), [(0, 10), (100, 110)]) == [(50, 60)]
+
+
+@pytest.mark.parametrize("interval", ["minute", "5minute", "60minute", "day"])
+def test_split_respects_kite_day_limits(interval):
+    limit = MAX_DAYS[interval] * DAY
+    assert split((0, limit - 1), MAX_DAYS[interval]) == [(0, limit - 1)]
+    chunks = split((0, 2 * limit), MAX_DAYS[interval])
+    assert chunks == [(0, limit - 1), (limit, 2 * limit - 1), (2 * limit, 2 * limit)]
+    assert all(end - start < limit for start, end in chunks)
+
+
+class FakeKite:
+    """historical_data returning one daily candle per IST day, recording requested windows"""
+
+    def __init__(self):
+        self.windows = []
+
+    async def call(self, method, instrument_token, from_date, to_date, interval):
+        self.windows.append((from_date, to_date))
+        await asyncio.sleep(0)
+        day, candles = from_date.replace(hour=0, minute=0, second=0, tzinfo=IST), []
+        while day <= to_date.replace(tzinfo=IST):
+            candles.append({"date": day, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 10})
+            day += timedelta(days=1)
+        return candles
+
+
+async def run(fn, *args):
+    return fn(*args)
+
+
+@pytest.fixture
+def store(tmp_path):
+    kite = FakeKite()
+    return CandleStore(str(tmp_path / "candles.db"), call=kite.call, run=run), kite
+
+
+def window(start, end):
+    return datetime.fromisoformat(start), datetime.fromisoformat(end)
+
+
+def test_get_fetches_only_gaps_and_refetches_on_refresh(store):
+    candles, kite = store
+
+    async def main():
+        first = await candles.get(408065, "2024-01-10", "2024-01-20", "day")
+        assert len(first) == 11
+        assert kite.windows == [window("2024-01-10 00:00:00", "2024-01-20 23:59:59")]
+
+        # Fully held: answered from disk
+        assert len(await candles.get(408065, "2024-01-12", "2024-01-15", "day")) == 4
+        assert len(kite.windows) == 1
+
+        # Overlapping request: only the uncovered ends are fetched
+        wider = await candles.get(408065, "2024-01-05", "2024-01-25", "day")
+        assert len(wider) == 21
+        assert kite.windows[1:] == [
+            window("2024-01-05 00:00:00", "2024-01-09 23:59:59"),
+            window("2024-01-21 00:00:00", "2024-01-25 23:59:59"),
+        ]
+        assert candles.held(408065, "day") == [
+            (parse_bound("2024-01-05"), parse_bound("2024-01-25", end=True))
+        ]
+
+        # refresh refetches exactly the requested range
+        kite.windows.clear()
+        await candles.get(408065, "2024-01-12", "2024-01-15", "day", refresh=True)
+        assert kite.windows == [window("2024-01-12 00:00:00", "2024-01-15 23:59:59")]
+        # Other series are held separately
+        await candles.get(408065, "2024-01-12", "2024-01-12", "minute")
+        assert len(kite.windows) == 2
+
+    asyncio.run(main())
+
+
+def test_long_gaps_are_split_into_kite_windows(store):
+    candles, kite = store
+
+    async def main():
+        await candles.get(408065, "2024-01-01", "2024-04-30", "minute")
+
+    asyncio.run(main())
+    # 121 days at 60 days per minute-interval call
+    assert len(kite.windows) == 3
+    assert kite.windows[0] == window("2024-01-01 00:00:00", "2024-02-29 23:59:59")
+    assert kite.windows[-1][1] == datetime.fromisoformat("2024-04-30 23:59:59")
+
+
+def test_get_rejects_bad_arguments(store):
+    candles, _ = store
+    with pytest.raises(ValueError, match="Unknown interval"):
+        asyncio.run(candles.get(1, "2024-01-01", "2024-01-02", "week"))
+    with pytest.raises(ValueError, match="after"):
+        asyncio.run(candles.get(1, "2024-01-05", "2024-01-02", "day"))
@@ -0,0 +1,171 @@
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+from kiteconnect import KiteConnect
+from kiteconnect import exceptions as kite_exceptions
+
+from journal import SUBMITTED, OrderJournal
+from mock_kite import MockKiteServer
+from session import SessionState
+
+ORDER = {
+    "variety": "regular",
+    "exchange": "NSE",
+    "tradingsymbol": "INFY",
+    "transaction_type": "BUY",
+    "quantity": 1,
+    "product": "CNC",
+    "order_type": "LIMIT",
+    "price": 1500.0,
+}
+
+
+def kite_order(order_id, symbol="INFY", status="COMPLETE", timestamp="2024-06-03 10:15:00", exchange="NSE"):
+    return {
+        **ORDER,
+        "order_id": order_id,
+        "exchange": exchange,
+        "tradingsymbol": symbol,
+        "filled_quantity": 1,
+        "status": status,
+        "order_timestamp": timestamp,
+    }
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return OrderJournal(str(tmp_path / "journal.db"))
+
+
+def test_journal_is_append_only(journal):
+    journal.record("AB1234", "place_order", ORDER, "1001")
+    with sqlite3.connect(journal.path) as conn:
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            conn.execute("UPDATE journal SET error = 'edited'")
+        with pytest.raises(sqlite3.DatabaseError, match="append-only"):
+            conn.execute("DELETE FROM journal")
+    assert len(journal.entries()) == 1
+
+
+def test_record_keeps_params_response_and_error(journal):
+    journal.record("AB1234", "place_order", ORDER, "1001")
+    journal.record("AB1234", "cancel_order", {"order_id": "1001"}, error=ValueError("too late"))
+
+    cancel, place = journal.entries(account="AB1234")
+    assert place["order_id"] == "1001" and place["params"] == ORDER and place["response"] == "1001"
+    assert cancel["order_id"] == "1001" and cancel["response"] is None
+    assert cancel["error"] == "ValueError: too late"
+    # Only a successful placement gets a provisional order-book row
+    assert [order["status"] for order in journal.orders(account="AB1234")] == [SUBMITTED]
+
+
+def test_reconcile_replaces_provisional_rows(journal):
+    journal.record("AB1234", "place_order", ORDER, "1001")
+    journal.record("AB1234", "place_order", ORDER, "1002")
+    trade = {**kite_order("1001"), "trade_id": "T1", "average_price": 1499.5, "fill_timestamp": "2024-06-03 10:15:01"}
+
+    summary = journal.reconcile("AB1234", [kite_order("1001")], [trade])
+
+    assert summary["orders"] == 1 and summary["trades"] == 1 and summary["unconfirmed"] == 1
+    assert journal.orders(order_id="1001")[0]["status"] == "COMPLETE"
+    assert journal.orders(order_id="1001")[0]["source"] == "kite"
+    assert journal.orders(order_id="1002")[0]["status"] == SUBMITTED
+    assert journal.trades(order_id="1001")[0]["average_price"] == 1499.5
+    # Reconciling again is idempotent
+    journal.reconcile("AB1234", [kite_order("1001")], [trade])
+    assert len(journal.trades()) == 1
+
+
+def test_order_queries_filter_and_sort(journal):
+    journal.reconcile(
+        "AB1234",
+        [
+            kite_order("1", "INFY", timestamp="2024-06-03 09:30:00"),
+            kite_order("2", "INFY", status="REJECTED", timestamp="2024-06-04 09:30:00"),
+            kite_order("3", "TCS", timestamp="2024-06-04 11:00:00"),
+            kite_order("4", "INFY", exchange="BSE", timestamp="2024-06-05 09:30:00"),
+        ],
+        [],
+    )
+    journal.reconcile("CD5678", [kite_order("5", "INFY", timestamp="2024-06-04 10:00:00")], [])
+
+    ids = lambda rows: [row["order_id"] for row in rows]  # noqa: E731
+    assert ids(journal.orders(account="AB1234", symbols=["INFY"])) == ["4", "2", "1"]
+    assert ids(journal.orders(account="AB1234", symbols=["NSE:INFY"])) == ["2", "1"]
+    assert ids(journal.orders(account="AB1234", status="rejected")) == ["2"]
+    # A date-only upper bound covers the whole day, in IST
+    assert ids(journal.orders(account="AB1234", since="2024-06-04", until="2024-06-04")) == ["3", "2"]
+    assert ids(journal.orders(symbols=["INFY"], limit=2)) == ["4", "5"]
+    assert journal.orders(order_id="1")[0]["order_timestamp"] == datetime.fromisoformat(
+        "2024-06-03T09:30:00+05:30"
+    ).isoformat()
+
+
+def test_order_queries_use_indexes(journal):
+    journal.reconcile("AB1234", [kite_order("1")], [])
+    with sqlite3.connect(journal.path) as conn:
+        plans = {
+            index: " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+            for index, sql, params in [
+                (
+                    "idx_orders_symbol",
+                    "SELECT * FROM orders WHERE account = ? AND tradingsymbol = ? ORDER BY order_timestamp DESC",
+                    ("AB1234", "INFY"),
+                ),
+                (
+                    "idx_orders_status",
+                    "SELECT * FROM orders WHERE account = ? AND status = ? ORDER BY order_timestamp DESC",
+                    ("AB1234", "OPEN"),
+                ),
+                ("idx_journal_order", "SELECT * FROM journal WHERE order_id = ?", ("1",)),
+            ]
+        }
+    for index, plan in plans.items():
+        assert index in plan, plan
+
+
+@pytest.fixture
+def kite_server():
+    server = MockKiteServer(token_ttl=3600).start()
+    yield server
+    server.stop()
+
+
+def test_write_calls_are_journaled_and_reconciled(kite_server, tmp_path):
+    from app import ZerodhaContext
+
+    async def main():
+        kite = KiteConnect(api_key="key", root=kite_server.url)
+        kite.set_access_token("token")
+        ctx = ZerodhaContext(
+            kite=kite,
+            api_key="key",
+            api_secret="secret",
+            account="AB1234",
+            session=SessionState(str(tmp_path / "tokens")),
+            journal=OrderJournal(str(tmp_path / "journal.db")),
+        )
+        try:
+            order_id = await ctx.call("place_order", **{**ORDER, "order_type": "MARKET", "price": None})
+            assert ctx.reconcile_wanted.is_set()
+            [entry] = ctx.journal.entries(account="AB1234")
+            assert entry["order_id"] == order_id and entry["error"] is None
+            assert ctx.journal.orders(order_id=order_id)[0]["status"] == SUBMITTED
+
+            await ctx.reconcile()
+            assert ctx.journal.orders(order_id=order_id)[0]["status"] == "COMPLETE"
+            assert ctx.journal.trades(order_id=order_id)[0]["quantity"] == 1
+
+            # Failed writes are journaled with their error
+            kite_server.expire_tokens()
+            with pytest.raises(kite_exceptions.TokenException):
+                await ctx.call("place_order", **ORDER)
+            failed = ctx.journal.entries(account="AB1234")[0]
+            assert failed["error"].startswith("TokenException")
+            assert len(ctx.journal.orders(account="AB1234")) == 1
+        finally:
+            ctx.executor.shutdown(wait=False)
+
+    asyncio.run(main())
@@ -0,0 +1,43 @@
+import asyncio
+import gc
+
+from quotes import QuoteAggregator
+
+
+def test_concurrent_requests_share_one_upstream_call():
+    calls = []
+
+    async def call(method, symbols):
+        calls.append((method, list(symbols)))
+        # Collect garbage mid-flight: the flush task must survive it
+        gc.collect()
+        await asyncio.sleep(0.01)
+        return {symbol: {"last_price": 1.0} for symbol in symbols}
+
+    async def main():
+        aggregator = QuoteAggregator(call, window_ms=5)
+        results = await asyncio.gather(
+            aggregator.get(["NSE:INFY"], "ltp"),
+            aggregator.get(["NSE:TCS", "NSE:INFY"], "ltp"),
+        )
+        return aggregator, results
+
+    aggregator, results = asyncio.run(main())
+    assert calls == [("ltp", ["NSE:INFY", "NSE:TCS"])]
+    assert list(results[0]) == ["NSE:INFY"]
+    assert set(results[1]) == {"NSE:TCS", "NSE:INFY"}
+    assert not aggregator._flushes
+
+
+def test_upstream_error_reaches_every_waiter():
+    async def call(method, symbols):
+        raise RuntimeError("upstream down")
+
+    async def main():
+        aggregator = QuoteAggregator(call, window_ms=5)
+        return await asyncio.gather(
+            aggregator.get(["NSE:INFY"]), aggregator.get(["NSE:TCS"]), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
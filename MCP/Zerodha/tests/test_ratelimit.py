@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+import pytest
+from kiteconnect import KiteConnect
+from kiteconnect import exceptions as kite_exceptions
+
+from mock_kite import KITE_LIMITS, MockKiteServer
+from ratelimit import PrioritySemaphore, RateLimiter, TokenBucket
+
+
+def test_token_bucket_bursts_then_waits_for_refill():
+    async def main():
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        await bucket.acquire()
+        await bucket.acquire()
+        assert time.monotonic() - start < 0.02
+        # Empty: the next token takes 1/rate seconds to refill
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.045
+
+        # Idle time refills up to capacity and no further
+        await asyncio.sleep(0.3)
+        start = time.monotonic()
+        for _ in range(2):
+            await bucket.acquire()
+        assert time.monotonic() - start < 0.02
+        await bucket.acquire()
+        assert time.monotonic() - start >= 0.045
+
+    asyncio.run(main())
+
+
+def test_priority_semaphore_hands_slots_to_lowest_priority_first():
+    async def main():
+        slots = PrioritySemaphore(1)
+        order = []
+        await slots.acquire(1)
+
+        async def waiter(name, priority):
+            await slots.acquire(priority)
+            order.append(name)
+            slots.release()
+
+        tasks = [asyncio.create_task(waiter(name, priority)) for name, priority in
+                 [("quote-1", 1), ("historical", 1), ("order", 0), ("quote-2", 1)]]
+        await asyncio.sleep(0)
+        slots.release()
+        await asyncio.gather(*tasks)
+        # Orders jump the queue; equal priorities keep arrival order
+        assert order == ["order", "quote-1", "historical", "quote-2"]
+        assert slots.available == 1
+
+    asyncio.run(main())
+
+
+def test_limiter_runs_queued_orders_before_reads():
+    async def main():
+        limiter = RateLimiter({"default": 100, "quote": 100, "order": 100}, slots=1)
+        release = asyncio.Event()
+        ran = []
+
+        async def call(name):
+            ran.append(name)
+            if name == "holdings":
+                await release.wait()
+            return name
+
+        first = asyncio.create_task(limiter.schedule("holdings", lambda: call("holdings")))
+        await asyncio.sleep(0.01)
+        quote = asyncio.create_task(limiter.schedule("quote", lambda: call("quote")))
+        await asyncio.sleep(0.01)
+        order = asyncio.create_task(limiter.schedule("place_order", lambda: call("place_order")))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, quote, order)
+        assert ran == ["holdings", "place_order", "quote"]
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def kite_server():
+    server = MockKiteServer(rate_limits=KITE_LIMITS).start()
+    yield server
+    server.stop()
+
+
+def test_limiter_retries_kite_429s(kite_server):
+    kite = KiteConnect(api_key="key", root=kite_server.url)
+    kite.set_access_token("token")
+
+    async def main():
+        # Client allows more quotes per second than Kite does, so the burst is throttled upstream
+        limiter = RateLimiter({"quote": 10, "default": 10}, slots=4, max_retries=5, backoff=0.3)
+        quotes = await asyncio.gather(*[
+            limiter.schedule("quote", lambda: asyncio.to_thread(kite.quote, ["NSE:INFY"]))
+            for _ in range(3)
+        ])
+        assert all("NSE:INFY" in quote for quote in quotes)
+        return limiter.stats()["quote"]
+
+    stats = asyncio.run(main())
+    assert kite_server.stats["throttled"] >= 2
+    assert stats["throttled"] == kite_server.stats["throttled"]
+    assert stats["retries"] == stats["throttled"]
+    assert stats["requests"] == 3
+
+
+def test_limiter_gives_up_after_max_retries(kite_server):
+    kite = KiteConnect(api_key="key", root=kite_server.url)
+    kite.set_access_token("token")
+
+    async def main():
+        limiter = RateLimiter({"quote": 10, "default": 10}, slots=4, max_retries=1, backoff=0.01)
+        results = await asyncio.gather(*[
+            limiter.schedule("quote", lambda: asyncio.to_thread(kite.quote, ["NSE:INFY"]))
+            for _ in range(3)
+        ], return_exceptions=True)
+        return results, limiter.stats()["quote"]
+
+    results, stats = asyncio.run(main())
+    errors = [r for r in results if isinstance(r, Exception)]
+    assert errors and all(getattr(e, "code", None) == 429 for e in errors)
+    assert stats["retries"] == 2
+    assert stats["throttled"] == 2 + len(errors)
+
+
+def test_limiter_does_not_retry_other_errors():
+    async def main():
+        limiter = RateLimiter({"order": 100, "default": 100}, slots=1, backoff=0.01)
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            raise kite_exceptions.InputException("Invalid quantity", code=400)
+
+        with pytest.raises(kite_exceptions.InputException):
+            await limiter.schedule("place_order", fail)
+        assert calls == 1
+        assert limiter.stats()["order"]["throttled"] == limiter.stats()["order"]["retries"] == 0
+        assert limiter.slots.available == 1
+
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+from fake_ticker import FakeTickerFeed
+from ticker import TickerManager
+
+NIFTY = 256265
+INFY = 408065
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def feed():
+    feed = FakeTickerFeed(interval_ms=20).start()
+    yield feed
+    feed.stop()
+
+
+@pytest.fixture
+def manager(feed):
+    manager = TickerManager("api_key", root=feed.url, connect_timeout=5)
+    yield manager
+    manager.close()
+
+
+def test_subscribe_streams_ticks(manager):
+    manager.subscribe("token-1", {NIFTY: "NSE:NIFTY 50"})
+    assert wait_for(lambda: manager.is_streaming(NIFTY))
+    assert manager.quotes(["NSE:NIFTY 50"], "ltp")["NSE:NIFTY 50"]["last_price"] > 0
+
+
+def test_new_access_token_rebuilds_ticker(manager):
+    manager.subscribe("token-1", {NIFTY: "NSE:NIFTY 50"})
+    first = manager.ticker
+    assert wait_for(lambda: manager.is_streaming(NIFTY))
+
+    manager.subscribe("token-2", {INFY: "NSE:INFY"})
+    assert manager.ticker is not first
+    assert manager.ticker_token == "token-2"
+    # Existing subscriptions are replayed on the new connection
+    count = len(manager.store.recent(NIFTY, manager.store.capacity))
+    assert wait_for(lambda: len(manager.store.recent(NIFTY, manager.store.capacity)) > count)
+    assert wait_for(lambda: manager.is_streaming(INFY))
+
+
+def test_failed_connect_records_nothing_and_retries(feed):
+    manager = TickerManager("api_key", root="ws://127.0.0.1:1", connect_timeout=0.5)
+    try:
+        with pytest.raises(TimeoutError):
+            manager.subscribe("token-1", {NIFTY: "NSE:NIFTY 50"})
+        assert manager.ticker is None
+        assert manager.tokens == {} and manager.modes == {}
+        assert manager.quotes(["NSE:NIFTY 50"], "ltp") == {}
+
+        manager.root = feed.url
+        manager.connect_timeout = 5
+        manager.subscribe("token-1", {NIFTY: "NSE:NIFTY 50"})
+        assert wait_for(lambda: manager.is_streaming(NIFTY))
+    finally:
+        manager.close()
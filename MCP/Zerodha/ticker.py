@@ -0,0 +1,257 @@
+"""
+Live market data via KiteTicker with an in-memory tick store.
+
+KiteTicker runs on Twisted's reactor in a background thread and pushes
+ticks into per-instrument ring buffers backed by preallocated NumPy
+structured arrays, so the latest price or the last N ticks of a
+subscribed instrument can be read without any network I/O.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from kiteconnect import KiteTicker
+from twisted.internet import reactor
+
+TICK_DTYPE = np.dtype(
+    [
+        ("timestamp", "f8"),
+        ("last_price", "f8"),
+        ("last_traded_quantity", "i8"),
+        ("average_traded_price", "f8"),
+        ("volume_traded", "i8"),
+        ("total_buy_quantity", "i8"),
+        ("total_sell_quantity", "i8"),
+        ("open", "f8"),
+        ("high", "f8"),
+        ("low", "f8"),
+        ("close", "f8"),
+        ("oi", "i8"),
+    ]
+)
+_OHLC = ("open", "high", "low", "close")
+
+
+class _Ring:
+    __slots__ = ("data", "next", "count")
+
+    def __init__(self, capacity: int):
+        self.data = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.next = 0
+        self.count = 0
+
+
+class TickStore:
+    """Fixed-size ring buffer of ticks per instrument token"""
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._rings: Dict[int, _Ring] = {}
+        self._lock = threading.Lock()
+
+    def append(self, ticks: Iterable[Dict[str, Any]]) -> None:
+        """Store parsed KiteTicker ticks, overwriting the oldest when full"""
+        received = time.time()
+        with self._lock:
+            for tick in ticks:
+                ring = self._rings.get(tick["instrument_token"])
+                if ring is None:
+                    continue
+                row = ring.data[ring.next]
+                timestamp = tick.get("exchange_timestamp")
+                row["timestamp"] = timestamp.timestamp() if timestamp else received
+                row["last_price"] = tick.get("last_price", 0.0)
+                for key in (
+                    "last_traded_quantity",
+                    "average_traded_price",
+                    "volume_traded",
+                    "total_buy_quantity",
+                    "total_sell_quantity",
+                    "oi",
+                ):
+                    row[key] = tick.get(key, 0)
+                ohlc = tick.get("ohlc") or {}
+                for key in _OHLC:
+                    row[key] = ohlc.get(key, 0.0)
+                ring.next = (ring.next + 1) % self.capacity
+                ring.count = min(ring.count + 1, self.capacity)
+
+    def track(self, tokens: Iterable[int]) -> None:
+        """Preallocate buffers for tokens; ticks for untracked tokens are dropped"""
+        with self._lock:
+            for token in tokens:
+                self._rings.setdefault(token, _Ring(self.capacity))
+
+    def drop(self, tokens: Iterable[int]) -> None:
+        with self._lock:
+            for token in tokens:
+                self._rings.pop(token, None)
+
+    def has_ticks(self, token: int) -> bool:
+        ring = self._rings.get(token)
+        return bool(ring and ring.count)
+
+    def recent(self, token: int, n: int) -> np.ndarray:
+        """Copy of the last n ticks for token, oldest first"""
+        with self._lock:
+            ring = self._rings.get(token)
+            if ring is None or not ring.count:
+                return np.zeros(0, dtype=TICK_DTYPE)
+            n = min(n, ring.count)
+            idx = (ring.next - n + np.arange(n)) % self.capacity
+            return ring.data[idx]
+
+    def latest(self, token: int) -> Optional[np.void]:
+        ticks = self.recent(token, 1)
+        return ticks[0] if len(ticks) else None
+
+
+def tick_to_dict(tick: np.void, token: int) -> Dict[str, Any]:
+    record = {name: tick[name].item() for name in TICK_DTYPE.names}
+    record["instrument_token"] = token
+    record["ohlc"] = {key: record.pop(key) for key in _OHLC}
+    return record
+
+
+class TickerManager:
+    """Owns the KiteTicker connection and its subscriptions"""
+
+    def __init__(
+        self,
+        api_key: str,
+        root: Optional[str] = None,
+        capacity: int = 1024,
+        connect_timeout: float = 10.0,
+    ):
+        self.api_key = api_key
+        self.root = root
+        self.connect_timeout = connect_timeout
+        self.store = TickStore(capacity)
+        self.symbols: Dict[int, str] = {}
+        self.tokens: Dict[str, int] = {}
+        self.modes: Dict[int, str] = {}
+        self.ticker: Optional[KiteTicker] = None
+        # Access token the current ticker was built with
+        self.ticker_token: Optional[str] = None
+        self.connected = threading.Event()
+        self._lock = threading.Lock()
+        self._connect_lock = threading.Lock()
+
+    def _ensure_connected(self, access_token: str) -> None:
+        with self._connect_lock:
+            # Kite access tokens expire daily and KiteTicker keeps reconnecting
+            # with the one it was built with, so rebuild after a re-login
+            if self.ticker is not None and self.ticker_token != access_token:
+                self._drop_ticker()
+            if self.ticker is None:
+                self._start_ticker(access_token)
+            if not self.connected.wait(self.connect_timeout):
+                # Start over on the next call instead of waiting on a dead connection
+                self._drop_ticker()
+                raise TimeoutError("Timed out connecting to the Kite ticker websocket")
+
+    def _start_ticker(self, access_token: str) -> None:
+        ticker = KiteTicker(self.api_key, access_token, root=self.root)
+        ticker.on_ticks = self._on_ticks
+        ticker.on_connect = self._on_connect
+        ticker.on_close = self._on_close
+        self.ticker = ticker
+        self.ticker_token = access_token
+        if reactor.running:
+            self._call_in_reactor(ticker.connect, True)
+        else:
+            ticker.connect(threaded=True)
+
+    def _drop_ticker(self) -> None:
+        ticker, self.ticker, self.ticker_token = self.ticker, None, None
+        self.connected.clear()
+        if ticker is not None:
+            self._call_in_reactor(ticker.close)
+
+    # Events from a replaced ticker that is still closing down are ignored
+    def _on_ticks(self, ws: KiteTicker, ticks: List[Dict[str, Any]]) -> None:
+        if ws is not self.ticker:
+            return
+        self.store.append(ticks)
+
+    def _on_connect(self, ws: KiteTicker, response: Any) -> None:
+        if ws is not self.ticker:
+            return
+        self.connected.set()
+        with self._lock:
+            modes = dict(self.modes)
+        self._send_subscriptions(modes)
+
+    def _on_close(self, ws: KiteTicker, code: Any, reason: Any) -> None:
+        if ws is not self.ticker:
+            return
+        self.connected.clear()
+
+    def _send_subscriptions(self, modes: Dict[int, str]) -> None:
+        by_mode: Dict[str, List[int]] = {}
+        for token, mode in modes.items():
+            by_mode.setdefault(mode, []).append(token)
+        for mode, tokens in by_mode.items():
+            self.ticker.subscribe(tokens)
+            self.ticker.set_mode(mode, tokens)
+
+    def _call_in_reactor(self, fn: Any, *args: Any) -> None:
+        # KiteTicker's websocket must only be touched from the reactor thread
+        reactor.callFromThread(fn, *args)
+
+    def subscribe(self, access_token: str, tokens: Dict[int, str], mode: str = "quote") -> None:
+        """
+        Stream ticks for tokens, connecting on first use. Blocking.
+
+        Args:
+            access_token: Current Kite access token
+            tokens: Mapping of instrument token to display symbol
+            mode: KiteTicker mode ('ltp', 'quote' or 'full')
+        """
+        # Connect before recording anything, so after a failed connect quote
+        # reads for these instruments still fall back to REST
+        self._ensure_connected(access_token)
+        self.store.track(tokens)
+        new_modes = {token: mode for token in tokens}
+        with self._lock:
+            self.symbols.update(tokens)
+            self.tokens.update({symbol: token for token, symbol in tokens.items()})
+            self.modes.update(new_modes)
+        self._call_in_reactor(self._send_subscriptions, new_modes)
+
+    def unsubscribe(self, tokens: List[int]) -> None:
+        with self._lock:
+            tokens = [token for token in tokens if token in self.modes]
+            for token in tokens:
+                self.modes.pop(token, None)
+                self.tokens.pop(self.symbols.pop(token, None), None)
+        if tokens and self.ticker is not None and self.connected.is_set():
+            self._call_in_reactor(self.ticker.unsubscribe, tokens)
+        self.store.drop(tokens)
+
+    def is_streaming(self, token: int) -> bool:
+        return self.connected.is_set() and token in self.modes and self.store.has_ticks(token)
+
+    def quotes(self, symbols: List[str], mode: str) -> Dict[str, Any]:
+        """
+        Kite-shaped 'ltp' or 'ohlc' quotes for the symbols currently
+        streaming; symbols without live ticks are left out.
+        """
+        quotes = {}
+        for symbol in symbols:
+            token = self.tokens.get(symbol)
+            if token is None or not self.is_streaming(token):
+                continue
+            if mode == "ohlc" and self.modes.get(token) == "ltp":
+                continue
+            tick = self.store.latest(token)
+            quote = {"instrument_token": token, "last_price": float(tick["last_price"])}
+            if mode == "ohlc":
+                quote["ohlc"] = {key: float(tick[key]) for key in _OHLC}
+            quotes[symbol] = quote
+        return quotes
+
+    def close(self) -> None:
+        self._drop_ticker()
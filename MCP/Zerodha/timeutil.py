@@ -0,0 +1,38 @@
+"""
+Date and time helpers shared by the local stores.
+
+Kite dates trading activity in IST, so naive dates and datetimes passed to
+the tools are read as IST.
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Union
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DateLike = Union[str, date, datetime]
+
+
+def today_ist() -> str:
+    """Today's date in IST, the date Kite's daily instrument dumps and sessions go by"""
+    return datetime.now(IST).date().isoformat()
+
+
+def parse_bound(value: DateLike, end: bool = False) -> int:
+    """
+    Epoch seconds for a date or datetime bound, read as IST when naive.
+    A date-only upper bound covers the whole day.
+    """
+    if isinstance(value, str):
+        value = value.strip()
+        parsed = datetime.fromisoformat(value)
+        date_only = len(value) == 10
+    elif isinstance(value, datetime):
+        parsed, date_only = value, False
+    else:
+        parsed, date_only = datetime.combine(value, time()), True
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=IST)
+    if end and date_only:
+        parsed += timedelta(days=1, seconds=-1)
+    return int(parsed.timestamp())